@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -7,34 +8,77 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from bot.config import DATABASE_PATH
-from bot.services.guild_setup import ensure_bot_admin_category
+from bot.config import DATABASE_PATH, RECONCILE_CONCURRENCY, RECONCILE_REMOVE_STALE
+from bot.db.repository import Repository
+from bot.services.audit_log import AuditLogWriter
+from bot.services.guild_setup import BotAdminChannels
+from bot.services.reconcile import reconcile_guilds
 from bot.utils.embeds import build_simple_embed
 
 
+logger = logging.getLogger(__name__)
+
+
 class AuditCog(commands.Cog):
-    def __init__(self, bot: commands.Bot) -> None:
+    def __init__(
+        self,
+        bot: commands.Bot,
+        repo: Repository,
+        admin_channels: BotAdminChannels,
+        audit_log: AuditLogWriter,
+    ) -> None:
         self.bot = bot
+        self.repo = repo
         self.ready_once = False
+        self.admin_channels = admin_channels
+        self.audit_log = audit_log
 
     @commands.Cog.listener()
     async def on_ready(self) -> None:
         if self.ready_once:
             return
         self.ready_once = True
-        for guild in self.bot.guilds:
-            try:
-                await ensure_bot_admin_category(guild)
-            except Exception:
-                continue
+        report = await reconcile_guilds(
+            list(self.bot.guilds),
+            self.repo,
+            self.admin_channels,
+            self.audit_log,
+            concurrency=RECONCILE_CONCURRENCY,
+            remove_stale=RECONCILE_REMOVE_STALE,
+        )
+        logger.info(
+            "Startup reconciliation: %s guild(s) in %.1f s, %s failed, "
+            "%s missing CTF categories, %s stale challenge(s), %s removed",
+            report.guilds,
+            report.seconds,
+            report.failed,
+            report.missing_categories,
+            report.stale_challenges,
+            report.removed_challenges,
+        )
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild: discord.Guild) -> None:
         try:
-            await ensure_bot_admin_category(guild)
+            await self.admin_channels.get(guild)
         except Exception:
             return
 
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self.admin_channels.forget_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        self.admin_channels.invalidate(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(
+        self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel
+    ) -> None:
+        # Renamed, moved out of BOT, permissions changed: resolve again
+        self.admin_channels.invalidate(after)
+
     @commands.Cog.listener()
     async def on_app_command_completion(
         self, interaction: discord.Interaction, command: discord.app_commands.Command
@@ -42,20 +86,13 @@ class AuditCog(commands.Cog):
         if interaction.guild is None:
             return
 
-        try:
-            _, channels = await ensure_bot_admin_category(interaction.guild)
-        except Exception:
-            return
-
-        log_channel = channels["log"]
-
         user = interaction.user
         command_name = command.qualified_name
         log_embed = build_simple_embed(
             "Command Log",
             f"User: {user}\nCommand: /{command_name}\nTime: {datetime.now(timezone.utc).isoformat()}",
         )
-        await log_channel.send(embed=log_embed)
+        self.audit_log.submit(interaction.guild, log_embed)
 
     @commands.Cog.listener()
     async def on_app_command_error(
@@ -65,16 +102,11 @@ class AuditCog(commands.Cog):
     ) -> None:
         if interaction.guild is None:
             return
-        try:
-            _, channels = await ensure_bot_admin_category(interaction.guild)
-        except Exception:
-            return
-        log_channel = channels["log"]
         log_embed = build_simple_embed(
             "Command Error",
             f"Error: {error}",
         )
-        await log_channel.send(embed=log_embed)
+        self.audit_log.submit(interaction.guild, log_embed)
 
     # ── /backup ──────────────────────────────────────────────────────
 
@@ -104,7 +136,7 @@ class AuditCog(commands.Cog):
             return
 
         try:
-            _, channels = await ensure_bot_admin_category(interaction.guild)
+            channels = await self.admin_channels.get(interaction.guild)
         except Exception:
             await interaction.response.send_message(
                 embed=build_simple_embed("Error", "Could not create BOT category."),
@@ -126,4 +158,7 @@ class AuditCog(commands.Cog):
 
 
 async def setup(bot: commands.Bot) -> None:
-    await bot.add_cog(AuditCog(bot))
+    repo: Repository = bot.repo  # type: ignore[attr-defined]
+    admin_channels: BotAdminChannels = bot.admin_channels  # type: ignore[attr-defined]
+    audit_log: AuditLogWriter = bot.audit_log  # type: ignore[attr-defined]
+    await bot.add_cog(AuditCog(bot, repo, admin_channels, audit_log))
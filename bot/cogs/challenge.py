@@ -5,6 +5,7 @@ from discord import app_commands
 from discord.ext import commands
 
 from bot.db.repository import Repository
+from bot.services.event_index import EventIndex, event_choices
 from bot.utils.embeds import build_simple_embed
 
 
@@ -13,9 +14,12 @@ _TOPIC_CHANNELS = {"rev", "pwn", "web", "crypto", "for", "misc"}
 
 
 class ChallengeCog(commands.Cog):
-    def __init__(self, bot: commands.Bot, repo: Repository) -> None:
+    def __init__(
+        self, bot: commands.Bot, repo: Repository, index: EventIndex
+    ) -> None:
         self.bot = bot
         self.repo = repo
+        self.index = index
 
     # ── helpers ───────────────────────────────────────────────────────
 
@@ -475,7 +479,14 @@ class ChallengeCog(commands.Cog):
 
         await interaction.response.send_message(embed=embed)
 
+    @challenges.autocomplete("event_id")
+    async def _event_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[int]]:
+        return event_choices(self.index, interaction, current, joined_only=True)
+
 
 async def setup(bot: commands.Bot) -> None:
     repo: Repository = bot.repo  # type: ignore[attr-defined]
-    await bot.add_cog(ChallengeCog(bot, repo))
+    index: EventIndex = bot.event_index  # type: ignore[attr-defined]
+    await bot.add_cog(ChallengeCog(bot, repo, index))
@@ -1,51 +1,174 @@
 from __future__ import annotations
 
 import hmac
+import logging
+from datetime import date, datetime, time, timedelta, timezone
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
-from bot.config import CTF_REMOVE_PASSWORD
+from bot.cogs.scoreboard_cog import ScoreboardCog
+from bot.config import CTF_REMOVE_PASSWORD, CTFTIME_SYNC_MINUTES
 from bot.db.repository import Repository
-from bot.services.ctftime import fetch_event, fetch_upcoming_events
+from bot.services.ctftime import cache_stats, fetch_event
+from bot.services.ctftime_mirror import CTFTIME_FORMATS, sync_ctftime_events
+from bot.services.event_index import EventIndex, event_choices
 from bot.services.guild_setup import (
     create_ctf_category_and_channels,
     delete_ctf_category_and_channels,
     hide_ctf_category_and_channels,
 )
+from bot.services.leader import LeaderLease
+from bot.services.scoreboard_registry import ScoreboardRegistry
 from bot.utils.embeds import build_event_embed, build_simple_embed
 from bot.views.ctf_pagination import CtfPaginationView
 
 
+logger = logging.getLogger(__name__)
+
+
+def _date_range(after: str | None, before: str | None) -> tuple[int, int | None]:
+    """Unix start range for /ctf upcoming: from now or the start of `after`,
+    to the end of `before`. Raises ValueError on a malformed date."""
+    start_from = int(datetime.now(timezone.utc).timestamp())
+    start_to = None
+    if after:
+        day = datetime.combine(date.fromisoformat(after.strip()), time(), timezone.utc)
+        start_from = max(start_from, int(day.timestamp()))
+    if before:
+        day = datetime.combine(date.fromisoformat(before.strip()), time(), timezone.utc)
+        start_to = int((day + timedelta(days=1)).timestamp()) - 1
+    return start_from, start_to
+
+
 class CtfCog(commands.Cog):
     ctf = app_commands.Group(name="ctf", description="CTFtime commands")
 
-    def __init__(self, bot: commands.Bot, repo: Repository) -> None:
+    def __init__(
+        self,
+        bot: commands.Bot,
+        repo: Repository,
+        registry: ScoreboardRegistry,
+        index: EventIndex,
+        leader: LeaderLease,
+    ) -> None:
         self.bot = bot
         self.repo = repo
+        self.registry = registry
+        self.index = index
+        self.leader = leader
+        self.ctftime_sync_loop.start()
+
+    def cog_unload(self) -> None:
+        self.ctftime_sync_loop.cancel()
+
+    @tasks.loop(minutes=CTFTIME_SYNC_MINUTES)
+    async def ctftime_sync_loop(self) -> None:
+        if not self.leader.is_leader:
+            # The leader keeps the mirror current; pick up its changes
+            await self.index.reload_ctftime()
+            return
+        try:
+            listed, changed, removed = await sync_ctftime_events(self.repo)
+        except Exception as exc:
+            logger.warning("CTFtime sync failed: %s", exc)
+            return
+        logger.info(
+            "CTFtime sync: %d events listed, %d changed, %d removed",
+            listed,
+            changed,
+            removed,
+        )
+        if changed or removed:
+            await self.index.reload_ctftime()
 
     @ctf.command(name="upcoming", description="List upcoming CTF events")
-    @app_commands.describe(limit="Number of events to show (max 50)")
-    async def upcoming(self, interaction: discord.Interaction, limit: int = 10) -> None:
-        limit = max(3, min(limit, 50))
-        await interaction.response.defer()
+    @app_commands.describe(
+        limit="Stop after this many events (default: keep paging)",
+        event_format="Only events of this format",
+        min_weight="Minimum CTFtime rating weight",
+        max_weight="Maximum CTFtime rating weight",
+        location="Only onsite or only online events",
+        after="Starting on or after this date (YYYY-MM-DD, UTC)",
+        before="Starting on or before this date (YYYY-MM-DD, UTC)",
+    )
+    @app_commands.rename(event_format="format")
+    @app_commands.choices(
+        event_format=[app_commands.Choice(name=f, value=f) for f in CTFTIME_FORMATS],
+        location=[
+            app_commands.Choice(name="Online", value="online"),
+            app_commands.Choice(name="Onsite", value="onsite"),
+        ],
+    )
+    async def upcoming(
+        self,
+        interaction: discord.Interaction,
+        limit: int | None = None,
+        event_format: app_commands.Choice[str] | None = None,
+        min_weight: float | None = None,
+        max_weight: float | None = None,
+        location: app_commands.Choice[str] | None = None,
+        after: str | None = None,
+        before: str | None = None,
+    ) -> None:
+        if limit is not None:
+            limit = max(1, limit)
         try:
-            events = await fetch_upcoming_events(limit=limit)
-        except Exception:
-            await interaction.followup.send(
+            start_from, start_to = _date_range(after, before)
+        except ValueError:
+            await interaction.response.send_message(
                 embed=build_simple_embed(
-                    "CTFtime error",
-                    "Unable to fetch upcoming events. Try again later.",
-                )
+                    "Invalid date", "Use dates like 2025-03-01 for after and before."
+                ),
+                ephemeral=True,
             )
             return
-        if not events:
+        await interaction.response.defer()
+        if not await self.repo.count_ctftime_events():
+            # Nothing mirrored yet (first start): sync before answering
+            try:
+                await sync_ctftime_events(self.repo)
+                await self.index.reload_ctftime()
+            except Exception:
+                await interaction.followup.send(
+                    embed=build_simple_embed(
+                        "CTFtime error",
+                        "Unable to fetch upcoming events. Try again later.",
+                    )
+                )
+                return
+        cursor: tuple[int, int] | None = None
+
+        async def fetch_more(count: int) -> list[dict]:
+            nonlocal cursor
+            rows = await self.repo.query_ctftime_events(
+                start_from,
+                start_to,
+                event_format=event_format.value if event_format else None,
+                min_weight=min_weight,
+                max_weight=max_weight,
+                onsite=location.value == "onsite" if location else None,
+                limit=count,
+                after=cursor,
+            )
+            if rows:
+                cursor = (rows[-1].start_ts, rows[-1].ctftime_event_id)
+            return [row.payload for row in rows]
+
+        view = CtfPaginationView(
+            events=[],
+            author_id=interaction.user.id,
+            page_size=3,
+            fetch_more=fetch_more,
+            limit=limit,
+        )
+        await view.load_first_page()
+        if not view.events:
             await interaction.followup.send(
                 embed=build_simple_embed("No events", "No upcoming CTFs found.")
             )
             return
-        view = CtfPaginationView(events=events, author_id=interaction.user.id, page_size=3)
         embeds = view.build_page_payload()
         message = await interaction.followup.send(embeds=embeds, view=view)
         view.message = message
@@ -81,6 +204,7 @@ class CtfCog(commands.Cog):
             )
             return
         event_title = event.get("title") or f"CTF {event_id}"
+        self.index.add_ctftime(event_id, event_title)
 
         try:
             category, channels = await create_ctf_category_and_channels(
@@ -112,6 +236,7 @@ class CtfCog(commands.Cog):
             start_time=event.get("start"),
             finish_time=event.get("finish"),
         )
+        self.index.add_joined(interaction.guild.id, event_id, event_title)
 
         status = f"Created category `{category.name}` with {len(channels)} channels."
 
@@ -311,6 +436,13 @@ class CtfCog(commands.Cog):
         await self.repo.delete_ctf_event(
             interaction.guild.id, event.ctftime_event_id
         )
+        scoreboard = self.bot.get_cog("ScoreboardCog")
+        if isinstance(scoreboard, ScoreboardCog):
+            # Stops polling the board here or in the worker right away
+            scoreboard.config_changed(interaction.guild.id, event.ctftime_event_id)
+        else:
+            self.registry.invalidate()
+        self.index.remove_joined(interaction.guild.id, event.ctftime_event_id)
 
         await interaction.followup.send(
             embed=build_simple_embed(
@@ -320,8 +452,44 @@ class CtfCog(commands.Cog):
             ephemeral=True,
         )
 
+    @ctf.command(name="cache", description="Show CTFtime cache hit rates")
+    async def cache(self, interaction: discord.Interaction) -> None:
+        stats = cache_stats()
+        if not stats:
+            description = "No CTFtime requests since startup."
+        else:
+            lines = []
+            for endpoint, s in sorted(stats.items()):
+                lines.append(
+                    f"**{endpoint}**: {s.hit_rate:.0%} hit rate over {s.requests} requests "
+                    f"({s.hits} fresh, {s.stale_hits} stale, {s.misses} misses, "
+                    f"{s.coalesced} coalesced, {s.refreshes} background refreshes, "
+                    f"{s.errors} errors)"
+                )
+            description = "\n".join(lines)
+        await interaction.response.send_message(
+            embed=build_simple_embed("CTFtime cache", description),
+            ephemeral=True,
+        )
+
+    @join.autocomplete("event_id")
+    async def _join_event_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[int]]:
+        return event_choices(self.index, interaction, current, joined_only=False)
+
+    @hidden.autocomplete("event_id")
+    @remove.autocomplete("event_id")
+    async def _joined_event_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[int]]:
+        return event_choices(self.index, interaction, current, joined_only=True)
+
 
 async def setup(bot: commands.Bot) -> None:
     repo: Repository = bot.repo  # type: ignore[attr-defined]
-    cog = CtfCog(bot, repo)
+    registry: ScoreboardRegistry = bot.scoreboard_registry  # type: ignore[attr-defined]
+    index: EventIndex = bot.event_index  # type: ignore[attr-defined]
+    leader: LeaderLease = bot.leader  # type: ignore[attr-defined]
+    cog = CtfCog(bot, repo, registry, index, leader)
     await bot.add_cog(cog)
@@ -1,46 +1,118 @@
 from __future__ import annotations
 
 import asyncio
+import io
 import json
+import logging
 from datetime import datetime, timezone
 
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 
-from bot.config import SCOREBOARD_POLL_SECONDS, SCOREBOARD_TEAM_NAME, SCOREBOARD_TOP_N
-from bot.db.repository import Repository
+from bot.config import (
+    SCOREBOARD_POLL_SECONDS,
+    SCOREBOARD_TEAM_NAME,
+    SCOREBOARD_TOP_N,
+    SCOREBOARD_WORKER_SOCKET,
+    SHARD_IDS,
+)
+from bot.db.repository import (
+    CtfEvent,
+    Repository,
+    ScoreboardConfig,
+)
+from bot.services.ctfd_feed import diff_feed, topic_for_category
 from bot.services.scoreboard_fetcher import (
-    fetch_ctfd_scoreboard,
-    fetch_rctf_scoreboard,
-    make_payload_hash,
+    FetchStats,
+    fetch_ctfd_score_timeline,
+    normalize_team_name,
+)
+from bot.services.scoreboard_adapters import ADAPTERS, get_adapter
+from bot.services.event_index import EventIndex, event_choices
+from bot.services.leader import LeaderLease
+from bot.services.scoreboard_ipc import ScoreboardIpcServer
+from bot.services.scoreboard_poller import (
+    FeedUpdate,
+    RankUpdate,
+    ScoreboardPoller,
+    ScoreboardUpdate,
+    SolveAlertsUpdate,
+    decode_update,
+    encode_update,
 )
-from bot.utils.embeds import build_scoreboard_embed, build_simple_embed
+from bot.services.scoreboard_registry import ScoreboardRegistry
+from bot.services.snapshot_archive import ArchiveWriter, snapshots_from_history
+from bot.utils.embeds import (
+    build_scoreboard_embed,
+    build_simple_embed,
+    build_solve_alerts_embed,
+)
+
+
+logger = logging.getLogger(__name__)
+# Concurrent thread creations when importing a batch of CTFd challenges
+_FEED_THREAD_CONCURRENCY = 5
+# How often each process checks for feed updates queued for its guilds
+_PENDING_FEED_SECONDS = 10
 
 
 class ScoreboardCog(commands.Cog):
-    def __init__(self, bot: commands.Bot, repo: Repository) -> None:
+    def __init__(
+        self,
+        bot: commands.Bot,
+        repo: Repository,
+        registry: ScoreboardRegistry,
+        index: EventIndex,
+        leader: LeaderLease,
+    ) -> None:
         self.bot = bot
         self.repo = repo
-        self._check_lock = asyncio.Lock()
-        self.scoreboard_loop.start()
-        self.bot.loop.create_task(self._run_initial_check())
+        self.registry = registry
+        self.index = index
+        self.leader = leader
+        self._wakeup: asyncio.TimerHandle | None = None
+        self.poller = ScoreboardPoller(repo, registry, self.handle_update)
+        # With a worker, polling runs in its process and updates come in
+        # over the socket; this process only renders and sends them
+        self.ipc: ScoreboardIpcServer | None = None
+        if SCOREBOARD_WORKER_SOCKET:
+            self.ipc = ScoreboardIpcServer(SCOREBOARD_WORKER_SOCKET, self.handle_update)
+            self.bot.loop.create_task(self._start_ipc())
+        else:
+            self.scoreboard_loop.start()
+            self.bot.loop.create_task(self._run_initial_check())
+        if SHARD_IDS:
+            self.pending_feed_loop.start()
+
+    async def _start_ipc(self) -> None:
+        try:
+            await self.ipc.start()
+        except OSError as exc:
+            logger.error("Scoreboard worker socket not available: %s", exc)
 
     def cog_unload(self) -> None:
         self.scoreboard_loop.cancel()
+        self.pending_feed_loop.cancel()
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        if self.ipc is not None:
+            self.bot.loop.create_task(self.ipc.close())
 
     @app_commands.command(name="scoreboard", description="Configure scoreboard polling")
     @app_commands.describe(
-        type="Scoreboard type (ctfd or rctf)",
-        url="Scoreboard base URL",
+        type="Scoreboard platform",
+        url="Scoreboard base URL (JSON path: API URL with #items=...&name=...&score=...)",
         auth_token="Optional auth token",
         team="Team name to track (optional)",
         event_id="CTFtime event ID (required if multiple)",
+        window="Teams shown above and below each watched team",
+        bracket="Only rank teams in this bracket (CTFd bracket name or ID)",
     )
     @app_commands.choices(
         type=[
-            app_commands.Choice(name="CTFd", value="ctfd"),
-            app_commands.Choice(name="rCTF", value="rctf"),
+            app_commands.Choice(name=adapter.label, value=adapter.name)
+            for adapter in ADAPTERS.values()
         ]
     )
     @app_commands.default_permissions(administrator=True)
@@ -52,6 +124,8 @@ class ScoreboardCog(commands.Cog):
         auth_token: str | None = None,
         team: str | None = None,
         event_id: int | None = None,
+        window: app_commands.Range[int, 0, 10] | None = None,
+        bracket: str | None = None,
     ) -> None:
         if interaction.guild is None:
             await interaction.response.send_message(
@@ -111,6 +185,22 @@ class ScoreboardCog(commands.Cog):
             )
             return
 
+        adapter = get_adapter(type.value)
+        discover_text = ""
+        try:
+            url = await adapter.discover(url, auth_token)
+        except ValueError as exc:
+            await interaction.followup.send(
+                embed=build_simple_embed("Invalid scoreboard URL", str(exc))
+            )
+            return
+        except Exception as exc:
+            discover_text = f"\nWarning: scoreboard not readable yet ({exc})"
+
+        tracked = (team or SCOREBOARD_TEAM_NAME or "").strip()
+        previous = await self.repo.get_scoreboard_config(
+            interaction.guild.id, event.ctftime_event_id
+        )
         await self.repo.upsert_scoreboard_config(
             guild_id=interaction.guild.id,
             ctftime_event_id=event.ctftime_event_id,
@@ -119,7 +209,37 @@ class ScoreboardCog(commands.Cog):
             auth_token=auth_token,
             team_name=team or SCOREBOARD_TEAM_NAME,
             scoreboard_channel_id=scoreboard_channel_id,
+            window_size=window,
+            bracket=bracket.strip() if bracket else None,
         )
+        if previous is not None and previous.team_name:
+            # The tracked team is replaced, not added to the watchlist
+            old_key = normalize_team_name(previous.team_name.strip())
+            if not tracked or old_key != normalize_team_name(tracked):
+                await self.repo.remove_watched_team(
+                    interaction.guild.id, event.ctftime_event_id, old_key
+                )
+        self.config_changed(interaction.guild.id, event.ctftime_event_id)
+        if tracked:
+            await self.repo.add_watched_team(
+                interaction.guild.id,
+                event.ctftime_event_id,
+                normalize_team_name(tracked),
+                tracked,
+            )
+
+        backfill_text = ""
+        if adapter.capabilities.timeline and not discover_text:
+            config = await self.repo.get_scoreboard_config(
+                interaction.guild.id, event.ctftime_event_id
+            )
+            try:
+                backfilled = await self._backfill_history(config)
+            except Exception:
+                logger.info("CTFd history backfill unavailable for %s", url)
+            else:
+                if backfilled:
+                    backfill_text = f"\nHistory: backfilled {backfilled} score points"
 
         await interaction.followup.send(
             embed=build_simple_embed(
@@ -131,6 +251,9 @@ class ScoreboardCog(commands.Cog):
                         if (team or SCOREBOARD_TEAM_NAME)
                         else ""
                     )
+                    + (f"\nBracket: {bracket}" if bracket else "")
+                    + backfill_text
+                    + discover_text
                 ),
             )
         )
@@ -154,9 +277,20 @@ class ScoreboardCog(commands.Cog):
         lines = []
         for cfg in guild_configs:
             team_text = f", team={cfg.team_name}" if cfg.team_name else ""
+            if cfg.window_size is not None:
+                team_text += f", window=±{cfg.window_size}"
+            if cfg.bracket:
+                team_text += f", bracket={cfg.bracket}"
             lines.append(
                 f"{cfg.ctftime_event_id}: {cfg.type} ({cfg.url}{team_text})"
             )
+            watched = await self.repo.list_watched_teams(
+                cfg.guild_id, cfg.ctftime_event_id
+            )
+            if watched:
+                lines.append(
+                    "  watching: " + ", ".join(t.team_name for t in watched)
+                )
         await interaction.response.send_message(
             embed=build_simple_embed("Scoreboard configs", "\n".join(lines)),
         )
@@ -181,6 +315,7 @@ class ScoreboardCog(commands.Cog):
             )
             return
         await self.repo.delete_scoreboard_config(interaction.guild.id, event_id)
+        self.config_changed(interaction.guild.id, event_id)
         await interaction.response.send_message(
             embed=build_simple_embed(
                 "Scoreboard removed",
@@ -188,6 +323,189 @@ class ScoreboardCog(commands.Cog):
             )
         )
 
+    @app_commands.command(
+        name="scoreboard_watch", description="Add a team to the scoreboard watchlist"
+    )
+    @app_commands.describe(
+        team="Team name as shown on the scoreboard",
+        event_id="CTFtime event ID (required if multiple)",
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def scoreboard_watch(
+        self,
+        interaction: discord.Interaction,
+        team: str,
+        event_id: int | None = None,
+    ) -> None:
+        config = await self._resolve_config(interaction, event_id)
+        if config is None:
+            return
+        team = team.strip()[:100]
+        team_key = normalize_team_name(team)
+        if not team_key:
+            await interaction.response.send_message(
+                embed=build_simple_embed("Invalid team", "Team name cannot be empty."),
+                ephemeral=True,
+            )
+            return
+        await self.repo.add_watched_team(
+            config.guild_id, config.ctftime_event_id, team_key, team
+        )
+        await interaction.response.send_message(
+            embed=build_simple_embed(
+                "Team watched",
+                f"Watching **{team}** for event ID {config.ctftime_event_id}.",
+            )
+        )
+
+    @app_commands.command(
+        name="scoreboard_unwatch",
+        description="Remove a team from the scoreboard watchlist",
+    )
+    @app_commands.describe(
+        team="Team name to stop watching",
+        event_id="CTFtime event ID (required if multiple)",
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def scoreboard_unwatch(
+        self,
+        interaction: discord.Interaction,
+        team: str,
+        event_id: int | None = None,
+    ) -> None:
+        config = await self._resolve_config(interaction, event_id)
+        if config is None:
+            return
+        removed = await self.repo.remove_watched_team(
+            config.guild_id, config.ctftime_event_id, normalize_team_name(team)
+        )
+        if not removed:
+            await interaction.response.send_message(
+                embed=build_simple_embed(
+                    "Not watched", f"**{team}** is not on the watchlist."
+                ),
+                ephemeral=True,
+            )
+            return
+        await interaction.response.send_message(
+            embed=build_simple_embed(
+                "Team unwatched",
+                f"Stopped watching **{team}** for event ID {config.ctftime_event_id}.",
+            )
+        )
+
+    @app_commands.command(
+        name="scoreboard_export",
+        description="Download the recorded scoreboard history as an archive",
+    )
+    @app_commands.describe(event_id="CTFtime event ID (required if multiple)")
+    @app_commands.default_permissions(administrator=True)
+    async def scoreboard_export(
+        self, interaction: discord.Interaction, event_id: int | None = None
+    ) -> None:
+        config = await self._resolve_config(
+            interaction, event_id, action="export scoreboard history"
+        )
+        if config is None:
+            return
+        rows = await self.repo.list_scoreboard_history(
+            config.guild_id, config.ctftime_event_id
+        )
+        if not rows:
+            await interaction.response.send_message(
+                embed=build_simple_embed(
+                    "No history",
+                    f"No scoreboard history recorded for event ID {config.ctftime_event_id}.",
+                ),
+                ephemeral=True,
+            )
+            return
+        writer = ArchiveWriter()
+        snapshots = snapshots_from_history(rows)
+        for timestamp, entries, _ in snapshots:
+            writer.add(timestamp, entries)
+        estimated = sum(1 for _, _, observed in snapshots if not observed)
+        data = writer.to_bytes()
+        if len(data) > interaction.guild.filesize_limit:
+            await interaction.response.send_message(
+                embed=build_simple_embed(
+                    "Export too large",
+                    f"The archive is {len(data) / 1e6:.1f} MB, above this server's upload limit.",
+                ),
+                ephemeral=True,
+            )
+            return
+        await interaction.response.send_message(
+            embed=build_simple_embed(
+                "Scoreboard export",
+                f"{len(snapshots)} snapshots for event ID {config.ctftime_event_id}. "
+                "Read it with `scoreboard/archive.py show`."
+                + (
+                    f"\n{estimated} of them rank teams by score, so their "
+                    "positions are estimates (history recorded without positions)."
+                    if estimated
+                    else ""
+                ),
+            ),
+            file=discord.File(
+                io.BytesIO(data), filename=f"scoreboard-{config.ctftime_event_id}.sbar"
+            ),
+            ephemeral=True,
+        )
+
+    @scoreboard.autocomplete("event_id")
+    @scoreboard_remove.autocomplete("event_id")
+    @scoreboard_watch.autocomplete("event_id")
+    @scoreboard_unwatch.autocomplete("event_id")
+    @scoreboard_export.autocomplete("event_id")
+    async def _event_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[int]]:
+        return event_choices(self.index, interaction, current, joined_only=True)
+
+    async def _resolve_config(
+        self,
+        interaction: discord.Interaction,
+        event_id: int | None,
+        action: str = "change the watchlist",
+    ):
+        if interaction.guild is None:
+            await interaction.response.send_message(
+                embed=build_simple_embed("Guild only", "Use this in a server."),
+            )
+            return None
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message(
+                embed=build_simple_embed(
+                    "Admin only", f"Only admins can {action}."
+                ),
+                ephemeral=True,
+            )
+            return None
+        configs = [
+            c
+            for c in await self.repo.list_scoreboard_configs()
+            if c.guild_id == interaction.guild.id
+        ]
+        if event_id is not None:
+            configs = [c for c in configs if c.ctftime_event_id == event_id]
+        if not configs:
+            await interaction.response.send_message(
+                embed=build_simple_embed(
+                    "No config", "Configure the scoreboard first with /scoreboard."
+                ),
+            )
+            return None
+        if len(configs) > 1:
+            await interaction.response.send_message(
+                embed=build_simple_embed(
+                    "Need event ID",
+                    "Multiple scoreboards in this server. Please provide event_id.",
+                ),
+            )
+            return None
+        return configs[0]
+
     async def _run_initial_check(self) -> None:
         await self.bot.wait_until_ready()
         await self._run_scoreboard_checks()
@@ -197,100 +515,255 @@ class ScoreboardCog(commands.Cog):
         await self.bot.wait_until_ready()
         await self._run_scoreboard_checks()
 
+    @tasks.loop(seconds=_PENDING_FEED_SECONDS)
+    async def pending_feed_loop(self) -> None:
+        """Ingest feed updates the leader queued for this process's guilds."""
+        await self.bot.wait_until_ready()
+        for pending_id, guild_id, update_json in await self.repo.list_pending_feed_updates():
+            if self.bot.get_guild(guild_id) is None:
+                continue
+            try:
+                await self._ingest_ctfd_feed(decode_update(json.loads(update_json)))
+            except Exception:
+                # The feed state did not move, so the next poll queues it again
+                logger.exception("Ingesting a queued CTFd feed update failed")
+            await self.repo.delete_pending_feed_update(pending_id)
+
     async def _run_scoreboard_checks(self) -> None:
-        async with self._check_lock:
-            configs = await self.repo.list_scoreboard_configs()
+        # Only the leader polls, so boards are not polled once per process
+        if not self.leader.is_leader:
+            return
+        stats = FetchStats()
+        try:
+            await self.poller.poll(stats)
+        finally:
+            self._schedule_wakeup()
+            max_lag, _ = self.bot.loop_lag.reset()  # type: ignore[attr-defined]
+            if stats.requests:
+                logger.info(
+                    "Scoreboard poll: %d request(s), %d bytes, max loop lag %.0f ms",
+                    stats.requests,
+                    stats.bytes,
+                    max_lag * 1000,
+                )
 
-            for config in configs:
-                event = await self.repo.get_ctf_event(
-                    config.guild_id, config.ctftime_event_id
+    def config_changed(self, guild_id: int, ctftime_event_id: int) -> None:
+        self.registry.invalidate()
+        self.poller.forget(guild_id, ctftime_event_id)
+        if self.ipc is not None:
+            self.ipc.config_changed(guild_id, ctftime_event_id)
+
+    async def handle_update(self, update: ScoreboardUpdate) -> None:
+        """Render and send an update from the poller or the worker."""
+        if isinstance(update, RankUpdate):
+            embed = build_scoreboard_embed(
+                update.entries,
+                update.changes,
+                update.url,
+                top_n=SCOREBOARD_TOP_N,
+                watched=set(update.watched),
+                gaps=update.gaps,
+                bracket=update.bracket,
+            )
+            await self._send_to_scoreboard_channel(update.guild_id, update.channel_id, embed)
+        elif isinstance(update, SolveAlertsUpdate):
+            await self._send_to_scoreboard_channel(
+                update.guild_id,
+                update.channel_id,
+                build_solve_alerts_embed(update.alerts, update.url),
+            )
+        else:
+            await self._ingest_ctfd_feed(update)
+
+    def _schedule_wakeup(self) -> None:
+        """Poll again right at the next board start/finish if it comes before
+        the regular loop does."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        deadline = self.registry.next_deadline()
+        if deadline is None:
+            return
+        delay = (deadline - datetime.now(timezone.utc)).total_seconds()
+        if delay >= SCOREBOARD_POLL_SECONDS:
+            return
+        self._wakeup = asyncio.get_running_loop().call_later(
+            max(0.0, delay) + 0.1,
+            lambda: asyncio.ensure_future(self._run_scoreboard_checks()),
+        )
+
+    async def _ingest_ctfd_feed(self, update: FeedUpdate) -> None:
+        """Create threads for new CTFd challenges and close the ones we solved."""
+        guild = self.bot.get_guild(update.guild_id)
+        if guild is None:
+            if SHARD_IDS:
+                # Threads need the guild's gateway state; the process holding
+                # its shard picks this up from the queue
+                await self.repo.put_pending_feed_update(
+                    update.guild_id,
+                    update.ctftime_event_id,
+                    json.dumps(encode_update(update), ensure_ascii=False),
                 )
-                if not event:
-                    continue
-
-                if event.finish_time:
-                    try:
-                        finish = datetime.fromisoformat(event.finish_time)
-                        if datetime.now(timezone.utc) > finish:
-                            continue
-                    except ValueError:
-                        pass
-
-                try:
-                    if config.type == "ctfd":
-                        entries = await fetch_ctfd_scoreboard(
-                            config.url, config.auth_token
-                        )
-                    elif config.type == "rctf":
-                        entries = await fetch_rctf_scoreboard(
-                            config.url, config.auth_token
-                        )
-                    else:
-                        continue
-                except Exception:
-                    continue
-
-                tracked_team = config.team_name or SCOREBOARD_TEAM_NAME
-                tracked_entry = None
-                if tracked_team:
-                    lower_name = tracked_team.lower()
-                    for entry in entries:
-                        if entry["name"].lower() == lower_name:
-                            tracked_entry = entry
-                            break
-                    if tracked_entry is None:
-                        continue
-                    entries = [tracked_entry]
-
-                payload_hash = make_payload_hash(entries)
-                last_state = await self.repo.get_scoreboard_state(
-                    config.guild_id, config.ctftime_event_id
+            return
+        event = await self.repo.get_ctf_event(update.guild_id, update.ctftime_event_id)
+        if event is None:
+            return
+
+        state = await self.repo.get_ctfd_feed_state(
+            update.guild_id, update.ctftime_event_id
+        )
+        known_challenges = set(state.challenge_ids) if state else set()
+        known_solves = set(state.solve_ids) if state else set()
+        # The poller diffed against this state too; a worker update can
+        # arrive after the state moved on, so diff again
+        delta = diff_feed(
+            known_challenges, known_solves, update.new_challenges, update.new_solves
+        )
+        if not delta.new_challenges and not delta.new_solves:
+            return
+
+        linked = await self.repo.map_platform_challenges(
+            update.guild_id, update.ctftime_event_id
+        )
+        pending = [c for c in delta.new_challenges if int(c["id"]) not in linked]
+        if pending:
+            created = await self._import_feed_challenges(guild, event, pending, linked)
+            if created:
+                await self._send_to_scoreboard_channel(
+                    update.guild_id,
+                    update.channel_id,
+                    build_simple_embed(
+                        "Challenges imported",
+                        f"Created {created} challenge thread(s) from CTFd.",
+                    ),
                 )
-                if last_state and last_state.last_hash == payload_hash:
-                    continue
-
-                # Detect rank changes only
-                rank_changes = []
-                if last_state and last_state.last_payload:
-                    try:
-                        previous = json.loads(last_state.last_payload)
-                        prev_rank = {e["name"]: e["pos"] for e in previous}
-                        for entry in entries[:SCOREBOARD_TOP_N]:
-                            name = entry["name"]
-                            if name in prev_rank and prev_rank[name] != entry["pos"]:
-                                delta = prev_rank[name] - entry["pos"]
-                                direction = "up" if delta > 0 else "down"
-                                rank_changes.append(
-                                    (name, direction, entry["pos"], entry["score"], delta)
-                                )
-                    except Exception:
-                        rank_changes = []
-
-                # Update state regardless
-                await self.repo.upsert_scoreboard_state(
-                    config.guild_id,
-                    config.ctftime_event_id,
-                    payload_hash,
-                    json.dumps(entries, ensure_ascii=False),
+        known_challenges.update(
+            int(c["id"]) for c in delta.new_challenges if int(c["id"]) in linked
+        )
+
+        for solve in delta.new_solves:
+            thread_id = linked.get(int(solve["challenge_id"]))
+            if thread_id is None:
+                continue
+            known_solves.add(int(solve["id"]))
+            challenge = await self.repo.get_challenge_by_thread(thread_id)
+            if challenge is None or challenge.status == "done":
+                continue
+            await self.repo.mark_challenge_done(thread_id, [])
+            thread = guild.get_thread(thread_id)
+            if thread is None:
+                continue
+            try:
+                if not thread.name.upper().startswith("[DONE]"):
+                    await thread.edit(name=f"[DONE] {challenge.challenge_name}"[:100])
+                await thread.send(
+                    embed=build_simple_embed(
+                        "Challenge Solved!",
+                        f"**{challenge.challenge_name}** was solved on CTFd.",
+                    )
                 )
+            except discord.HTTPException:
+                pass
 
-                # Only notify when there are rank changes
-                if not rank_changes:
-                    continue
+        await self.repo.upsert_ctfd_feed_state(
+            update.guild_id, update.ctftime_event_id, known_challenges, known_solves
+        )
 
-                changes = [
-                    f"{name} {direction} to {pos} ({score})"
-                    for name, direction, pos, score, _ in rank_changes
-                ]
+    async def _import_feed_challenges(
+        self,
+        guild: discord.Guild,
+        event: CtfEvent,
+        challenges: list[dict],
+        linked: dict[int, int],
+    ) -> int:
+        """Link or create threads for challenges; updates linked in place."""
+        existing = {
+            (c.challenge_name.lower(), c.category.lower()): c.thread_id
+            for c in await self.repo.list_challenges(
+                guild.id, event.ctftime_event_id
+            )
+        }
+        links: list[tuple[int, int]] = []
+        to_create: list[tuple[dict, str, str, discord.TextChannel]] = []
+        for chall in challenges:
+            name = str(chall["name"]).strip().replace("\n", " ")[:100]
+            topic = topic_for_category(chall.get("category"))
+            thread_id = existing.get((name.lower(), topic.lower()))
+            if thread_id is not None:
+                links.append((thread_id, int(chall["id"])))
+                linked[int(chall["id"])] = thread_id
+                continue
+            channel = guild.get_channel(event.channels.get(topic) or 0)
+            if not isinstance(channel, discord.TextChannel):
+                continue
+            to_create.append((chall, name, topic, channel))
+        await self.repo.link_platform_challenges(links)
 
-                channel = self.bot.get_channel(config.scoreboard_channel_id)
-                if isinstance(channel, discord.TextChannel):
-                    embed = build_scoreboard_embed(
-                        entries, changes, config.url, top_n=SCOREBOARD_TOP_N
+        semaphore = asyncio.Semaphore(_FEED_THREAD_CONCURRENCY)
+
+        async def create(
+            chall: dict, name: str, topic: str, channel: discord.TextChannel
+        ) -> tuple:
+            async with semaphore:
+                thread = await channel.create_thread(
+                    name=name, type=discord.ChannelType.public_thread
+                )
+                await thread.send(
+                    embed=build_simple_embed(
+                        f"Challenge: {name}",
+                        f"**CTF:** {event.event_title}\n"
+                        f"**Category:** {topic} ({chall.get('category') or 'N/A'})\n"
+                        f"**Points:** {chall.get('value', 'N/A')}\n"
+                        f"**Status:** Open\n\n"
+                        f"Imported from CTFd. When solved, an admin will use `/done` here.",
                     )
-                    await channel.send(embed=embed)
+                )
+            return (
+                guild.id,
+                event.ctftime_event_id,
+                name,
+                topic,
+                thread.id,
+                channel.id,
+                int(chall["id"]),
+            )
+
+        results = await asyncio.gather(
+            *(create(*item) for item in to_create), return_exceptions=True
+        )
+        rows = [row for row in results if isinstance(row, tuple)]
+        await self.repo.create_challenges(rows)
+        for row in rows:
+            linked[row[6]] = row[4]
+        return len(rows)
+
+    async def _send_to_scoreboard_channel(
+        self, guild_id: int, channel_id: int, embed: discord.Embed
+    ) -> None:
+        channel = self.bot.get_channel(channel_id)
+        if isinstance(channel, discord.TextChannel):
+            await channel.send(embed=embed)
+        elif channel is None and self.bot.get_guild(guild_id) is None:
+            # The guild is on another process's shards; REST sends do not
+            # need its gateway connection
+            await self.bot.get_partial_messageable(channel_id, guild_id=guild_id).send(
+                embed=embed
+            )
+
+    async def _backfill_history(self, config: ScoreboardConfig) -> int:
+        """Seed the history store from the CTFd top-N timeline in one request."""
+        rows = await fetch_ctfd_score_timeline(
+            config.url, config.auth_token, count=SCOREBOARD_TOP_N
+        )
+        # The timeline has scores only; positions stay unknown
+        return await self.repo.add_scoreboard_history(
+            config.guild_id, config.ctftime_event_id, [(*row, None) for row in rows]
+        )
 
 
 async def setup(bot: commands.Bot) -> None:
     repo: Repository = bot.repo  # type: ignore[attr-defined]
-    await bot.add_cog(ScoreboardCog(bot, repo))
+    registry: ScoreboardRegistry = bot.scoreboard_registry  # type: ignore[attr-defined]
+    index: EventIndex = bot.event_index  # type: ignore[attr-defined]
+    leader: LeaderLease = bot.leader  # type: ignore[attr-defined]
+    await bot.add_cog(ScoreboardCog(bot, repo, registry, index, leader))
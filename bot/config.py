@@ -21,4 +21,32 @@ SCOREBOARD_TOP_N = int(_get_env("SCOREBOARD_TOP_N", "10"))
 TIMEZONE = _get_env("TIMEZONE", "UTC+7")
 CTF_REMOVE_PASSWORD = _get_env("CTF_REMOVE_PASSWORD")
 SCOREBOARD_TEAM_NAME = _get_env("SCOREBOARD_TEAM_NAME")
-
+SCOREBOARD_WINDOW = int(_get_env("SCOREBOARD_WINDOW", "2"))
+SCOREBOARD_HOT_SOLVES = int(_get_env("SCOREBOARD_HOT_SOLVES", "3"))
+SCOREBOARD_FULL_EVERY = int(_get_env("SCOREBOARD_FULL_EVERY", "10"))
+
+SCOREBOARD_OFFLOAD_BYTES = int(_get_env("SCOREBOARD_OFFLOAD_BYTES", "262144"))
+SCOREBOARD_OFFLOAD_POOL = (_get_env("SCOREBOARD_OFFLOAD_POOL", "process") or "process").lower()
+LOOP_LAG_WARN_MS = int(_get_env("LOOP_LAG_WARN_MS", "250"))
+
+CTFTIME_EVENT_TTL = int(_get_env("CTFTIME_EVENT_TTL", "3600"))
+CTFTIME_STALE_SECONDS = int(_get_env("CTFTIME_STALE_SECONDS", "86400"))
+CTFTIME_CACHE_PATH = _get_env("CTFTIME_CACHE_PATH", "ctftime_cache.json")
+CTFTIME_SYNC_MINUTES = int(_get_env("CTFTIME_SYNC_MINUTES", "30"))
+CTFTIME_SYNC_WINDOW_DAYS = int(_get_env("CTFTIME_SYNC_WINDOW_DAYS", "180"))
+CTFTIME_SYNC_LIMIT = int(_get_env("CTFTIME_SYNC_LIMIT", "500"))
+
+AUDIT_LOG_FLUSH_SECONDS = float(_get_env("AUDIT_LOG_FLUSH_SECONDS", "2"))
+AUDIT_LOG_MAX_PENDING = int(_get_env("AUDIT_LOG_MAX_PENDING", "200"))
+RECONCILE_CONCURRENCY = int(_get_env("RECONCILE_CONCURRENCY", "8"))
+# Delete challenges whose thread is gone at startup instead of only reporting them
+RECONCILE_REMOVE_STALE = (_get_env("RECONCILE_REMOVE_STALE", "false") or "").lower() == "true"
+
+# Unset: one gateway connection. "auto" or a number: AutoShardedBot
+SHARD_COUNT = _get_env("SHARD_COUNT")
+# Comma-separated shards for this process when several processes split them
+SHARD_IDS = _get_env("SHARD_IDS")
+LEADER_LEASE_SECONDS = float(_get_env("LEADER_LEASE_SECONDS", "30"))
+
+# Unix socket shared with `python -m bot.scoreboard_worker`; unset polls in the bot
+SCOREBOARD_WORKER_SOCKET = _get_env("SCOREBOARD_WORKER_SOCKET")
@@ -2,6 +2,8 @@ import re
 
 import aiosqlite
 
+from bot.db.payload_codec import encode_payload
+
 _SAFE_IDENTIFIER = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
 
 
@@ -32,6 +34,8 @@ CREATE TABLE IF NOT EXISTS scoreboard_config (
   auth_token TEXT,
   team_name TEXT,
   scoreboard_channel_id INTEGER NOT NULL,
+  window_size INTEGER,
+  bracket TEXT,
   PRIMARY KEY (guild_id, ctftime_event_id)
 );
 
@@ -39,11 +43,32 @@ CREATE TABLE IF NOT EXISTS scoreboard_state (
   guild_id INTEGER NOT NULL,
   ctftime_event_id INTEGER NOT NULL,
   last_hash TEXT,
-  last_payload TEXT,
+  last_payload BLOB,
   updated_at TEXT NOT NULL,
   PRIMARY KEY (guild_id, ctftime_event_id)
 );
 
+CREATE TABLE IF NOT EXISTS scoreboard_watchlist (
+  guild_id INTEGER NOT NULL,
+  ctftime_event_id INTEGER NOT NULL,
+  team_key TEXT NOT NULL,
+  team_name TEXT NOT NULL,
+  platform_id TEXT,
+  PRIMARY KEY (guild_id, ctftime_event_id, team_key)
+);
+
+CREATE TABLE IF NOT EXISTS scoreboard_history (
+  guild_id INTEGER NOT NULL,
+  ctftime_event_id INTEGER NOT NULL,
+  team_id TEXT NOT NULL,
+  team_name TEXT NOT NULL,
+  score REAL NOT NULL,
+  recorded_at TEXT NOT NULL,
+  -- Position seen on the board; NULL for backfilled and older points
+  pos INTEGER,
+  PRIMARY KEY (guild_id, ctftime_event_id, team_id, recorded_at)
+);
+
 CREATE TABLE IF NOT EXISTS challenges (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   guild_id INTEGER NOT NULL,
@@ -56,9 +81,29 @@ CREATE TABLE IF NOT EXISTS challenges (
   solved_by TEXT,
   created_at TEXT NOT NULL,
   solved_at TEXT,
+  platform_challenge_id INTEGER,
   FOREIGN KEY (guild_id, ctftime_event_id) REFERENCES ctf_events(guild_id, ctftime_event_id)
 );
 
+CREATE TABLE IF NOT EXISTS ctfd_feed_state (
+  guild_id INTEGER NOT NULL,
+  ctftime_event_id INTEGER NOT NULL,
+  challenge_ids_json TEXT NOT NULL,
+  solve_ids_json TEXT NOT NULL,
+  updated_at TEXT NOT NULL,
+  PRIMARY KEY (guild_id, ctftime_event_id)
+);
+
+-- Feed updates for guilds on another process's shards, newest per event
+CREATE TABLE IF NOT EXISTS ctfd_feed_pending (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  guild_id INTEGER NOT NULL,
+  ctftime_event_id INTEGER NOT NULL,
+  update_json TEXT NOT NULL,
+  created_at TEXT NOT NULL,
+  UNIQUE (guild_id, ctftime_event_id)
+);
+
 CREATE TABLE IF NOT EXISTS message_events (
   message_id INTEGER PRIMARY KEY,
   guild_id INTEGER NOT NULL,
@@ -67,11 +112,39 @@ CREATE TABLE IF NOT EXISTS message_events (
   created_at TEXT NOT NULL
 );
 
+CREATE TABLE IF NOT EXISTS ctftime_events (
+  ctftime_event_id INTEGER PRIMARY KEY,
+  title TEXT NOT NULL,
+  format TEXT,
+  weight REAL,
+  onsite INTEGER NOT NULL,
+  start_ts INTEGER NOT NULL,
+  finish_ts INTEGER NOT NULL,
+  payload_json TEXT NOT NULL,
+  payload_hash TEXT NOT NULL,
+  updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS leader_lease (
+  name TEXT PRIMARY KEY,
+  holder TEXT NOT NULL,
+  expires_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_ctf_events_finish_time
+  ON ctf_events(finish_time);
+
 CREATE INDEX IF NOT EXISTS idx_message_events_guild_user
   ON message_events(guild_id, user_id);
 
 CREATE INDEX IF NOT EXISTS idx_message_events_guild_channel_user
   ON message_events(guild_id, channel_id, user_id);
+
+CREATE INDEX IF NOT EXISTS idx_ctftime_events_start
+  ON ctftime_events(start_ts);
+
+CREATE INDEX IF NOT EXISTS idx_ctftime_events_format_start
+  ON ctftime_events(format, start_ts);
 """
 
 
@@ -191,7 +264,7 @@ async def _migrate_scoreboard_state(db: aiosqlite.Connection) -> None:
           guild_id INTEGER NOT NULL,
           ctftime_event_id INTEGER NOT NULL,
           last_hash TEXT,
-          last_payload TEXT,
+          last_payload BLOB,
           updated_at TEXT NOT NULL,
           PRIMARY KEY (guild_id, ctftime_event_id)
         )
@@ -211,6 +284,27 @@ async def _migrate_scoreboard_state(db: aiosqlite.Connection) -> None:
     await db.execute("ALTER TABLE scoreboard_state_new RENAME TO scoreboard_state")
 
 
+async def _migrate_scoreboard_payloads(db: aiosqlite.Connection) -> None:
+    """Compress last_payload rows still stored as JSON text."""
+    cursor = await db.execute(
+        """
+        SELECT guild_id, ctftime_event_id, last_payload FROM scoreboard_state
+        WHERE typeof(last_payload) = 'text'
+        """
+    )
+    rows = await cursor.fetchall()
+    await cursor.close()
+    if not rows:
+        return
+    await db.executemany(
+        "UPDATE scoreboard_state SET last_payload=? WHERE guild_id=? AND ctftime_event_id=?",
+        [(encode_payload(payload), guild_id, event_id) for guild_id, event_id, payload in rows],
+    )
+    await db.commit()
+    # One-off: give the space of the old text rows back to the filesystem
+    await db.execute("VACUUM")
+
+
 async def init_db(db_path: str) -> None:
     async with aiosqlite.connect(db_path) as db:
         await _migrate_ctf_events(db)
@@ -218,4 +312,9 @@ async def init_db(db_path: str) -> None:
         await _migrate_scoreboard_state(db)
         await db.executescript(SCHEMA)
         await _ensure_column(db, "scoreboard_config", "team_name", "TEXT")
+        await _ensure_column(db, "scoreboard_config", "window_size", "INTEGER")
+        await _ensure_column(db, "scoreboard_config", "bracket", "TEXT")
+        await _ensure_column(db, "challenges", "platform_challenge_id", "INTEGER")
+        await _ensure_column(db, "scoreboard_history", "pos", "INTEGER")
         await db.commit()
+        await _migrate_scoreboard_payloads(db)
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import zlib
+
+
+# Stored payload layout: one format version byte, then the body.
+# Version 1: the JSON text, UTF-8 encoded and zlib-compressed.
+PAYLOAD_FORMAT_ZLIB = 1
+
+_ZLIB_LEVEL = 6
+
+
+def encode_payload(text: str | None) -> bytes | None:
+    if text is None:
+        return None
+    return bytes([PAYLOAD_FORMAT_ZLIB]) + zlib.compress(text.encode("utf-8"), _ZLIB_LEVEL)
+
+
+def decode_payload(value: bytes | str | None) -> str | None:
+    """Decode a stored payload; plain text rows from before compression pass through."""
+    if value is None or isinstance(value, str):
+        return value
+    if not value:
+        return None
+    version = value[0]
+    if version == PAYLOAD_FORMAT_ZLIB:
+        return zlib.decompress(value[1:]).decode("utf-8")
+    raise ValueError(f"Unknown scoreboard payload format: {version}")
@@ -1,9 +1,13 @@
+import hashlib
 import json
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
 import aiosqlite
 
+from bot.db.payload_codec import decode_payload, encode_payload
+
 
 @dataclass
 class CtfEvent:
@@ -17,6 +21,18 @@ class CtfEvent:
     created_at: str
 
 
+@dataclass
+class CtftimeEvent:
+    ctftime_event_id: int
+    title: str
+    format: str | None
+    weight: float | None
+    onsite: bool
+    start_ts: int
+    finish_ts: int
+    payload: dict
+
+
 @dataclass
 class ScoreboardConfig:
     guild_id: int
@@ -26,6 +42,8 @@ class ScoreboardConfig:
     auth_token: str | None
     team_name: str | None
     scoreboard_channel_id: int
+    window_size: int | None = None
+    bracket: str | None = None
 
 
 @dataclass
@@ -37,6 +55,30 @@ class ScoreboardState:
     updated_at: str
 
 
+@dataclass
+class ScoreboardBoard:
+    config: ScoreboardConfig
+    event: CtfEvent
+
+
+@dataclass
+class WatchedTeam:
+    guild_id: int
+    ctftime_event_id: int
+    team_key: str
+    team_name: str
+    platform_id: str | None
+
+
+@dataclass
+class CtfdFeedState:
+    guild_id: int
+    ctftime_event_id: int
+    challenge_ids: set[int]
+    solve_ids: set[int]
+    updated_at: str
+
+
 @dataclass
 class Challenge:
     id: int
@@ -178,6 +220,26 @@ class Repository:
             for row in rows
         ]
 
+    async def list_joined_event_titles(self) -> list[tuple[int, int, str]]:
+        """(guild_id, ctftime_event_id, event_title) across all guilds."""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                "SELECT guild_id, ctftime_event_id, event_title FROM ctf_events"
+            )
+            rows = await cursor.fetchall()
+            await cursor.close()
+        return [(row[0], row[1], row[2]) for row in rows]
+
+    async def list_event_categories(self) -> list[tuple[int, int, str, int]]:
+        """(guild_id, ctftime_event_id, event_title, category_id) across all guilds."""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                "SELECT guild_id, ctftime_event_id, event_title, category_id FROM ctf_events"
+            )
+            rows = await cursor.fetchall()
+            await cursor.close()
+        return [(row[0], row[1], row[2], row[3]) for row in rows]
+
     async def delete_ctf_event(self, guild_id: int, ctftime_event_id: int) -> None:
         async with aiosqlite.connect(self.db_path) as db:
             await db.execute(
@@ -192,6 +254,22 @@ class Repository:
                 "DELETE FROM scoreboard_config WHERE guild_id=? AND ctftime_event_id=?",
                 (guild_id, ctftime_event_id),
             )
+            await db.execute(
+                "DELETE FROM scoreboard_watchlist WHERE guild_id=? AND ctftime_event_id=?",
+                (guild_id, ctftime_event_id),
+            )
+            await db.execute(
+                "DELETE FROM ctfd_feed_state WHERE guild_id=? AND ctftime_event_id=?",
+                (guild_id, ctftime_event_id),
+            )
+            await db.execute(
+                "DELETE FROM ctfd_feed_pending WHERE guild_id=? AND ctftime_event_id=?",
+                (guild_id, ctftime_event_id),
+            )
+            await db.execute(
+                "DELETE FROM scoreboard_history WHERE guild_id=? AND ctftime_event_id=?",
+                (guild_id, ctftime_event_id),
+            )
             await db.execute(
                 "DELETE FROM ctf_events WHERE guild_id=? AND ctftime_event_id=?",
                 (guild_id, ctftime_event_id),
@@ -207,19 +285,23 @@ class Repository:
         auth_token: str | None,
         team_name: str | None,
         scoreboard_channel_id: int,
+        window_size: int | None = None,
+        bracket: str | None = None,
     ) -> None:
         async with aiosqlite.connect(self.db_path) as db:
             await db.execute(
                 """
                 INSERT INTO scoreboard_config
-                  (guild_id, ctftime_event_id, type, url, auth_token, team_name, scoreboard_channel_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                  (guild_id, ctftime_event_id, type, url, auth_token, team_name, scoreboard_channel_id, window_size, bracket)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(guild_id, ctftime_event_id) DO UPDATE SET
                   type=excluded.type,
                   url=excluded.url,
                   auth_token=excluded.auth_token,
                   team_name=excluded.team_name,
-                  scoreboard_channel_id=excluded.scoreboard_channel_id
+                  scoreboard_channel_id=excluded.scoreboard_channel_id,
+                  window_size=excluded.window_size,
+                  bracket=excluded.bracket
                 """,
                 (
                     guild_id,
@@ -229,6 +311,8 @@ class Repository:
                     auth_token,
                     team_name,
                     scoreboard_channel_id,
+                    window_size,
+                    bracket,
                 ),
             )
             await db.commit()
@@ -239,7 +323,7 @@ class Repository:
         async with aiosqlite.connect(self.db_path) as db:
             cursor = await db.execute(
                 """
-                SELECT guild_id, ctftime_event_id, type, url, auth_token, team_name, scoreboard_channel_id
+                SELECT guild_id, ctftime_event_id, type, url, auth_token, team_name, scoreboard_channel_id, window_size, bracket
                 FROM scoreboard_config WHERE guild_id=? AND ctftime_event_id=?
                 """,
                 (guild_id, ctftime_event_id),
@@ -256,13 +340,15 @@ class Repository:
             auth_token=row[4],
             team_name=row[5],
             scoreboard_channel_id=row[6],
+            window_size=row[7],
+            bracket=row[8],
         )
 
     async def list_scoreboard_configs(self) -> list[ScoreboardConfig]:
         async with aiosqlite.connect(self.db_path) as db:
             cursor = await db.execute(
                 """
-                SELECT guild_id, ctftime_event_id, type, url, auth_token, team_name, scoreboard_channel_id
+                SELECT guild_id, ctftime_event_id, type, url, auth_token, team_name, scoreboard_channel_id, window_size, bracket
                 FROM scoreboard_config
                 """
             )
@@ -277,6 +363,53 @@ class Repository:
                 auth_token=row[4],
                 team_name=row[5],
                 scoreboard_channel_id=row[6],
+                window_size=row[7],
+                bracket=row[8],
+            )
+            for row in rows
+        ]
+
+    async def list_unfinished_scoreboards(self, now_iso: str) -> list[ScoreboardBoard]:
+        """Configs joined with their event, skipping events that finished before now."""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                """
+                SELECT sc.guild_id, sc.ctftime_event_id, sc.type, sc.url, sc.auth_token,
+                       sc.team_name, sc.scoreboard_channel_id, sc.window_size, sc.bracket,
+                       ce.event_title, ce.category_id, ce.channels_json,
+                       ce.start_time, ce.finish_time, ce.created_at
+                FROM scoreboard_config sc
+                JOIN ctf_events ce
+                  ON ce.guild_id = sc.guild_id AND ce.ctftime_event_id = sc.ctftime_event_id
+                WHERE ce.finish_time IS NULL OR ce.finish_time > ?
+                """,
+                (now_iso,),
+            )
+            rows = await cursor.fetchall()
+            await cursor.close()
+        return [
+            ScoreboardBoard(
+                config=ScoreboardConfig(
+                    guild_id=row[0],
+                    ctftime_event_id=row[1],
+                    type=row[2],
+                    url=row[3],
+                    auth_token=row[4],
+                    team_name=row[5],
+                    scoreboard_channel_id=row[6],
+                    window_size=row[7],
+                    bracket=row[8],
+                ),
+                event=CtfEvent(
+                    guild_id=row[0],
+                    ctftime_event_id=row[1],
+                    event_title=row[9],
+                    category_id=row[10],
+                    channels=json.loads(row[11]),
+                    start_time=row[12],
+                    finish_time=row[13],
+                    created_at=row[14],
+                ),
             )
             for row in rows
         ]
@@ -291,6 +424,18 @@ class Repository:
                 "DELETE FROM scoreboard_state WHERE guild_id=? AND ctftime_event_id=?",
                 (guild_id, ctftime_event_id),
             )
+            await db.execute(
+                "DELETE FROM scoreboard_watchlist WHERE guild_id=? AND ctftime_event_id=?",
+                (guild_id, ctftime_event_id),
+            )
+            await db.execute(
+                "DELETE FROM ctfd_feed_state WHERE guild_id=? AND ctftime_event_id=?",
+                (guild_id, ctftime_event_id),
+            )
+            await db.execute(
+                "DELETE FROM ctfd_feed_pending WHERE guild_id=? AND ctftime_event_id=?",
+                (guild_id, ctftime_event_id),
+            )
             await db.commit()
 
     async def upsert_scoreboard_state(
@@ -311,7 +456,13 @@ class Repository:
                   last_payload=excluded.last_payload,
                   updated_at=excluded.updated_at
                 """,
-                (guild_id, ctftime_event_id, last_hash, last_payload, updated_at),
+                (
+                    guild_id,
+                    ctftime_event_id,
+                    last_hash,
+                    encode_payload(last_payload),
+                    updated_at,
+                ),
             )
             await db.commit()
 
@@ -334,10 +485,405 @@ class Repository:
             guild_id=row[0],
             ctftime_event_id=row[1],
             last_hash=row[2],
-            last_payload=row[3],
+            last_payload=decode_payload(row[3]),
+            updated_at=row[4],
+        )
+
+    async def add_scoreboard_history(
+        self,
+        guild_id: int,
+        ctftime_event_id: int,
+        rows: list[tuple[str, str, float, str, int | None]],
+    ) -> int:
+        """Insert (team_id, team_name, score, recorded_at, pos) points in one transaction."""
+        if not rows:
+            return 0
+        async with aiosqlite.connect(self.db_path) as db:
+            before = db.total_changes
+            await db.executemany(
+                """
+                INSERT OR IGNORE INTO scoreboard_history
+                  (guild_id, ctftime_event_id, team_id, team_name, score, recorded_at, pos)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(guild_id, ctftime_event_id, *row) for row in rows],
+            )
+            await db.commit()
+            return db.total_changes - before
+
+    async def list_scoreboard_history(
+        self, guild_id: int, ctftime_event_id: int
+    ) -> list[tuple[str, str, float, str, int | None]]:
+        """(team_id, team_name, score, recorded_at, pos) points, oldest first."""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                """
+                SELECT team_id, team_name, score, recorded_at, pos
+                FROM scoreboard_history
+                WHERE guild_id=? AND ctftime_event_id=?
+                ORDER BY recorded_at
+                """,
+                (guild_id, ctftime_event_id),
+            )
+            rows = await cursor.fetchall()
+            await cursor.close()
+        return [(row[0], row[1], row[2], row[3], row[4]) for row in rows]
+
+    # ── Scoreboard watchlist ─────────────────────────────────────────
+
+    async def add_watched_team(
+        self,
+        guild_id: int,
+        ctftime_event_id: int,
+        team_key: str,
+        team_name: str,
+    ) -> None:
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute(
+                """
+                INSERT INTO scoreboard_watchlist
+                  (guild_id, ctftime_event_id, team_key, team_name, platform_id)
+                VALUES (?, ?, ?, ?, NULL)
+                ON CONFLICT(guild_id, ctftime_event_id, team_key) DO UPDATE SET
+                  team_name=excluded.team_name
+                """,
+                (guild_id, ctftime_event_id, team_key, team_name),
+            )
+            await db.commit()
+
+    async def remove_watched_team(
+        self, guild_id: int, ctftime_event_id: int, team_key: str
+    ) -> bool:
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                """
+                DELETE FROM scoreboard_watchlist
+                WHERE guild_id=? AND ctftime_event_id=? AND team_key=?
+                """,
+                (guild_id, ctftime_event_id, team_key),
+            )
+            await db.commit()
+            return cursor.rowcount > 0
+
+    async def list_watched_teams(
+        self, guild_id: int, ctftime_event_id: int
+    ) -> list[WatchedTeam]:
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                """
+                SELECT guild_id, ctftime_event_id, team_key, team_name, platform_id
+                FROM scoreboard_watchlist
+                WHERE guild_id=? AND ctftime_event_id=?
+                ORDER BY team_name ASC
+                """,
+                (guild_id, ctftime_event_id),
+            )
+            rows = await cursor.fetchall()
+            await cursor.close()
+        return [
+            WatchedTeam(
+                guild_id=row[0],
+                ctftime_event_id=row[1],
+                team_key=row[2],
+                team_name=row[3],
+                platform_id=row[4],
+            )
+            for row in rows
+        ]
+
+    async def set_watched_team_ids(
+        self,
+        guild_id: int,
+        ctftime_event_id: int,
+        resolved: list[tuple[str, str]],
+    ) -> None:
+        """Store platform IDs for watched teams, given (team_key, platform_id) pairs."""
+        if not resolved:
+            return
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany(
+                """
+                UPDATE scoreboard_watchlist SET platform_id=?
+                WHERE guild_id=? AND ctftime_event_id=? AND team_key=?
+                """,
+                [
+                    (platform_id, guild_id, ctftime_event_id, team_key)
+                    for team_key, platform_id in resolved
+                ],
+            )
+            await db.commit()
+
+    # ── CTFd feed ingestion ──────────────────────────────────────────
+
+    async def get_ctfd_feed_state(
+        self, guild_id: int, ctftime_event_id: int
+    ) -> CtfdFeedState | None:
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                """
+                SELECT guild_id, ctftime_event_id, challenge_ids_json, solve_ids_json, updated_at
+                FROM ctfd_feed_state WHERE guild_id=? AND ctftime_event_id=?
+                """,
+                (guild_id, ctftime_event_id),
+            )
+            row = await cursor.fetchone()
+            await cursor.close()
+        if not row:
+            return None
+        return CtfdFeedState(
+            guild_id=row[0],
+            ctftime_event_id=row[1],
+            challenge_ids=set(json.loads(row[2])),
+            solve_ids=set(json.loads(row[3])),
             updated_at=row[4],
         )
 
+    async def upsert_ctfd_feed_state(
+        self,
+        guild_id: int,
+        ctftime_event_id: int,
+        challenge_ids: set[int],
+        solve_ids: set[int],
+    ) -> None:
+        updated_at = _utc_now_iso()
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute(
+                """
+                INSERT INTO ctfd_feed_state
+                  (guild_id, ctftime_event_id, challenge_ids_json, solve_ids_json, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(guild_id, ctftime_event_id) DO UPDATE SET
+                  challenge_ids_json=excluded.challenge_ids_json,
+                  solve_ids_json=excluded.solve_ids_json,
+                  updated_at=excluded.updated_at
+                """,
+                (
+                    guild_id,
+                    ctftime_event_id,
+                    json.dumps(sorted(challenge_ids)),
+                    json.dumps(sorted(solve_ids)),
+                    updated_at,
+                ),
+            )
+            await db.commit()
+
+    async def put_pending_feed_update(
+        self, guild_id: int, ctftime_event_id: int, update_json: str
+    ) -> None:
+        """Queue a feed update for the process that holds the guild.
+
+        Each update carries everything not ingested yet, so a newer one
+        replaces the queued one (and gets a new ID).
+        """
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute(
+                """
+                INSERT OR REPLACE INTO ctfd_feed_pending
+                  (guild_id, ctftime_event_id, update_json, created_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (guild_id, ctftime_event_id, update_json, _utc_now_iso()),
+            )
+            await db.commit()
+
+    async def list_pending_feed_updates(self) -> list[tuple[int, int, str]]:
+        """(id, guild_id, update_json) of every queued feed update, oldest first."""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                "SELECT id, guild_id, update_json FROM ctfd_feed_pending ORDER BY id"
+            )
+            rows = await cursor.fetchall()
+            await cursor.close()
+        return [(row[0], row[1], row[2]) for row in rows]
+
+    async def delete_pending_feed_update(self, pending_id: int) -> None:
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("DELETE FROM ctfd_feed_pending WHERE id=?", (pending_id,))
+            await db.commit()
+
+    # ── CTFtime mirror ───────────────────────────────────────────────
+
+    async def sync_ctftime_events(
+        self,
+        events: list[CtftimeEvent],
+        window: tuple[int, int] | None,
+        prune_before: int,
+    ) -> tuple[int, int]:
+        """Upsert events whose payload changed, in one transaction.
+
+        window is the (start, finish) range events were listed for, when the
+        listing was complete: mirrored events starting in it that are no
+        longer listed are deleted. Events that finished before prune_before
+        are dropped. Returns (changed, removed) row counts.
+        """
+        updated_at = _utc_now_iso()
+        rows = []
+        for event in events:
+            payload_json = json.dumps(event.payload, ensure_ascii=False, sort_keys=True)
+            rows.append(
+                (
+                    event.ctftime_event_id,
+                    event.title,
+                    event.format,
+                    event.weight,
+                    int(event.onsite),
+                    event.start_ts,
+                    event.finish_ts,
+                    payload_json,
+                    hashlib.sha1(payload_json.encode("utf-8")).hexdigest(),
+                    updated_at,
+                )
+            )
+        async with aiosqlite.connect(self.db_path) as db:
+            before = db.total_changes
+            await db.executemany(
+                """
+                INSERT INTO ctftime_events
+                  (ctftime_event_id, title, format, weight, onsite, start_ts, finish_ts,
+                   payload_json, payload_hash, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ctftime_event_id) DO UPDATE SET
+                  title=excluded.title,
+                  format=excluded.format,
+                  weight=excluded.weight,
+                  onsite=excluded.onsite,
+                  start_ts=excluded.start_ts,
+                  finish_ts=excluded.finish_ts,
+                  payload_json=excluded.payload_json,
+                  payload_hash=excluded.payload_hash,
+                  updated_at=excluded.updated_at
+                WHERE ctftime_events.payload_hash != excluded.payload_hash
+                """,
+                rows,
+            )
+            changed = db.total_changes - before
+            if window is not None:
+                await db.execute(
+                    """
+                    DELETE FROM ctftime_events
+                    WHERE start_ts BETWEEN ? AND ?
+                      AND ctftime_event_id NOT IN (SELECT value FROM json_each(?))
+                    """,
+                    (*window, json.dumps([row[0] for row in rows])),
+                )
+            await db.execute(
+                "DELETE FROM ctftime_events WHERE finish_ts < ?", (prune_before,)
+            )
+            await db.commit()
+            removed = db.total_changes - before - changed
+        return changed, removed
+
+    async def query_ctftime_events(
+        self,
+        start_from: int,
+        start_to: int | None = None,
+        event_format: str | None = None,
+        min_weight: float | None = None,
+        max_weight: float | None = None,
+        onsite: bool | None = None,
+        limit: int = 50,
+        after: tuple[int, int] | None = None,
+    ) -> list[CtftimeEvent]:
+        """Mirrored events starting in a range, soonest first.
+
+        after is the (start_ts, ctftime_event_id) of the last event of the
+        previous page; the page continues right after it.
+        """
+        clauses = ["start_ts >= ?"]
+        params: list = [start_from]
+        if after is not None:
+            clauses.append("(start_ts, ctftime_event_id) > (?, ?)")
+            params.extend(after)
+        if start_to is not None:
+            clauses.append("start_ts <= ?")
+            params.append(start_to)
+        if event_format is not None:
+            clauses.append("format = ?")
+            params.append(event_format)
+        if min_weight is not None:
+            clauses.append("weight >= ?")
+            params.append(min_weight)
+        if max_weight is not None:
+            clauses.append("weight <= ?")
+            params.append(max_weight)
+        if onsite is not None:
+            clauses.append("onsite = ?")
+            params.append(int(onsite))
+        params.append(limit)
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                f"""
+                SELECT ctftime_event_id, title, format, weight, onsite, start_ts,
+                       finish_ts, payload_json
+                FROM ctftime_events
+                WHERE {" AND ".join(clauses)}
+                ORDER BY start_ts, ctftime_event_id
+                LIMIT ?
+                """,
+                params,
+            )
+            rows = await cursor.fetchall()
+            await cursor.close()
+        return [
+            CtftimeEvent(
+                ctftime_event_id=row[0],
+                title=row[1],
+                format=row[2],
+                weight=row[3],
+                onsite=bool(row[4]),
+                start_ts=row[5],
+                finish_ts=row[6],
+                payload=json.loads(row[7]),
+            )
+            for row in rows
+        ]
+
+    async def list_ctftime_event_titles(self) -> list[tuple[int, str, int]]:
+        """(ctftime_event_id, title, start_ts) of every mirrored event."""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                "SELECT ctftime_event_id, title, start_ts FROM ctftime_events"
+            )
+            rows = await cursor.fetchall()
+            await cursor.close()
+        return [(row[0], row[1], row[2]) for row in rows]
+
+    async def count_ctftime_events(self) -> int:
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute("SELECT COUNT(*) FROM ctftime_events")
+            row = await cursor.fetchone()
+            await cursor.close()
+        return row[0]
+
+    # ── Leader lease ─────────────────────────────────────────────────
+
+    async def acquire_lease(self, name: str, holder: str, ttl: float) -> bool:
+        """Take or renew the named lease for ttl seconds.
+
+        False while another holder's lease has not expired.
+        """
+        now = time.time()
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                """
+                INSERT INTO leader_lease (name, holder, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                  holder=excluded.holder,
+                  expires_at=excluded.expires_at
+                WHERE leader_lease.holder=excluded.holder OR leader_lease.expires_at < ?
+                """,
+                (name, holder, now + ttl, now),
+            )
+            await db.commit()
+            return cursor.rowcount > 0
+
+    async def release_lease(self, name: str, holder: str) -> None:
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute(
+                "DELETE FROM leader_lease WHERE name=? AND holder=?", (name, holder)
+            )
+            await db.commit()
+
     # ── Message tracking ─────────────────────────────────────────────
 
     async def record_message(
@@ -545,6 +1091,61 @@ class Repository:
             await db.commit()
         return challenge_id
 
+    async def create_challenges(
+        self,
+        rows: list[tuple[int, int, str, str, int, int, int | None]],
+    ) -> int:
+        """Insert many challenges in one transaction.
+
+        Each row is (guild_id, ctftime_event_id, challenge_name, category,
+        thread_id, channel_id, platform_challenge_id).
+        """
+        if not rows:
+            return 0
+        created_at = _utc_now_iso()
+        async with aiosqlite.connect(self.db_path) as db:
+            before = db.total_changes
+            await db.executemany(
+                """
+                INSERT OR IGNORE INTO challenges
+                  (guild_id, ctftime_event_id, challenge_name, category,
+                   thread_id, channel_id, status, solved_by, created_at,
+                   platform_challenge_id)
+                VALUES (?, ?, ?, ?, ?, ?, 'open', NULL, ?, ?)
+                """,
+                [(*row[:6], created_at, row[6]) for row in rows],
+            )
+            await db.commit()
+            return db.total_changes - before
+
+    async def map_platform_challenges(
+        self, guild_id: int, ctftime_event_id: int
+    ) -> dict[int, int]:
+        """Return {platform_challenge_id: thread_id} for linked challenges."""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                """
+                SELECT platform_challenge_id, thread_id FROM challenges
+                WHERE guild_id=? AND ctftime_event_id=?
+                  AND platform_challenge_id IS NOT NULL
+                """,
+                (guild_id, ctftime_event_id),
+            )
+            rows = await cursor.fetchall()
+            await cursor.close()
+        return {row[0]: row[1] for row in rows}
+
+    async def link_platform_challenges(self, links: list[tuple[int, int]]) -> None:
+        """Attach platform IDs to existing challenges, given (thread_id, platform_id)."""
+        if not links:
+            return
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany(
+                "UPDATE challenges SET platform_challenge_id=? WHERE thread_id=?",
+                [(platform_id, thread_id) for thread_id, platform_id in links],
+            )
+            await db.commit()
+
     async def get_challenge_by_thread(self, thread_id: int) -> Challenge | None:
         async with aiosqlite.connect(self.db_path) as db:
             cursor = await db.execute(
@@ -595,6 +1196,16 @@ class Repository:
             await cursor.close()
         return [self._row_to_challenge(row) for row in rows]
 
+    async def list_challenge_threads(self) -> list[tuple[int, int, int, str]]:
+        """(guild_id, thread_id, channel_id, challenge_name) of every challenge."""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                "SELECT guild_id, thread_id, channel_id, challenge_name FROM challenges"
+            )
+            rows = await cursor.fetchall()
+            await cursor.close()
+        return [(row[0], row[1], row[2], row[3]) for row in rows]
+
     async def delete_challenge_by_thread(self, thread_id: int) -> bool:
         async with aiosqlite.connect(self.db_path) as db:
             cursor = await db.execute(
@@ -603,6 +1214,17 @@ class Repository:
             await db.commit()
             return cursor.rowcount > 0
 
+    async def delete_challenges_by_threads(self, thread_ids: list[int]) -> int:
+        if not thread_ids:
+            return 0
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.executemany(
+                "DELETE FROM challenges WHERE thread_id=?",
+                [(thread_id,) for thread_id in thread_ids],
+            )
+            await db.commit()
+            return cursor.rowcount
+
     async def delete_challenges_for_event(
         self, guild_id: int, ctftime_event_id: int
     ) -> None:
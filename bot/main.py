@@ -4,21 +4,74 @@ import logging
 import discord
 from discord.ext import commands
 
-from bot.config import DATABASE_PATH, DISCORD_GUILD_ID, DISCORD_TOKEN
+from bot.config import (
+    AUDIT_LOG_FLUSH_SECONDS,
+    AUDIT_LOG_MAX_PENDING,
+    DATABASE_PATH,
+    DISCORD_GUILD_ID,
+    DISCORD_TOKEN,
+    LEADER_LEASE_SECONDS,
+    LOOP_LAG_WARN_MS,
+    SCOREBOARD_WORKER_SOCKET,
+    SHARD_COUNT,
+    SHARD_IDS,
+)
 from bot.db.database import init_db
 from bot.db.repository import Repository
+from bot.services.audit_log import AuditLogWriter
+from bot.services.event_index import EventIndex
+from bot.services.guild_setup import BotAdminChannels
+from bot.services.leader import LeaderLease
+from bot.services.loop_lag import LoopLagMonitor
+from bot.services.offload import shutdown_offload
+from bot.services.scoreboard_registry import ScoreboardRegistry
 
 
 logging.basicConfig(level=logging.INFO)
 
+# Other processes may change scoreboard configs; see them this soon
+_REGISTRY_MAX_AGE = 60.0
 
-class CtfBot(commands.Bot):
+
+def _shard_options() -> dict:
+    if not SHARD_COUNT and not SHARD_IDS:
+        return {}
+    count = None if SHARD_COUNT in (None, "auto") else int(SHARD_COUNT)
+    ids = [int(i) for i in SHARD_IDS.split(",")] if SHARD_IDS else None
+    if ids is not None and count is None:
+        raise SystemExit("SHARD_IDS needs a numeric SHARD_COUNT")
+    return {"shard_count": count, "shard_ids": ids}
+
+
+_SHARD_OPTIONS = _shard_options()
+_BotBase = commands.AutoShardedBot if _SHARD_OPTIONS else commands.Bot
+
+
+class CtfBot(_BotBase):
     def __init__(self) -> None:
         intents = discord.Intents.default()
         intents.guilds = True
         intents.messages = True
-        super().__init__(command_prefix="!", intents=intents)
+        super().__init__(command_prefix="!", intents=intents, **_SHARD_OPTIONS)
         self.repo = Repository(DATABASE_PATH)
+        # Scoreboard polling, CTFtime sync and command sync run on the
+        # process holding this lease only. A process running every shard
+        # is alone and always leads.
+        self.leader = LeaderLease(
+            self.repo,
+            ttl=LEADER_LEASE_SECONDS,
+            solo=not SHARD_IDS,
+            on_acquired=self._sync_commands,
+        )
+        self.scoreboard_registry = ScoreboardRegistry(self.repo, max_age=_REGISTRY_MAX_AGE)
+        self.event_index = EventIndex(self.repo)
+        self.loop_lag = LoopLagMonitor(warn_after=LOOP_LAG_WARN_MS / 1000)
+        self.admin_channels = BotAdminChannels()
+        self.audit_log = AuditLogWriter(
+            self.admin_channels,
+            flush_seconds=AUDIT_LOG_FLUSH_SECONDS,
+            max_pending=AUDIT_LOG_MAX_PENDING,
+        )
 
     async def on_message(self, message: discord.Message) -> None:
         if message.guild is None:
@@ -27,12 +80,21 @@ class CtfBot(commands.Bot):
 
     async def setup_hook(self) -> None:
         await init_db(DATABASE_PATH)
+        await self.event_index.reload()
+        await self.leader.try_acquire()
+        self.leader.start()
+        self.loop_lag.start()
+        self.audit_log.start()
         await self.load_extension("bot.cogs.ctf")
         await self.load_extension("bot.cogs.challenge")
         await self.load_extension("bot.cogs.scoreboard_cog")
         await self.load_extension("bot.cogs.audit")
         await self.load_extension("bot.cogs.stats")
 
+    async def _sync_commands(self) -> None:
+        # Runs whenever this process becomes the leader; at startup that is
+        # before the cogs are loaded, so wait for them
+        await self.wait_until_ready()
         if DISCORD_GUILD_ID:
             guild = discord.Object(id=int(DISCORD_GUILD_ID))
             self.tree.copy_global_to(guild=guild)
@@ -47,10 +109,27 @@ class CtfBot(commands.Bot):
 
         await self.tree.sync()
 
+    async def close(self) -> None:
+        self.loop_lag.stop()
+        # Before super().close(), which closes the HTTP session
+        try:
+            await self.audit_log.close()
+        except Exception:
+            logging.exception("Flushing the audit log failed")
+        try:
+            await self.leader.release()
+        except Exception:
+            logging.exception("Releasing the leader lease failed")
+        shutdown_offload()
+        await super().close()
+
 
 async def main() -> None:
     if not DISCORD_TOKEN:
         raise SystemExit("Missing DISCORD_TOKEN in .env")
+    if SHARD_IDS and SCOREBOARD_WORKER_SOCKET:
+        # Config changes made on the other processes would not reach the worker
+        raise SystemExit("SCOREBOARD_WORKER_SOCKET cannot be used with SHARD_IDS")
     bot = CtfBot()
     async with bot:
         await bot.start(DISCORD_TOKEN)
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from bot.config import (
+    DATABASE_PATH,
+    LEADER_LEASE_SECONDS,
+    SCOREBOARD_POLL_SECONDS,
+    SCOREBOARD_WORKER_SOCKET,
+)
+from bot.db.database import init_db
+from bot.db.repository import Repository
+from bot.services.leader import LeaderLease
+from bot.services.offload import shutdown_offload
+from bot.services.scoreboard_fetcher import FetchStats
+from bot.services.scoreboard_ipc import ScoreboardIpcClient
+from bot.services.scoreboard_poller import ScoreboardPoller
+from bot.services.scoreboard_registry import ScoreboardRegistry
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("bot.scoreboard_worker")
+
+# The bot announces config changes over the socket; this covers a missed one
+_REGISTRY_MAX_AGE = 60.0
+
+
+def _next_poll_delay(registry: ScoreboardRegistry) -> float:
+    """Poll again right at the next board start/finish if it comes first."""
+    deadline = registry.next_deadline()
+    if deadline is None:
+        return SCOREBOARD_POLL_SECONDS
+    until = (deadline - datetime.now(timezone.utc)).total_seconds()
+    return min(SCOREBOARD_POLL_SECONDS, max(0.0, until) + 0.1)
+
+
+async def run() -> None:
+    await init_db(DATABASE_PATH)
+    repo = Repository(DATABASE_PATH)
+    registry = ScoreboardRegistry(repo, max_age=_REGISTRY_MAX_AGE)
+
+    def config_changed(guild_id: int, ctftime_event_id: int) -> None:
+        registry.invalidate()
+        poller.forget(guild_id, ctftime_event_id)
+
+    client = ScoreboardIpcClient(SCOREBOARD_WORKER_SOCKET, config_changed)
+    poller = ScoreboardPoller(repo, registry, client.send)
+    # A second worker started by mistake stands by instead of double polling
+    lease = LeaderLease(repo, name="scoreboard-worker", ttl=LEADER_LEASE_SECONDS)
+    await lease.try_acquire()
+    lease.start()
+    client.start()
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            if lease.is_leader:
+                stats = FetchStats()
+                started = loop.time()
+                queued, dropped = client.queued, client.dropped
+                try:
+                    await poller.poll(stats)
+                except Exception:
+                    logger.exception("Scoreboard poll failed")
+                if stats.requests:
+                    logger.info(
+                        "Scoreboard poll: %d request(s), %d bytes in %.0f ms, "
+                        "%d update(s) queued, %d dropped",
+                        stats.requests,
+                        stats.bytes,
+                        (loop.time() - started) * 1000,
+                        client.queued - queued,
+                        client.dropped - dropped,
+                    )
+            await asyncio.sleep(_next_poll_delay(registry))
+    finally:
+        await client.close()
+        await lease.release()
+        shutdown_offload()
+
+
+def main() -> None:
+    if not SCOREBOARD_WORKER_SOCKET:
+        raise SystemExit("Set SCOREBOARD_WORKER_SOCKET for the bot and the worker")
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+
+import discord
+
+from bot.services.guild_setup import BotAdminChannels
+from bot.utils.embeds import build_simple_embed
+
+
+logger = logging.getLogger(__name__)
+
+# Discord accepts at most 10 embeds and 6000 embed characters per message
+_MAX_EMBEDS = 10
+_MAX_EMBED_CHARS = 6000
+
+
+@dataclass
+class AuditLogStats:
+    queued: int = 0
+    sent: int = 0
+    messages: int = 0
+    dropped: int = 0
+    failed: int = 0
+
+
+def _batches(records: list[discord.Embed]) -> list[list[discord.Embed]]:
+    batches: list[list[discord.Embed]] = []
+    batch: list[discord.Embed] = []
+    size = 0
+    for embed in records:
+        if batch and (len(batch) == _MAX_EMBEDS or size + len(embed) > _MAX_EMBED_CHARS):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(embed)
+        size += len(embed)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class AuditLogWriter:
+    """Buffers #log records per guild and sends them in batches.
+
+    submit() only appends to the guild's buffer. Every flush_seconds the
+    buffers are sent, up to 10 embeds per message, guilds in parallel. A
+    guild with max_pending records waiting drops new ones, and its next
+    batch says how many were lost. close() sends whatever is left.
+    """
+
+    def __init__(
+        self,
+        channels: BotAdminChannels,
+        flush_seconds: float = 2.0,
+        max_pending: int = 200,
+    ) -> None:
+        self.channels = channels
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.stats = AuditLogStats()
+        self._pending: dict[int, tuple[discord.Guild, deque[discord.Embed]]] = {}
+        self._dropped: dict[int, int] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the flush loop and send the remaining records."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def submit(self, guild: discord.Guild, embed: discord.Embed) -> bool:
+        """Queue a record for the guild's #log. False if it was dropped."""
+        records = self._pending.get(guild.id, (guild, deque()))[1]
+        if len(records) >= self.max_pending:
+            self._dropped[guild.id] = self._dropped.get(guild.id, 0) + 1
+            self.stats.dropped += 1
+            return False
+        records.append(embed)
+        self._pending[guild.id] = (guild, records)
+        self.stats.queued += 1
+        return True
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            dropped, self._dropped = self._dropped, {}
+            await asyncio.gather(
+                *(
+                    self._flush_guild(guild, list(records), dropped.get(guild_id, 0))
+                    for guild_id, (guild, records) in pending.items()
+                )
+            )
+
+    async def _flush_guild(
+        self, guild: discord.Guild, records: list[discord.Embed], dropped: int
+    ) -> None:
+        if dropped:
+            logger.warning("Dropped %s audit log record(s) for guild %s", dropped, guild.id)
+            records.append(
+                build_simple_embed(
+                    "Log records dropped",
+                    f"{dropped} record(s) were dropped because too many arrived at once.",
+                )
+            )
+        try:
+            log_channel = (await self.channels.get(guild))["log"]
+        except Exception as exc:
+            logger.warning("No #log channel in guild %s: %s", guild.id, exc)
+            self.stats.failed += len(records)
+            return
+
+        sent = 0
+        for batch in _batches(records):
+            try:
+                await log_channel.send(embeds=batch)
+            except discord.HTTPException as exc:
+                logger.warning("Sending audit log to guild %s failed: %s", guild.id, exc)
+                self.stats.failed += len(records) - sent
+                return
+            sent += len(batch)
+            self.stats.sent += len(batch)
+            self.stats.messages += 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                # Shielded so close() cancelling the loop does not lose a
+                # batch that is already taken out of the buffers
+                await asyncio.shield(self.flush())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Audit log flush failed")
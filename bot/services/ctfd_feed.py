@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from urllib.parse import urljoin
+
+import aiohttp
+
+from bot.services.scoreboard_fetcher import FetchStats, ctfd_headers, read_json_response
+
+
+CTFD_CHALLENGES_PATH = "/api/v1/challenges"
+CTFD_SOLVE_PATHS = [
+    "/api/v1/teams/me/solves",
+    "/api/v1/users/me/solves",  # user-mode CTFs have no teams
+]
+
+# CTFd category word prefixes → topic channel key (see guild_setup.CHANNELS)
+_TOPIC_PREFIXES = [
+    ("REV", ("rev",)),
+    ("PWN", ("pwn", "binary", "exploit")),
+    ("WEB", ("web",)),
+    ("CRYPTO", ("crypto",)),
+    ("FOR", ("for", "steg")),
+]
+
+
+@dataclass
+class FeedDelta:
+    new_challenges: list[dict]
+    new_solves: list[dict]
+
+
+def topic_for_category(category: str | None) -> str:
+    """Map a CTFd challenge category to a topic channel key, MISC if unknown."""
+    words = (category or "").lower().replace("/", " ").replace("-", " ").split()
+    for topic, prefixes in _TOPIC_PREFIXES:
+        if any(word.startswith(prefixes) for word in words):
+            return topic
+    return "MISC"
+
+
+def ctfd_instance_key(base_url: str) -> str:
+    """Identify a CTFd instance so configs from several guilds can share requests."""
+    return base_url.strip().rstrip("/").lower()
+
+
+async def _get_data_list(
+    session: aiohttp.ClientSession, url: str, stats: FetchStats | None
+) -> list[dict] | None:
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=20)) as resp:
+        if resp.status in (401, 403, 404):
+            return None
+        resp.raise_for_status()
+        payload = await read_json_response(resp, stats)
+    data = payload.get("data") if isinstance(payload, dict) else None
+    if not isinstance(data, list):
+        return None
+    return [item for item in data if isinstance(item, dict)]
+
+
+async def fetch_ctfd_challenges(
+    base_url: str, auth_token: str | None = None, stats: FetchStats | None = None
+) -> list[dict]:
+    base = base_url.rstrip("/") + "/"
+    async with aiohttp.ClientSession(headers=ctfd_headers(auth_token)) as session:
+        challenges = await _get_data_list(
+            session, urljoin(base, CTFD_CHALLENGES_PATH), stats
+        )
+    if challenges is None:
+        raise RuntimeError("CTFd challenge list not available (login required?).")
+    return [c for c in challenges if "id" in c and "name" in c]
+
+
+async def fetch_ctfd_own_solves(
+    base_url: str, auth_token: str, stats: FetchStats | None = None
+) -> list[dict]:
+    base = base_url.rstrip("/") + "/"
+    async with aiohttp.ClientSession(headers=ctfd_headers(auth_token)) as session:
+        for path in CTFD_SOLVE_PATHS:
+            solves = await _get_data_list(session, urljoin(base, path), stats)
+            if solves is not None:
+                return [s for s in solves if "id" in s and "challenge_id" in s]
+    raise RuntimeError("CTFd solve list not available with this token.")
+
+
+def diff_feed(
+    known_challenge_ids: set[int],
+    known_solve_ids: set[int],
+    challenges: list[dict],
+    solves: list[dict],
+) -> FeedDelta:
+    """Return the challenge and solve rows whose IDs are not known yet."""
+    return FeedDelta(
+        new_challenges=[
+            c for c in challenges if int(c["id"]) not in known_challenge_ids
+        ],
+        new_solves=[s for s in solves if int(s["id"]) not in known_solve_ids],
+    )
@@ -1,22 +1,196 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
 
 import aiohttp
 
+from bot.config import (
+    CTFTIME_CACHE_PATH,
+    CTFTIME_EVENT_TTL,
+    CTFTIME_STALE_SECONDS,
+)
+
+
+logger = logging.getLogger(__name__)
 
 BASE_URL = "https://ctftime.org/api/v1"
 
+# Bump when the cached value layout changes; older files are ignored
+_CACHE_FILE_VERSION = 1
+
+
+# ── Cache ────────────────────────────────────────────────────────────
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    refreshes: int = 0
+    errors: int = 0
+
+    @property
+    def requests(self) -> int:
+        return self.hits + self.stale_hits + self.misses + self.coalesced
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of requests answered without waiting on CTFtime."""
+        if not self.requests:
+            return 0.0
+        return (self.hits + self.stale_hits) / self.requests
+
+
+class CtftimeCache:
+    """TTL cache with stale-while-revalidate, persisted to a JSON file.
+
+    Fresh entries (younger than the endpoint TTL) are served directly.
+    Entries up to stale_seconds past their TTL are served at once while one
+    background task refreshes them. Older or missing entries are fetched,
+    and concurrent callers for the same key share that fetch. When a fetch
+    fails, any cached value is served rather than the error.
+    """
+
+    def __init__(self, path: str | None, stale_seconds: float) -> None:
+        self.path = path
+        self.stale_seconds = stale_seconds
+        self.stats: dict[str, CacheStats] = {}
+        # key -> (endpoint, fetched_at as unix time, value)
+        self._entries: dict[str, tuple[str, float, Any]] = {}
+        self._ttls: dict[str, float] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._save_lock = asyncio.Lock()
+        self._loaded = False
+
+    def _load(self) -> None:
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring CTFtime cache file %s: %s", self.path, exc)
+            return
+        if not isinstance(data, dict) or data.get("version") != _CACHE_FILE_VERSION:
+            return
+        for key, (endpoint, fetched_at, value) in data.get("entries", {}).items():
+            self._entries[key] = (endpoint, fetched_at, value)
+        logger.info("Loaded %d CTFtime cache entries", len(self._entries))
+
+    def _write_file(self, text: str) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(text)
+        os.replace(tmp, self.path)
+
+    async def _save(self) -> None:
+        if not self.path:
+            return
+        now = time.time()
+        # Drop entries too old to ever be served again
+        for key, (endpoint, fetched_at, _) in list(self._entries.items()):
+            if now - fetched_at > self._ttls.get(endpoint, 0) + self.stale_seconds:
+                del self._entries[key]
+        text = json.dumps(
+            {"version": _CACHE_FILE_VERSION, "entries": self._entries},
+            ensure_ascii=False,
+        )
+        async with self._save_lock:
+            try:
+                await asyncio.to_thread(self._write_file, text)
+            except OSError as exc:
+                logger.warning("Could not write CTFtime cache %s: %s", self.path, exc)
+
+    def _refresh(
+        self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None:
+            return task
 
-def _unix_now() -> int:
-    return int(datetime.now(timezone.utc).timestamp())
+        async def run() -> Any:
+            try:
+                value = await fetch()
+            except Exception:
+                self.stats[endpoint].errors += 1
+                raise
+            finally:
+                self._inflight.pop(key, None)
+            self._entries[key] = (endpoint, time.time(), value)
+            await self._save()
+            return value
 
+        task = asyncio.create_task(run())
+        task.add_done_callback(self._log_failure)
+        self._inflight[key] = task
+        return task
 
-async def fetch_upcoming_events(limit: int = 20, window_days: int = 180) -> list[dict]:
-    start_ts = _unix_now()
-    finish_ts = int((datetime.now(timezone.utc) + timedelta(days=window_days)).timestamp())
-    url = f"{BASE_URL}/events/?limit={limit}&start={start_ts}&finish={finish_ts}"
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        # Background refreshes have no awaiting caller to see their error
+        if not task.cancelled() and task.exception() is not None:
+            logger.info("CTFtime refresh failed: %s", task.exception())
 
+    async def get(
+        self,
+        endpoint: str,
+        key: str,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        if not self._loaded:
+            self._load()
+        self._ttls[endpoint] = ttl
+        stats = self.stats.setdefault(endpoint, CacheStats())
+        cached = self._entries.get(key)
+        if cached is not None:
+            age = time.time() - cached[1]
+            if age < ttl:
+                stats.hits += 1
+                return cached[2]
+            if age < ttl + self.stale_seconds:
+                stats.stale_hits += 1
+                if key not in self._inflight:
+                    stats.refreshes += 1
+                    self._refresh(endpoint, key, fetch)
+                return cached[2]
+
+        if key in self._inflight:
+            stats.coalesced += 1
+        else:
+            stats.misses += 1
+        task = self._refresh(endpoint, key, fetch)
+        try:
+            # shield: a cancelled caller must not cancel the shared fetch
+            return await asyncio.shield(task)
+        except Exception:
+            if cached is None:
+                raise
+            logger.warning("CTFtime fetch for %s failed, serving cached data", key)
+            return cached[2]
+
+
+_cache = CtftimeCache(CTFTIME_CACHE_PATH, CTFTIME_STALE_SECONDS)
+
+
+def cache_stats() -> dict[str, CacheStats]:
+    """Per-endpoint cache counters since startup."""
+    return _cache.stats
+
+
+# ── API ──────────────────────────────────────────────────────────────
+
+
+async def _get_json(url: str) -> Any:
     async with aiohttp.ClientSession() as session:
         async with session.get(url, timeout=aiohttp.ClientTimeout(total=20)) as resp:
             resp.raise_for_status()
@@ -24,8 +198,16 @@ async def fetch_upcoming_events(limit: int = 20, window_days: int = 180) -> list
 
 
 async def fetch_event(event_id: int) -> dict:
-    url = f"{BASE_URL}/events/{event_id}/"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, timeout=aiohttp.ClientTimeout(total=20)) as resp:
-            resp.raise_for_status()
-            return await resp.json()
+    return await _cache.get(
+        "event",
+        f"event:{event_id}",
+        CTFTIME_EVENT_TTL,
+        lambda: _get_json(f"{BASE_URL}/events/{event_id}/"),
+    )
+
+
+async def fetch_events_window(start_ts: int, finish_ts: int, limit: int) -> list[dict]:
+    """Events starting between two unix times, bypassing the cache."""
+    return await _get_json(
+        f"{BASE_URL}/events/?limit={limit}&start={start_ts}&finish={finish_ts}"
+    )
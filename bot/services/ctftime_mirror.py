@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from bot.config import CTFTIME_SYNC_LIMIT, CTFTIME_SYNC_WINDOW_DAYS
+from bot.db.repository import CtftimeEvent, Repository
+from bot.services.ctftime import fetch_events_window
+
+
+logger = logging.getLogger(__name__)
+
+# CTFtime event formats, as /ctf upcoming filter choices
+CTFTIME_FORMATS = ("Jeopardy", "Attack-Defense", "Hack quest")
+# Finished events are kept this long, e.g. for /ctf join on a recent event
+_KEEP_FINISHED = timedelta(days=7)
+
+
+def _unix(value: str) -> int:
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def to_ctftime_event(event: dict) -> CtftimeEvent | None:
+    """Mirror row for a CTFtime API event, or None when it lacks the basics."""
+    try:
+        event_id = int(event["id"])
+        start_ts = _unix(event["start"])
+        finish_ts = _unix(event["finish"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    weight = event.get("weight")
+    return CtftimeEvent(
+        ctftime_event_id=event_id,
+        title=event.get("title") or f"CTF {event_id}",
+        format=event.get("format") or None,
+        weight=float(weight) if isinstance(weight, (int, float)) else None,
+        onsite=bool(event.get("onsite")),
+        start_ts=start_ts,
+        finish_ts=finish_ts,
+        payload=event,
+    )
+
+
+async def sync_ctftime_events(repo: Repository) -> tuple[int, int, int]:
+    """Mirror the CTFtime events window into ctftime_events.
+
+    Returns (listed, changed, removed). Raises whatever the CTFtime request
+    raises; the mirror is left untouched then.
+    """
+    now = datetime.now(timezone.utc)
+    start_ts = int(now.timestamp())
+    finish_ts = int((now + timedelta(days=CTFTIME_SYNC_WINDOW_DAYS)).timestamp())
+    listed = await fetch_events_window(start_ts, finish_ts, CTFTIME_SYNC_LIMIT)
+    events = [e for e in (to_ctftime_event(item) for item in listed) if e is not None]
+    # A listing cut off at the limit says nothing about events past it
+    complete = len(listed) < CTFTIME_SYNC_LIMIT
+    changed, removed = await repo.sync_ctftime_events(
+        events,
+        window=(start_ts, finish_ts) if complete else None,
+        prune_before=int((now - _KEEP_FINISHED).timestamp()),
+    )
+    return len(events), changed, removed
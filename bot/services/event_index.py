@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import re
+from dataclasses import dataclass
+
+import discord
+from discord import app_commands
+
+from bot.db.repository import Repository
+
+
+_TOKEN = re.compile(r"[^\W_]+")
+# Discord shows at most 25 autocomplete choices, names up to 100 characters
+MAX_CHOICES = 25
+_MAX_NAME = 100
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN.findall(text.casefold())
+
+
+@dataclass
+class EventMatch:
+    ctftime_event_id: int
+    title: str
+    joined: bool
+
+    def choice_name(self) -> str:
+        suffix = f" ({self.ctftime_event_id})" + (" · joined" if self.joined else "")
+        title = self.title
+        if len(title) + len(suffix) > _MAX_NAME:
+            title = title[: _MAX_NAME - len(suffix) - 1] + "…"
+        return title + suffix
+
+
+class EventIndex:
+    """Prefix index over CTF event titles and IDs for autocomplete.
+
+    Holds the mirrored CTFtime events and each guild's joined events in
+    memory; search() never touches the database or the network. Changes
+    rebuild sorted (token, event ID) and ID string lists, and each query
+    word is a bisect range over them.
+    """
+
+    def __init__(self, repo: Repository) -> None:
+        self.repo = repo
+        self._titles: dict[int, str] = {}
+        # Start time of mirrored CTFtime events, for soonest-first ranking
+        self._starts: dict[int, int] = {}
+        self._joined: dict[int, dict[int, str]] = {}
+        self._token_keys: list[tuple[str, int]] = []
+        self._id_keys: list[str] = []
+
+    async def reload(self) -> None:
+        """Load joined events and mirrored CTFtime events."""
+        self._joined.clear()
+        for guild_id, event_id, title in await self.repo.list_joined_event_titles():
+            self._joined.setdefault(guild_id, {})[event_id] = title
+        await self.reload_ctftime()
+
+    async def reload_ctftime(self) -> None:
+        """Reload mirrored CTFtime events, e.g. after a sync."""
+        self._starts = {}
+        self._titles = {}
+        for event_id, title, start_ts in await self.repo.list_ctftime_event_titles():
+            self._titles[event_id] = title
+            self._starts[event_id] = start_ts
+        for events in self._joined.values():
+            for event_id, title in events.items():
+                self._titles.setdefault(event_id, title)
+        self._rebuild()
+
+    def add_ctftime(self, event_id: int, title: str) -> None:
+        if self._titles.get(event_id) != title:
+            self._titles[event_id] = title
+            self._rebuild()
+
+    def add_joined(self, guild_id: int, event_id: int, title: str) -> None:
+        self._joined.setdefault(guild_id, {})[event_id] = title
+        self._titles.setdefault(event_id, title)
+        self._rebuild()
+
+    def remove_joined(self, guild_id: int, event_id: int) -> None:
+        if self._joined.get(guild_id, {}).pop(event_id, None) is not None:
+            # The joined title's words must stop matching too
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        # A joined event keeps the title it was joined with, which can
+        # differ from CTFtime's current one; both are searchable
+        titles = [*self._titles.items()]
+        for events in self._joined.values():
+            titles.extend(events.items())
+        self._token_keys = sorted(
+            {(token, event_id) for event_id, title in titles for token in _tokens(title)}
+        )
+        self._id_keys = sorted(str(event_id) for event_id in self._titles)
+
+    def _prefix_ids(self, prefix: str) -> set[int]:
+        keys = self._token_keys
+        found = set()
+        for i in range(bisect.bisect_left(keys, (prefix, -1)), len(keys)):
+            token, event_id = keys[i]
+            if not token.startswith(prefix):
+                break
+            found.add(event_id)
+        return found
+
+    def _id_prefix(self, prefix: str) -> set[int]:
+        keys = self._id_keys
+        found = set()
+        for i in range(bisect.bisect_left(keys, prefix), len(keys)):
+            if not keys[i].startswith(prefix):
+                break
+            found.add(int(keys[i]))
+        return found
+
+    def search(
+        self,
+        guild_id: int | None,
+        query: str,
+        joined_only: bool = False,
+        limit: int = MAX_CHOICES,
+    ) -> list[EventMatch]:
+        """Events whose title words start with every query word, or whose
+        ID starts with the query. With joined_only, the guild's joined
+        events, newest first; otherwise events not joined yet come first,
+        soonest start first."""
+        joined = self._joined.get(guild_id, {}) if guild_id is not None else {}
+        words = _tokens(query)
+        if not words:
+            candidates = set(joined) if joined_only else set(joined) | set(self._starts)
+        else:
+            candidates = self._prefix_ids(words[0])
+            for word in words[1:]:
+                candidates &= self._prefix_ids(word)
+            query = query.strip()
+            if query.isdigit():
+                candidates |= self._id_prefix(query)
+            if joined_only:
+                candidates &= joined.keys()
+
+        def rank(event_id: int) -> tuple:
+            if joined_only:
+                return (-event_id,)
+            return (event_id in joined, self._starts.get(event_id, 0), event_id)
+
+        return [
+            EventMatch(
+                ctftime_event_id=event_id,
+                title=joined.get(event_id) or self._titles.get(event_id, f"CTF {event_id}"),
+                joined=event_id in joined,
+            )
+            for event_id in heapq.nsmallest(limit, candidates, key=rank)
+        ]
+
+
+def event_choices(
+    index: EventIndex,
+    interaction: discord.Interaction,
+    current: str,
+    joined_only: bool,
+) -> list[app_commands.Choice[int]]:
+    """Autocomplete choices for an event_id parameter."""
+    guild_id = interaction.guild.id if interaction.guild is not None else None
+    return [
+        app_commands.Choice(name=match.choice_name(), value=match.ctftime_event_id)
+        for match in index.search(guild_id, str(current), joined_only=joined_only)
+    ]
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import re
+from typing import Awaitable, TypeVar
 
 import discord
 
 
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
 CHANNELS = [
     "Account",
     "General",
@@ -21,6 +28,9 @@ BOT_CATEGORY_NAME = "BOT"
 BOT_LOG_CHANNEL = "log"
 BOT_BACKUP_CHANNEL = "backup"
 
+# Channel REST calls in flight at once; covers all of CHANNELS in one wave
+_PROVISION_CONCURRENCY = 10
+
 
 def _sanitize_category_name(name: str) -> str:
     name = re.sub(r"\s+", " ", name).strip()
@@ -29,14 +39,41 @@ def _sanitize_category_name(name: str) -> str:
     return name
 
 
+async def _run_all(coros: list[Awaitable[T]]) -> list[T | BaseException]:
+    """Run REST calls concurrently, at most _PROVISION_CONCURRENCY at once.
+
+    discord.py queues requests per rate limit bucket, so calls on the same
+    route still wait their turn; calls on different channels go in parallel.
+    Returns results and exceptions in input order.
+    """
+    semaphore = asyncio.Semaphore(_PROVISION_CONCURRENCY)
+
+    async def run(coro: Awaitable[T]) -> T:
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(c) for c in coros), return_exceptions=True)
+
+
+def _raise_first(results: list) -> None:
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
 async def create_ctf_category_and_channels(
     guild: discord.Guild, event_title: str
 ) -> tuple[discord.CategoryChannel, dict[str, int]]:
+    """Create the event category and its channels.
+
+    Channels are created concurrently; position keeps the CHANNELS order.
+    If any creation fails, whatever was created is deleted again and the
+    error is raised.
+    """
     category_name = _sanitize_category_name(event_title)
     category = await guild.create_category(name=category_name)
 
-    channels: dict[str, int] = {}
-    for channel_name in CHANNELS:
+    def create(position: int, channel_name: str):
         if channel_name == "Account":
             overwrites = {
                 guild.default_role: discord.PermissionOverwrite(
@@ -44,17 +81,44 @@ async def create_ctf_category_and_channels(
                 )
             }
         else:
+            # No overwrites of its own: synced with the category
             overwrites = {}
-
-        channel = await category.create_text_channel(
+        return category.create_text_channel(
             name=channel_name.lower(),
             overwrites=overwrites,
+            position=position,
         )
-        channels[channel_name] = channel.id
 
+    results = await _run_all(
+        [create(position, name) for position, name in enumerate(CHANNELS)]
+    )
+    failed = [r for r in results if isinstance(r, BaseException)]
+    if failed:
+        created = [r for r in results if isinstance(r, discord.abc.GuildChannel)]
+        await _rollback(category, created)
+        raise failed[0]
+
+    channels = {name: channel.id for name, channel in zip(CHANNELS, results)}
     return category, channels
 
 
+async def _rollback(
+    category: discord.CategoryChannel, created: list[discord.abc.GuildChannel]
+) -> None:
+    results = await _run_all(
+        [channel.delete(reason="CTF setup failed") for channel in created]
+    )
+    try:
+        await category.delete(reason="CTF setup failed")
+    except discord.HTTPException as exc:
+        results.append(exc)
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.warning(
+                "Rollback of category %s left something behind: %s", category.id, result
+            )
+
+
 async def hide_ctf_category_and_channels(
     guild: discord.Guild, category_id: int
 ) -> None:
@@ -67,8 +131,19 @@ async def hide_ctf_category_and_channels(
     }
     await category.edit(overwrites=overwrites)
 
-    for channel in category.channels:
-        await channel.edit(overwrites=overwrites)
+    # Bring every channel in sync with the category. The API does not
+    # cascade category edits, and sync_permissions would read the category
+    # from the gateway cache, which may not have this edit yet. So send the
+    # same overwrites, only to channels that differ, in parallel.
+    _raise_first(
+        await _run_all(
+            [
+                channel.edit(overwrites=overwrites)
+                for channel in category.channels
+                if channel.overwrites != overwrites
+            ]
+        )
+    )
 
 
 async def delete_ctf_category_and_channels(
@@ -78,8 +153,7 @@ async def delete_ctf_category_and_channels(
     if not isinstance(category, discord.CategoryChannel):
         raise ValueError("Category not found.")
 
-    for channel in list(category.channels):
-        await channel.delete()
+    _raise_first(await _run_all([channel.delete() for channel in list(category.channels)]))
     await category.delete()
 
 
@@ -107,3 +181,56 @@ async def ensure_bot_admin_category(
         backup_channel = await category.create_text_channel(name=BOT_BACKUP_CHANNEL)
 
     return category, {"log": log_channel, "backup": backup_channel}
+
+
+class BotAdminChannels:
+    """Per-guild cache of the BOT category's #log and #backup channels.
+
+    get() costs one lookup per channel in the guild's channel map while the
+    cached IDs are valid. An entry is dropped when a gateway event deletes
+    or updates one of its channels; the next get() resolves it again with
+    ensure_bot_admin_category, one guild at a time.
+    """
+
+    def __init__(self) -> None:
+        # guild_id -> (category_id, log_id, backup_id)
+        self._ids: dict[int, tuple[int, int, int]] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+
+    def _cached(self, guild: discord.Guild) -> dict[str, discord.TextChannel] | None:
+        ids = self._ids.get(guild.id)
+        if ids is None:
+            return None
+        log_channel = guild.get_channel(ids[1])
+        backup_channel = guild.get_channel(ids[2])
+        if not isinstance(log_channel, discord.TextChannel) or not isinstance(
+            backup_channel, discord.TextChannel
+        ):
+            return None
+        return {"log": log_channel, "backup": backup_channel}
+
+    async def get(self, guild: discord.Guild) -> dict[str, discord.TextChannel]:
+        channels = self._cached(guild)
+        if channels is not None:
+            return channels
+        # One resolve per guild at a time, so two commands finishing
+        # together do not both create #log
+        async with self._locks.setdefault(guild.id, asyncio.Lock()):
+            channels = self._cached(guild)
+            if channels is None:
+                category, channels = await ensure_bot_admin_category(guild)
+                self._ids[guild.id] = (
+                    category.id,
+                    channels["log"].id,
+                    channels["backup"].id,
+                )
+        return channels
+
+    def invalidate(self, channel: discord.abc.GuildChannel) -> None:
+        ids = self._ids.get(channel.guild.id)
+        if ids is not None and channel.id in ids:
+            del self._ids[channel.guild.id]
+
+    def forget_guild(self, guild_id: int) -> None:
+        self._ids.pop(guild_id, None)
+        self._locks.pop(guild_id, None)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from bot.db.repository import Repository
+
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLease:
+    """Elects the one process that runs background work.
+
+    Every bot process sharing the database competes for one row in
+    leader_lease. The holder renews it every ttl/3 seconds. If it stops
+    renewing (crash, hang, database trouble) the row expires after ttl and
+    another process takes over on its next try.
+
+    is_leader turns false a third of the ttl before the row expires, so two
+    processes never both think they lead. on_acquired runs in the
+    background each time this process becomes the leader.
+
+    A solo lease is for a process that runs alone: it always leads and
+    never touches the database, so a restart does not wait for the
+    previous run's row to expire.
+    """
+
+    def __init__(
+        self,
+        repo: Repository,
+        name: str = "background",
+        ttl: float = 30.0,
+        solo: bool = False,
+        on_acquired: Callable[[], Awaitable[None]] | None = None,
+    ) -> None:
+        self.repo = repo
+        self.name = name
+        self.ttl = ttl
+        self.solo = solo
+        self.on_acquired = on_acquired
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._valid_until = 0.0
+        self._task: asyncio.Task | None = None
+        self._acquired_task: asyncio.Task | None = None
+
+    @property
+    def is_leader(self) -> bool:
+        return time.monotonic() < self._valid_until
+
+    def start(self) -> None:
+        if self._task is None and not self.solo:
+            self._task = asyncio.create_task(self._run())
+
+    async def release(self) -> None:
+        """Stop renewing and hand the lease over right away."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._acquired_task is not None:
+            self._acquired_task.cancel()
+            self._acquired_task = None
+        was_leader = self.is_leader
+        self._valid_until = 0.0
+        if was_leader and not self.solo:
+            await self.repo.release_lease(self.name, self.holder)
+
+    async def try_acquire(self) -> bool:
+        started = time.monotonic()
+        was_leader = self.is_leader
+        if self.solo:
+            self._valid_until = float("inf")
+            if not was_leader:
+                self._became_leader()
+            return True
+        try:
+            acquired = await self.repo.acquire_lease(self.name, self.holder, self.ttl)
+        except Exception as exc:
+            # Keep leading until the current lease runs out; the next try may work
+            logger.warning("Renewing the %s lease failed: %s", self.name, exc)
+            return self.is_leader
+        if acquired:
+            self._valid_until = started + self.ttl * 2 / 3
+        else:
+            self._valid_until = 0.0
+        if acquired != was_leader:
+            logger.info(
+                "%s the %s lease as %s",
+                "Acquired" if acquired else "Lost",
+                self.name,
+                self.holder,
+            )
+            if acquired:
+                self._became_leader()
+        return acquired
+
+    def _became_leader(self) -> None:
+        if self.on_acquired is not None:
+            self._acquired_task = asyncio.create_task(self._notify_acquired())
+
+    async def _notify_acquired(self) -> None:
+        try:
+            await self.on_acquired()
+        except Exception:
+            logger.exception("Taking over the %s lease failed", self.name)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            await self.try_acquire()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a sleeping task.
+
+    Anything that blocks the loop (a big JSON decode, a slow hash) shows up
+    as lag, which is also how late gateway heartbeats and interaction
+    replies run.
+    """
+
+    def __init__(self, interval: float = 0.25, warn_after: float = 0.25) -> None:
+        self.interval = interval
+        self.warn_after = warn_after
+        self.max_lag = 0.0
+        self._total = 0.0
+        self._samples = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def record(self, lag: float) -> None:
+        self.max_lag = max(self.max_lag, lag)
+        self._total += lag
+        self._samples += 1
+
+    def reset(self) -> tuple[float, float]:
+        """Return (max, mean) lag in seconds since the last reset."""
+        mean = self._total / self._samples if self._samples else 0.0
+        result = (self.max_lag, mean)
+        self.max_lag = 0.0
+        self._total = 0.0
+        self._samples = 0
+        return result
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.record(lag)
+            if self.warn_after > 0 and lag >= self.warn_after:
+                log.warning("Event loop blocked for %.0f ms", lag * 1000)
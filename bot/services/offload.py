@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from bot.config import SCOREBOARD_OFFLOAD_BYTES, SCOREBOARD_OFFLOAD_POOL
+
+
+T = TypeVar("T")
+
+_POOL_WORKERS = 2
+
+_executor: Executor | None = None
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if SCOREBOARD_OFFLOAD_POOL == "thread":
+            _executor = ThreadPoolExecutor(
+                max_workers=_POOL_WORKERS, thread_name_prefix="offload"
+            )
+        else:
+            # spawn: forking a process that runs the gateway's threads is unsafe
+            _executor = ProcessPoolExecutor(
+                max_workers=_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _executor
+
+
+async def run_cpu_bound(func: Callable[..., T], *args, size: int) -> T:
+    """Run func(*args) in the offload pool when size (bytes) is over the
+    threshold, inline otherwise.
+
+    With the process pool, func must be a module-level function and should
+    return something much smaller than its input, so sending the result
+    back costs less than the work saved on the event loop.
+    """
+    if SCOREBOARD_OFFLOAD_BYTES < 0 or size < SCOREBOARD_OFFLOAD_BYTES:
+        return func(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), func, *args)
+
+
+def shutdown_offload() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
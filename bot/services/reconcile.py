@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+import discord
+
+from bot.db.repository import Repository
+from bot.services.audit_log import AuditLogWriter
+from bot.services.guild_setup import BotAdminChannels
+from bot.utils.embeds import build_simple_embed
+
+
+logger = logging.getLogger(__name__)
+# Stale challenge names listed per guild in #log
+_MAX_LISTED = 20
+
+
+@dataclass
+class ReconcileReport:
+    guilds: int = 0
+    failed: int = 0
+    missing_categories: int = 0
+    stale_challenges: int = 0
+    removed_challenges: int = 0
+    seconds: float = 0.0
+    failed_guild_ids: list[int] = field(default_factory=list)
+
+
+async def _missing_threads(
+    guild: discord.Guild, threads: list[tuple[int, int]]
+) -> list[int]:
+    """Challenge thread IDs that are gone from the guild.
+
+    Active threads are in the gateway cache. The rest are looked up in
+    their parent channel's archived threads, one listing per channel
+    instead of one request per thread. A thread whose parent channel is
+    gone went with it; a channel we may not read is left alone.
+    """
+    by_parent: dict[int, set[int]] = {}
+    for thread_id, channel_id in threads:
+        if guild.get_thread(thread_id) is None:
+            by_parent.setdefault(channel_id, set()).add(thread_id)
+
+    missing: list[int] = []
+    for channel_id, thread_ids in by_parent.items():
+        channel = guild.get_channel(channel_id)
+        if channel is None:
+            missing.extend(thread_ids)
+            continue
+        if not isinstance(channel, (discord.TextChannel, discord.ForumChannel)):
+            continue
+        try:
+            archived = {thread.id async for thread in channel.archived_threads(limit=None)}
+        except discord.Forbidden:
+            continue
+        missing.extend(thread_ids - archived)
+    return missing
+
+
+async def reconcile_guilds(
+    guilds: list[discord.Guild],
+    repo: Repository,
+    admin_channels: BotAdminChannels,
+    audit_log: AuditLogWriter,
+    concurrency: int = 8,
+    remove_stale: bool = False,
+) -> ReconcileReport:
+    """Bring every guild in line with the database after startup.
+
+    Per guild: make sure the BOT category exists, check that each joined
+    CTF's category is still there, and find challenges whose thread was
+    deleted. Both are reported in the guild's #log; stale challenges are
+    only deleted with remove_stale. Up to `concurrency` guilds run at
+    once; a failing guild is logged and counted without stopping the
+    others.
+    """
+    started = time.perf_counter()
+    report = ReconcileReport(guilds=len(guilds))
+
+    categories: dict[int, list[tuple[int, str, int]]] = {}
+    for guild_id, event_id, title, category_id in await repo.list_event_categories():
+        categories.setdefault(guild_id, []).append((event_id, title, category_id))
+    threads: dict[int, list[tuple[int, int]]] = {}
+    names: dict[int, str] = {}
+    for guild_id, thread_id, channel_id, name in await repo.list_challenge_threads():
+        threads.setdefault(guild_id, []).append((thread_id, channel_id))
+        names[thread_id] = name
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def reconcile(guild: discord.Guild) -> None:
+        if guild.unavailable:
+            # Its channel cache is empty; everything would look deleted
+            raise RuntimeError("guild unavailable")
+        async with semaphore:
+            await admin_channels.get(guild)
+
+            missing = [
+                (event_id, title)
+                for event_id, title, category_id in categories.get(guild.id, [])
+                if not isinstance(guild.get_channel(category_id), discord.CategoryChannel)
+            ]
+            stale = await _missing_threads(guild, threads.get(guild.id, []))
+            removed = await repo.delete_challenges_by_threads(stale) if remove_stale else 0
+
+        report.missing_categories += len(missing)
+        report.stale_challenges += len(stale)
+        report.removed_challenges += removed
+        if missing or stale:
+            lines = [f"Category of **{title}** ({event_id}) is missing." for event_id, title in missing]
+            if stale:
+                listed = ", ".join(f"**{names[thread_id]}**" for thread_id in stale[:_MAX_LISTED])
+                if len(stale) > _MAX_LISTED:
+                    listed += f" and {len(stale) - _MAX_LISTED} more"
+                lines.append(f"Thread deleted for {len(stale)} challenge(s): {listed}.")
+                if removed:
+                    lines.append(f"Removed {removed} of them from the database.")
+            audit_log.submit(guild, build_simple_embed("Startup check", "\n".join(lines)))
+
+    results = await asyncio.gather(
+        *(reconcile(guild) for guild in guilds), return_exceptions=True
+    )
+    for guild, result in zip(guilds, results):
+        if isinstance(result, BaseException):
+            report.failed += 1
+            report.failed_guild_ids.append(guild.id)
+            logger.warning("Reconciling guild %s failed: %r", guild.id, result)
+
+    report.seconds = time.perf_counter() - started
+    return report
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import functools
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable
+from urllib.parse import parse_qs, urldefrag
+
+import aiohttp
+
+from bot.services.offload import run_cpu_bound
+from bot.services.scoreboard_fetcher import (
+    FetchStats,
+    ScoreboardSnapshot,
+    build_snapshot,
+    fetch_ctfd_scoreboard,
+    fetch_ctfd_top,
+    fetch_rctf_scoreboard,
+    normalize_entries,
+    parse_ctfd_scoreboard,
+    parse_rctf_scoreboard,
+    parse_snapshot,
+    rctf_base_url,
+    read_response_body,
+)
+
+
+@dataclass(frozen=True)
+class AdapterCapabilities:
+    etag: bool = False  # conditional requests, unchanged boards cost a 304
+    paging: bool = False  # full board is read page by page
+    top_n: bool = False  # can fetch only the first N teams
+    timeline: bool = False  # score history for backfill
+    challenges: bool = False  # challenge list and solve counts
+
+
+@dataclass
+class FetchResult:
+    snapshot: ScoreboardSnapshot | None  # None: unchanged since the ETag sent
+    etag: str | None = None
+
+    @property
+    def entries(self) -> list[dict] | None:
+        return None if self.snapshot is None else self.snapshot.entries
+
+
+class ScoreboardAdapter(ABC):
+    """One scoreboard platform: how to find, fetch and parse its board.
+
+    name is what scoreboard_config.type stores, label what /scoreboard
+    shows. fetch returns the board as a snapshot of normalized entries
+    (see normalize_entries and build_snapshot).
+    """
+
+    name = ""
+    label = ""
+    capabilities = AdapterCapabilities()
+
+    @abstractmethod
+    def parser(self, url: str) -> Callable[[bytes], ScoreboardSnapshot | None]:
+        """Parser for a full board response; picklable for the offload pool.
+
+        It returns the indexed snapshot, so large boards are normalized and
+        indexed off the event loop too.
+        """
+
+    @abstractmethod
+    async def discover(self, url: str, auth_token: str | None) -> str:
+        """Check that url serves a board and return the URL to store.
+
+        Raises ValueError for a URL this adapter can never use, RuntimeError
+        when the board cannot be read right now.
+        """
+
+    @abstractmethod
+    async def fetch(
+        self,
+        url: str,
+        auth_token: str | None,
+        stats: FetchStats | None = None,
+        count: int | None = None,
+        etag: str | None = None,
+    ) -> FetchResult:
+        """Fetch the board, only the first count teams with top_n."""
+
+
+# ── Registry ─────────────────────────────────────────────────────────
+
+ADAPTERS: dict[str, ScoreboardAdapter] = {}
+
+
+def register_adapter(adapter: ScoreboardAdapter) -> ScoreboardAdapter:
+    ADAPTERS[adapter.name] = adapter
+    return adapter
+
+
+def get_adapter(name: str) -> ScoreboardAdapter | None:
+    return ADAPTERS.get(name)
+
+
+# ── CTFd ─────────────────────────────────────────────────────────────
+
+
+class CtfdAdapter(ScoreboardAdapter):
+    name = "ctfd"
+    label = "CTFd"
+    capabilities = AdapterCapabilities(top_n=True, timeline=True, challenges=True)
+
+    def parser(self, url: str) -> Callable[[bytes], ScoreboardSnapshot | None]:
+        return functools.partial(parse_snapshot, parse_ctfd_scoreboard)
+
+    async def discover(self, url: str, auth_token: str | None) -> str:
+        url = url.strip().rstrip("/")
+        await fetch_ctfd_scoreboard(url, auth_token, parse=self.parser(url))
+        return url
+
+    async def fetch(
+        self,
+        url: str,
+        auth_token: str | None,
+        stats: FetchStats | None = None,
+        count: int | None = None,
+        etag: str | None = None,
+    ) -> FetchResult:
+        if count is not None:
+            entries = await fetch_ctfd_top(url, auth_token, count, stats)
+            return FetchResult(build_snapshot(entries))
+        return FetchResult(
+            await fetch_ctfd_scoreboard(url, auth_token, stats, parse=self.parser(url))
+        )
+
+
+# ── rCTF ─────────────────────────────────────────────────────────────
+
+
+class RctfAdapter(ScoreboardAdapter):
+    name = "rctf"
+    label = "rCTF"
+    capabilities = AdapterCapabilities(top_n=True, paging=True)
+
+    def parser(self, url: str) -> Callable[[bytes], ScoreboardSnapshot | None]:
+        # One response holding the whole board; fetch reads it page by page
+        return functools.partial(parse_snapshot, parse_rctf_scoreboard)
+
+    async def discover(self, url: str, auth_token: str | None) -> str:
+        base = rctf_base_url(url.strip())
+        await fetch_rctf_scoreboard(base, auth_token, count=1)
+        return base
+
+    async def fetch(
+        self,
+        url: str,
+        auth_token: str | None,
+        stats: FetchStats | None = None,
+        count: int | None = None,
+        etag: str | None = None,
+    ) -> FetchResult:
+        # Pages are parsed inline (below the offload size), so the board is
+        # indexed here; names hit normalize_team_name's cache after one poll
+        entries = await fetch_rctf_scoreboard(url, auth_token, stats, count)
+        return FetchResult(build_snapshot(entries))
+
+
+# ── JSON path ────────────────────────────────────────────────────────
+# For custom platforms: any JSON endpoint with a list of teams. The URL
+# fragment (never sent to the server) says where the list is and which
+# fields to read, e.g.
+#   https://example.org/api/standings#items=data.teams&name=team.name&score=points
+
+
+@dataclass(frozen=True)
+class JsonPathSpec:
+    items: tuple[str, ...] = ()
+    name: tuple[str, ...] = ("name",)
+    score: tuple[str, ...] = ("score",)
+    id: tuple[str, ...] | None = ("id",)
+    rank: tuple[str, ...] | None = None
+
+
+def _split_path(path: str) -> tuple[str, ...]:
+    return tuple(part for part in path.strip().split(".") if part)
+
+
+def parse_json_path_spec(url: str) -> JsonPathSpec:
+    """Read the JSON path spec from the URL fragment."""
+    _, fragment = urldefrag(url.strip())
+    if fragment and "=" not in fragment:
+        return JsonPathSpec(items=_split_path(fragment))
+    fields = parse_qs(fragment, keep_blank_values=True)
+    unknown = set(fields) - {"items", "name", "score", "id", "rank"}
+    if unknown:
+        raise ValueError(f"Unknown JSON path field(s): {', '.join(sorted(unknown))}")
+    paths = {key: _split_path(values[-1]) for key, values in fields.items()}
+    for key in ("name", "score"):
+        if key in paths and not paths[key]:
+            raise ValueError(f"JSON path field '{key}' is empty")
+    return JsonPathSpec(
+        items=paths.get("items", ()),
+        name=paths.get("name", ("name",)),
+        score=paths.get("score", ("score",)),
+        id=paths.get("id", ("id",)) or None,
+        rank=paths.get("rank") or None,
+    )
+
+
+def _resolve(value: object, path: tuple[str, ...]) -> object:
+    for part in path:
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return None
+    return value
+
+
+def parse_json_path(body: bytes, spec: JsonPathSpec) -> list[dict] | None:
+    items = _resolve(json.loads(body), spec.items)
+    if not isinstance(items, list):
+        return None
+    rows = []
+    for item in items:
+        row = {"name": _resolve(item, spec.name), "score": _resolve(item, spec.score)}
+        if spec.id is not None:
+            row["id"] = _resolve(item, spec.id)
+        if spec.rank is not None:
+            rank = _resolve(item, spec.rank)
+            if isinstance(rank, (int, str)) and str(rank).isdigit():
+                row["rank"] = int(rank)
+        if isinstance(row["name"], (dict, list)):
+            continue
+        try:
+            row["score"] = float(row["score"])
+        except (TypeError, ValueError):
+            continue
+        rows.append({k: v for k, v in row.items() if v is not None})
+    if not any("rank" in row for row in rows):
+        # No ranks to go by: place teams by score, ties in source order, so
+        # the snapshot's score bisects see a descending board
+        rows.sort(key=lambda row: -row["score"])
+    return normalize_entries(rows)
+
+
+class JsonPathAdapter(ScoreboardAdapter):
+    name = "jsonpath"
+    label = "JSON path"
+    capabilities = AdapterCapabilities(etag=True)
+
+    def parser(self, url: str) -> Callable[[bytes], ScoreboardSnapshot | None]:
+        # Runs in the offload pool, so partials rather than a closure
+        parse = functools.partial(parse_json_path, spec=parse_json_path_spec(url))
+        return functools.partial(parse_snapshot, parse)
+
+    async def discover(self, url: str, auth_token: str | None) -> str:
+        url = url.strip()
+        parse_json_path_spec(url)
+        result = await self.fetch(url, auth_token)
+        if not result.entries:
+            raise RuntimeError("No teams found at that JSON path.")
+        return url
+
+    async def fetch(
+        self,
+        url: str,
+        auth_token: str | None,
+        stats: FetchStats | None = None,
+        count: int | None = None,
+        etag: str | None = None,
+    ) -> FetchResult:
+        parse = self.parser(url)
+        headers = {"User-Agent": "ctf-bot/1.0", "Accept": "application/json"}
+        if auth_token:
+            headers["Authorization"] = f"Bearer {auth_token}"
+        if etag:
+            headers["If-None-Match"] = etag
+        request_url, _ = urldefrag(url)
+        async with aiohttp.ClientSession(headers=headers) as session:
+            async with session.get(
+                request_url, timeout=aiohttp.ClientTimeout(total=20)
+            ) as resp:
+                if resp.status == 304:
+                    if stats is not None:
+                        stats.record(b"")
+                    return FetchResult(None, etag)
+                if resp.status != 200:
+                    raise RuntimeError(
+                        f"Scoreboard returned status {resp.status} for {request_url}"
+                    )
+                new_etag = resp.headers.get("ETag")
+                body = await read_response_body(resp, stats)
+        try:
+            snapshot = await run_cpu_bound(parse, body, size=len(body))
+        except ValueError as exc:
+            raise RuntimeError(f"Invalid JSON from {request_url}: {exc}") from exc
+        if snapshot is None:
+            raise RuntimeError("No team list at the configured JSON path.")
+        return FetchResult(snapshot, new_etag)
+
+
+for _adapter in (CtfdAdapter(), RctfAdapter(), JsonPathAdapter()):
+    register_adapter(_adapter)
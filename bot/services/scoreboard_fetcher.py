@@ -1,14 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import hashlib
 import json
 import logging
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, TypeVar
 from urllib.parse import urljoin, urlparse
 
 import aiohttp
 
+from bot.services.offload import run_cpu_bound
+
 log = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 CTFD_CANDIDATES = [
     "/api/v1/scoreboard",
     "/api/v1/scoreboard?count=1000",
@@ -16,8 +27,51 @@ CTFD_CANDIDATES = [
     "/scores?format=json",
 ]
 
+CTFD_TOP_PATH = "/api/v1/scoreboard/top/{count}"
+
 # rCTF /api/v1/leaderboard/now requires limit<=100
 RCTF_LIMIT = 100
+# Concurrent page requests when reading a whole rCTF leaderboard
+RCTF_PAGE_CONCURRENCY = 4
+
+
+@dataclass
+class FetchStats:
+    """Requests made and response bytes read, accumulated across fetches."""
+
+    requests: int = 0
+    bytes: int = 0
+
+    def record(self, body: bytes) -> None:
+        self.requests += 1
+        self.bytes += len(body)
+
+
+def ctfd_headers(auth_token: str | None) -> dict[str, str]:
+    """Request headers for the CTFd API.
+
+    CTFd only accepts API tokens as "Token ..." on JSON requests.
+    """
+    headers = {"User-Agent": "ctf-bot/1.0", "Content-Type": "application/json"}
+    if auth_token:
+        headers["Authorization"] = f"Token {auth_token}"
+    return headers
+
+
+async def read_response_body(
+    resp: aiohttp.ClientResponse, stats: FetchStats | None
+) -> bytes:
+    body = await resp.read()
+    if stats is not None:
+        stats.record(body)
+    return body
+
+
+async def read_json_response(
+    resp: aiohttp.ClientResponse, stats: FetchStats | None
+) -> object:
+    body = await read_response_body(resp, stats)
+    return await run_cpu_bound(json.loads, body, size=len(body))
 
 
 def _looks_like_ctfd_scoreboard(obj: dict) -> bool:
@@ -32,7 +86,7 @@ def _looks_like_ctfd_scoreboard(obj: dict) -> bool:
     return ("name" in keys or "team" in keys) and ("score" in keys or "points" in keys)
 
 
-def _normalize_entries(entries: list[dict]) -> list[dict]:
+def normalize_entries(entries: list[dict]) -> list[dict]:
     normalized = []
     for idx, entry in enumerate(entries, start=1):
         name = (
@@ -47,16 +101,113 @@ def _normalize_entries(entries: list[dict]) -> list[dict]:
         pos = entry.get("pos", entry.get("place", entry.get("rank", idx)))
         if name is None or score is None:
             continue
-        normalized.append({"pos": int(pos), "name": str(name), "score": float(score)})
+        item = {"pos": int(pos), "name": str(name), "score": float(score)}
+        account_id = entry.get("account_id", entry.get("id"))
+        if account_id is not None:
+            item["id"] = str(account_id)
+        if entry.get("bracket_id") is not None:
+            item["bracket_id"] = str(entry["bracket_id"])
+        if entry.get("bracket_name"):
+            item["bracket_name"] = str(entry["bracket_name"])
+        normalized.append(item)
     normalized.sort(key=lambda x: x["pos"])
     return normalized
 
 
-def _extract_rctf_leaderboard(payload: dict) -> list[dict] | None:
+# Boards repeat the same names every poll, so NFKC runs once per name
+@functools.lru_cache(maxsize=65536)
+def normalize_team_name(name: str) -> str:
+    """Return the lookup key for a team name (NFKC, collapsed spaces, casefolded)."""
+    return " ".join(unicodedata.normalize("NFKC", name).split()).casefold()
+
+
+@dataclass
+class ScoreboardSnapshot:
+    """Normalized entries sorted by position, with hash indexes built once."""
+
+    entries: list[dict]
+    index_by_id: dict[str, int] = field(default_factory=dict)
+    index_by_name: dict[str, int] = field(default_factory=dict)
+    # Scores negated so the list is ascending and usable with bisect
+    neg_scores: list[float] = field(default_factory=list)
+    # Per-bracket rankings, reachable by bracket ID or normalized bracket name
+    brackets: dict[str, "ScoreboardSnapshot"] = field(default_factory=dict)
+
+    def find(self, platform_id: str | None, team_key: str) -> int | None:
+        if platform_id is not None:
+            idx = self.index_by_id.get(platform_id)
+            if idx is not None:
+                return idx
+        return self.index_by_name.get(team_key)
+
+    def window(self, idx: int, k: int) -> range:
+        """Indexes of the k entries above and below idx, clamped to the board."""
+        return range(max(0, idx - k), min(len(self.entries), idx + k + 1))
+
+    def index_for_score(self, score: float) -> int:
+        """Index of the first entry whose score is not higher than score."""
+        return bisect_left(self.neg_scores, -score)
+
+    def next_higher(self, idx: int) -> int | None:
+        """Index of the closest entry above idx with a strictly higher score."""
+        above = self.index_for_score(self.entries[idx]["score"]) - 1
+        return above if above >= 0 else None
+
+    def bracket(self, name_or_id: str) -> "ScoreboardSnapshot | None":
+        return self.brackets.get(name_or_id) or self.brackets.get(
+            normalize_team_name(name_or_id)
+        )
+
+
+def _index_entry(snapshot: ScoreboardSnapshot, entry: dict, team_key: str) -> None:
+    idx = len(snapshot.neg_scores)
+    snapshot.neg_scores.append(-entry["score"])
+    if "id" in entry:
+        snapshot.index_by_id.setdefault(entry["id"], idx)
+    snapshot.index_by_name.setdefault(team_key, idx)
+
+
+def build_snapshot(entries: list[dict]) -> ScoreboardSnapshot:
+    """Index a position-sorted board and rank each bracket in the same pass."""
+    snapshot = ScoreboardSnapshot(entries=entries)
+    for entry in entries:
+        team_key = normalize_team_name(entry["name"])
+        _index_entry(snapshot, entry, team_key)
+
+        bracket_key = entry.get("bracket_id") or entry.get("bracket_name")
+        if bracket_key is None:
+            continue
+        bracket = snapshot.brackets.get(bracket_key)
+        if bracket is None:
+            bracket = ScoreboardSnapshot(entries=[])
+            snapshot.brackets[bracket_key] = bracket
+            if entry.get("bracket_name"):
+                name_key = normalize_team_name(entry["bracket_name"])
+                snapshot.brackets.setdefault(name_key, bracket)
+        ranked = {**entry, "pos": len(bracket.entries) + 1, "overall_pos": entry["pos"]}
+        bracket.entries.append(ranked)
+        _index_entry(bracket, ranked, team_key)
+    return snapshot
+
+
+def parse_snapshot(
+    parse: Callable[[bytes], list[dict] | None], body: bytes
+) -> ScoreboardSnapshot | None:
+    """Parse body with parse and index the board in the same call.
+
+    Offloaded for large bodies, so name normalization and indexing run in
+    the pool along with the JSON decode.
+    """
+    entries = parse(body)
+    return None if entries is None else build_snapshot(entries)
+
+
+def _extract_rctf_leaderboard(payload: dict, offset: int = 0) -> list[dict] | None:
     """Extract entries from rCTF /api/v1/leaderboard/now response.
 
     Handles both the standard structure {data: {leaderboard: [...]}}
-    and fallback structures {data: {scores: [...]}} etc.
+    and fallback structures {data: {scores: [...]}} etc. offset is the
+    page offset, so positions continue across pages.
     """
     if not isinstance(payload, dict):
         return None
@@ -70,20 +221,61 @@ def _extract_rctf_leaderboard(payload: dict) -> list[dict] | None:
         if not leaderboard:
             return []  # valid but empty (CTF not started / ended)
         entries = []
-        for idx, item in enumerate(leaderboard, start=1):
+        for idx, item in enumerate(leaderboard, start=offset + 1):
             if not isinstance(item, dict):
                 continue
             name = item.get("name")
             score = item.get("score")
             if name is None or score is None:
                 continue
-            entries.append({"name": str(name), "score": float(score), "pos": idx})
+            entry = {"name": str(name), "score": float(score), "pos": idx}
+            if item.get("id") is not None:
+                entry["id"] = str(item["id"])
+            entries.append(entry)
         return entries or None
 
     return None
 
 
-def _rctf_base_url(url: str) -> str:
+# ── Body parsers ─────────────────────────────────────────────────────
+# Module-level so the offload pool can run them in another process. Each
+# returns only the normalized entries, never the raw payload.
+
+
+def parse_ctfd_scoreboard(body: bytes) -> list[dict] | None:
+    payload = json.loads(body)
+    if isinstance(payload, dict) and _looks_like_ctfd_scoreboard(payload):
+        return normalize_entries(payload["data"])
+    return None
+
+
+def parse_rctf_page(body: bytes, offset: int = 0) -> tuple[list[dict], int | None]:
+    """Entries of one leaderboard page, and the total team count if given."""
+    payload = json.loads(body)
+    entries = _extract_rctf_leaderboard(payload, offset)
+    if entries is not None:
+        total = payload["data"].get("total")
+        return entries, total if isinstance(total, int) else None
+
+    if not isinstance(payload, dict):
+        raise RuntimeError("rCTF API returned unexpected format.")
+
+    # Fallback: if data is a raw list
+    data = payload.get("data")
+    if isinstance(data, list):
+        return normalize_entries(data), None
+
+    raise RuntimeError(
+        f"rCTF API returned unexpected format. "
+        f"Response kind: {payload.get('kind', 'unknown')}"
+    )
+
+
+def parse_rctf_scoreboard(body: bytes) -> list[dict]:
+    return parse_rctf_page(body)[0]
+
+
+def rctf_base_url(url: str) -> str:
     """Normalize user-provided URL to scheme + host only.
 
     Accepts:
@@ -97,13 +289,14 @@ def _rctf_base_url(url: str) -> str:
     return f"{parsed.scheme}://{parsed.netloc}/"
 
 
-async def fetch_ctfd_scoreboard(base_url: str, auth_token: str | None = None) -> list[dict]:
+async def fetch_ctfd_scoreboard(
+    base_url: str,
+    auth_token: str | None = None,
+    stats: FetchStats | None = None,
+    parse: Callable[[bytes], T | None] = parse_ctfd_scoreboard,
+) -> T:
     base = base_url.rstrip("/") + "/"
-    headers = {"User-Agent": "ctf-bot/1.0"}
-    if auth_token:
-        headers["Authorization"] = f"Bearer {auth_token}"
-
-    async with aiohttp.ClientSession(headers=headers) as session:
+    async with aiohttp.ClientSession(headers=ctfd_headers(auth_token)) as session:
         for path in CTFD_CANDIDATES:
             url = urljoin(base, path)
             try:
@@ -111,48 +304,174 @@ async def fetch_ctfd_scoreboard(base_url: str, auth_token: str | None = None) ->
                     ct = (resp.headers.get("content-type") or "").lower()
                     if "json" not in ct:
                         continue
-                    payload = await resp.json()
+                    body = await read_response_body(resp, stats)
+                entries = await run_cpu_bound(
+                    parse, body, size=len(body)
+                )
             except Exception:
                 continue
-            if isinstance(payload, dict) and _looks_like_ctfd_scoreboard(payload):
-                return _normalize_entries(payload["data"])
+            if entries is not None:
+                return entries
     raise RuntimeError("CTFd scoreboard endpoint not found or invalid.")
 
 
-async def fetch_rctf_scoreboard(url: str, auth_token: str | None = None) -> list[dict]:
-    base = _rctf_base_url(url)
+async def _fetch_rctf_page(
+    session: aiohttp.ClientSession,
+    base: str,
+    offset: int,
+    limit: int,
+    stats: FetchStats | None,
+) -> tuple[list[dict], int | None]:
+    api_url = f"{base}api/v1/leaderboard/now?limit={limit}&offset={offset}"
+    try:
+        async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=20)) as resp:
+            if resp.status != 200:
+                raise RuntimeError(
+                    f"rCTF API returned status {resp.status} for {api_url}"
+                )
+            body = await read_response_body(resp, stats)
+        return await run_cpu_bound(parse_rctf_page, body, offset, size=len(body))
+    except (aiohttp.ClientError, ValueError) as exc:
+        raise RuntimeError(f"Failed to connect to rCTF at {base}: {exc}") from exc
+
+
+async def fetch_rctf_scoreboard(
+    url: str,
+    auth_token: str | None = None,
+    stats: FetchStats | None = None,
+    count: int | None = None,
+) -> list[dict]:
+    """Fetch the first count teams, or the whole leaderboard when count is
+    None. Pages after the first are requested concurrently."""
+    base = rctf_base_url(url)
     headers = {"User-Agent": "ctf-bot/1.0"}
     if auth_token:
         headers["Authorization"] = f"Bearer {auth_token}"
 
-    api_url = f"{base}api/v1/leaderboard/now?limit={RCTF_LIMIT}&offset=0"
-
+    first_limit = RCTF_LIMIT if count is None else min(count, RCTF_LIMIT)
     async with aiohttp.ClientSession(headers=headers) as session:
-        try:
-            async with session.get(
-                api_url, timeout=aiohttp.ClientTimeout(total=20)
-            ) as resp:
-                if resp.status != 200:
-                    raise RuntimeError(
-                        f"rCTF API returned status {resp.status} for {api_url}"
-                    )
-                payload = await resp.json()
-        except aiohttp.ClientError as exc:
-            raise RuntimeError(f"Failed to connect to rCTF at {base}: {exc}") from exc
-
-        entries = _extract_rctf_leaderboard(payload)
-        if entries is not None:
+        entries, total = await _fetch_rctf_page(session, base, 0, first_limit, stats)
+        wanted = total if count is None else min(count, total or 0)
+        if not wanted or wanted <= first_limit:
             return entries
 
-        # Fallback: if data is a raw list
-        data = payload.get("data")
-        if isinstance(data, list):
-            return _normalize_entries(data)
+        semaphore = asyncio.Semaphore(RCTF_PAGE_CONCURRENCY)
+
+        async def page(offset: int) -> list[dict]:
+            async with semaphore:
+                limit = min(RCTF_LIMIT, wanted - offset)
+                rows, _ = await _fetch_rctf_page(session, base, offset, limit, stats)
+                return rows
 
-        raise RuntimeError(
-            f"rCTF API returned unexpected format. "
-            f"Response kind: {payload.get('kind', 'unknown')}"
+        pages = await asyncio.gather(
+            *(page(offset) for offset in range(first_limit, wanted, RCTF_LIMIT))
         )
+    for rows in pages:
+        entries.extend(rows)
+    return entries
+
+
+def _to_utc_iso(value: str) -> str | None:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+def _extract_ctfd_timeline(payload: dict) -> list[tuple[str, str, float, str]]:
+    """Rebuild score history from a CTFd /scoreboard/top/<N> response.
+
+    Returns (team_id, team_name, score, recorded_at) rows: one per solve or
+    award, with the team's running total at that moment.
+    """
+    data = payload.get("data") if isinstance(payload, dict) else None
+    if not isinstance(data, dict):
+        return []
+    rows = []
+    for team in data.values():
+        if not isinstance(team, dict) or team.get("name") is None:
+            continue
+        team_id = str(team.get("id", team["name"]))
+        points = []
+        for solve in team.get("solves") or []:
+            recorded_at = _to_utc_iso(solve.get("date"))
+            if recorded_at is None or solve.get("value") is None:
+                continue
+            points.append((recorded_at, float(solve["value"])))
+        points.sort()
+        total = 0.0
+        for recorded_at, value in points:
+            total += value
+            rows.append((team_id, str(team["name"]), total, recorded_at))
+    return rows
+
+
+def _extract_ctfd_top(payload: dict) -> list[dict] | None:
+    """Entries from a CTFd /scoreboard/top/<N> response, keyed by position."""
+    data = payload.get("data") if isinstance(payload, dict) else None
+    if not isinstance(data, dict):
+        return None
+    entries = []
+    for pos, team in data.items():
+        if not isinstance(team, dict) or team.get("name") is None:
+            continue
+        entry = {
+            "pos": int(pos),
+            "name": str(team["name"]),
+            "score": float(team.get("score") or 0),
+        }
+        if team.get("id") is not None:
+            entry["id"] = str(team["id"])
+        entries.append(entry)
+    entries.sort(key=lambda x: x["pos"])
+    return entries
+
+
+def parse_ctfd_top(body: bytes) -> list[dict] | None:
+    return _extract_ctfd_top(json.loads(body))
+
+
+def parse_ctfd_timeline(body: bytes) -> list[tuple[str, str, float, str]]:
+    return _extract_ctfd_timeline(json.loads(body))
+
+
+async def _fetch_ctfd_top_body(
+    base_url: str, auth_token: str | None, count: int, stats: FetchStats | None
+) -> bytes:
+    base = base_url.rstrip("/") + "/"
+    url = urljoin(base, CTFD_TOP_PATH.format(count=count))
+    async with aiohttp.ClientSession(headers=ctfd_headers(auth_token)) as session:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=20)) as resp:
+            if resp.status != 200:
+                raise RuntimeError(f"CTFd returned status {resp.status} for {url}")
+            return await read_response_body(resp, stats)
+
+
+async def fetch_ctfd_top(
+    base_url: str,
+    auth_token: str | None = None,
+    count: int = 10,
+    stats: FetchStats | None = None,
+) -> list[dict]:
+    """Fetch only the first count teams; much smaller than the full board."""
+    body = await _fetch_ctfd_top_body(base_url, auth_token, count, stats)
+    entries = await run_cpu_bound(parse_ctfd_top, body, size=len(body))
+    if entries is None:
+        raise RuntimeError("CTFd top scoreboard returned unexpected format.")
+    return entries
+
+
+async def fetch_ctfd_score_timeline(
+    base_url: str,
+    auth_token: str | None = None,
+    count: int = 10,
+    stats: FetchStats | None = None,
+) -> list[tuple[str, str, float, str]]:
+    body = await _fetch_ctfd_top_body(base_url, auth_token, count, stats)
+    return await run_cpu_bound(parse_ctfd_timeline, body, size=len(body))
 
 
 def make_payload_hash(entries: list[dict]) -> str:
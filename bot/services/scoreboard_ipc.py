@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import errno
+import json
+import logging
+import os
+from collections import deque
+from typing import Callable
+
+from bot.services.scoreboard_poller import (
+    ScoreboardUpdate,
+    UpdateHandler,
+    decode_update,
+    encode_update,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Longest message line; a feed update carries whole CTFd challenge rows
+_MAX_MESSAGE = 16 * 1024 * 1024
+_RECONNECT_SECONDS = 2.0
+
+
+def _line(message: dict) -> bytes:
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+class ScoreboardIpcServer:
+    """Bot side of the scoreboard worker socket.
+
+    The worker sends one JSON line per update; each is decoded and handed
+    to on_update in arrival order. The bot sends config_changed lines
+    back, so the worker reloads boards and drops cached fetch state.
+    """
+
+    def __init__(self, path: str, on_update: UpdateHandler) -> None:
+        self.path = path
+        self.on_update = on_update
+        self._server: asyncio.AbstractServer | None = None
+        # Connected workers and the tasks reading from them
+        self._writers: dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            try:
+                _, writer = await asyncio.open_unix_connection(self.path)
+            except OSError:
+                # Left over from a previous run; nobody is listening
+                os.unlink(self.path)
+            else:
+                writer.close()
+                raise OSError(errno.EADDRINUSE, "Another bot is listening", self.path)
+        self._server = await asyncio.start_unix_server(
+            self._serve, path=self.path, limit=_MAX_MESSAGE
+        )
+        logger.info("Waiting for the scoreboard worker on %s", self.path)
+
+    async def close(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await asyncio.gather(*self._writers.values(), return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    def config_changed(self, guild_id: int, ctftime_event_id: int) -> None:
+        line = _line(
+            {"type": "config_changed", "guild_id": guild_id, "ctftime_event_id": ctftime_event_id}
+        )
+        for writer in list(self._writers):
+            writer.write(line)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers[writer] = asyncio.current_task()
+        logger.info("Scoreboard worker connected")
+        try:
+            while line := await reader.readline():
+                try:
+                    update = decode_update(json.loads(line))
+                except (ValueError, KeyError, TypeError) as exc:
+                    logger.warning("Ignoring a malformed scoreboard update: %s", exc)
+                    continue
+                try:
+                    await self.on_update(update)
+                except Exception:
+                    logger.exception("Handling a scoreboard update failed")
+        except (ConnectionError, ValueError) as exc:
+            logger.warning("Scoreboard worker connection failed: %s", exc)
+        finally:
+            self._writers.pop(writer, None)
+            writer.close()
+            logger.info("Scoreboard worker disconnected")
+
+
+class ScoreboardIpcClient:
+    """Worker side of the socket: sends updates to the bot.
+
+    send() only queues, so a poll never waits on Discord. A background task
+    writes the queue to the bot, reconnecting whenever the bot restarts.
+    While it is unreachable, up to max_pending updates wait; beyond that
+    the oldest are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_config_changed: Callable[[int, int], None],
+        max_pending: int = 1000,
+    ) -> None:
+        self.path = path
+        self.on_config_changed = on_config_changed
+        self.max_pending = max_pending
+        self.queued = 0
+        self.sent = 0
+        self.dropped = 0
+        self._queue: deque[bytes] = deque()
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Give queued updates up to timeout seconds to go out, then stop."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._queue and self._task is not None and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def send(self, update: ScoreboardUpdate) -> None:
+        if len(self._queue) >= self.max_pending:
+            self._queue.popleft()
+            self.dropped += 1
+        self._queue.append(_line(encode_update(update)))
+        self.queued += 1
+        self._ready.set()
+
+    async def _run(self) -> None:
+        connected = False
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(
+                    self.path, limit=_MAX_MESSAGE
+                )
+            except OSError as exc:
+                if connected:
+                    logger.warning("Bot not reachable on %s: %s", self.path, exc)
+                    connected = False
+                await asyncio.sleep(_RECONNECT_SECONDS)
+                continue
+            connected = True
+            logger.info("Connected to the bot on %s", self.path)
+            listener = asyncio.create_task(self._listen(reader))
+            try:
+                await self._write_queued(writer, listener)
+            except (ConnectionError, OSError) as exc:
+                logger.warning("Sending to the bot failed: %s", exc)
+            finally:
+                listener.cancel()
+                writer.close()
+            await asyncio.sleep(_RECONNECT_SECONDS)
+
+    async def _write_queued(
+        self, writer: asyncio.StreamWriter, listener: asyncio.Task
+    ) -> None:
+        # Until the bot hangs up, which ends the listener
+        while not listener.done():
+            if not self._queue:
+                self._ready.clear()
+                waiter = asyncio.ensure_future(self._ready.wait())
+                await asyncio.wait({waiter, listener}, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                continue
+            line = self._queue.popleft()
+            writer.write(line)
+            try:
+                await writer.drain()
+            except (ConnectionError, OSError):
+                # Maybe not delivered; send it again after reconnecting
+                self._queue.appendleft(line)
+                raise
+            self.sent += 1
+
+    async def _listen(self, reader: asyncio.StreamReader) -> None:
+        while line := await reader.readline():
+            try:
+                message = json.loads(line)
+                if message.get("type") == "config_changed":
+                    self.on_config_changed(message["guild_id"], message["ctftime_event_id"])
+            except (ValueError, KeyError, TypeError, AttributeError) as exc:
+                logger.warning("Ignoring a malformed message from the bot: %s", exc)
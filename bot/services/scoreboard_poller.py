@@ -0,0 +1,524 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Union
+
+from bot.config import (
+    SCOREBOARD_FULL_EVERY,
+    SCOREBOARD_HOT_SOLVES,
+    SCOREBOARD_TEAM_NAME,
+    SCOREBOARD_TOP_N,
+    SCOREBOARD_WINDOW,
+)
+from bot.db.repository import (
+    Repository,
+    ScoreboardBoard,
+    ScoreboardConfig,
+    WatchedTeam,
+)
+from bot.services.ctfd_feed import (
+    ctfd_instance_key,
+    diff_feed,
+    fetch_ctfd_challenges,
+    fetch_ctfd_own_solves,
+)
+from bot.services.scoreboard_adapters import ScoreboardAdapter, get_adapter
+from bot.services.scoreboard_fetcher import (
+    FetchStats,
+    ScoreboardSnapshot,
+    make_payload_hash,
+    normalize_team_name,
+)
+from bot.services.scoreboard_registry import ScoreboardRegistry
+from bot.services.solve_tracker import SolveAlert, SolveCountTracker
+
+
+logger = logging.getLogger(__name__)
+# Above this many teams a top-N fetch stops being the cheap option
+_TOP_MODE_MAX_TEAMS = 100
+# How long to leave a CTFd challenge list alone after it refused us
+_LISTING_RETRY_SECONDS = 600
+
+
+@dataclass
+class RankUpdate:
+    guild_id: int
+    ctftime_event_id: int
+    channel_id: int
+    url: str
+    bracket: str | None
+    entries: list[dict]
+    changes: list[str]
+    watched: list[str]
+    gaps: list[str]
+
+
+@dataclass
+class SolveAlertsUpdate:
+    guild_id: int
+    ctftime_event_id: int
+    channel_id: int
+    url: str
+    alerts: list[SolveAlert]
+
+
+@dataclass
+class FeedUpdate:
+    guild_id: int
+    ctftime_event_id: int
+    channel_id: int
+    new_challenges: list[dict]
+    new_solves: list[dict]
+
+
+ScoreboardUpdate = Union[RankUpdate, SolveAlertsUpdate, FeedUpdate]
+UpdateHandler = Callable[[ScoreboardUpdate], Awaitable[None]]
+
+_UPDATE_TYPES = {"rank": RankUpdate, "solves": SolveAlertsUpdate, "feed": FeedUpdate}
+
+
+def encode_update(update: ScoreboardUpdate) -> dict:
+    kind = next(k for k, cls in _UPDATE_TYPES.items() if isinstance(update, cls))
+    return {"type": kind, **asdict(update)}
+
+
+def decode_update(message: dict) -> ScoreboardUpdate:
+    """Inverse of encode_update. Raises KeyError or TypeError on a bad message."""
+    fields = dict(message)
+    cls = _UPDATE_TYPES[fields.pop("type")]
+    if cls is SolveAlertsUpdate:
+        fields["alerts"] = [SolveAlert(**alert) for alert in fields["alerts"]]
+    return cls(**fields)
+
+
+class ScoreboardPoller:
+    """Polls the active scoreboards and persists their state and history.
+
+    What needs Discord goes to on_update: rank changes to render, solve
+    alerts, and CTFd challenges and solves not ingested yet. The bot
+    handles them directly, or the scoreboard worker forwards them to it.
+    """
+
+    def __init__(
+        self,
+        repo: Repository,
+        registry: ScoreboardRegistry,
+        on_update: UpdateHandler,
+    ) -> None:
+        self.repo = repo
+        self.registry = registry
+        self.on_update = on_update
+        self._check_lock = asyncio.Lock()
+        self._solve_tracker = SolveCountTracker(SCOREBOARD_HOT_SOLVES)
+        # Per (guild_id, event_id): polls so far and last seen watched positions
+        self._poll_counts: dict[tuple[int, int], int] = {}
+        self._watch_positions: dict[tuple[int, int], dict[str, int]] = {}
+        # Platform IDs already stored per watched team. The legacy tracked
+        # team has no watchlist row, so its ID never comes back from the
+        # database and would otherwise be written on every poll.
+        self._stored_team_ids: dict[tuple[int, int], dict[str, str]] = {}
+        # Last ETag per (guild_id, event_id), for adapters with conditional GETs
+        self._etags: dict[tuple[int, int], str] = {}
+        # Per (CTFd instance, token): when to ask again for a challenge list
+        # that was refused, so tokenless boards do not fail every tick
+        self._listing_retry_at: dict[tuple[str, str | None], float] = {}
+
+    def forget(self, guild_id: int, ctftime_event_id: int) -> None:
+        """Drop cached fetch state after a config changed."""
+        key = (guild_id, ctftime_event_id)
+        self._etags.pop(key, None)
+        self._poll_counts.pop(key, None)
+        self._watch_positions.pop(key, None)
+        self._stored_team_ids.pop(key, None)
+
+    def _forget_inactive(self, boards: list[ScoreboardBoard]) -> None:
+        """Drop state of boards that finished or were removed since the last poll."""
+        active = {(b.config.guild_id, b.config.ctftime_event_id) for b in boards}
+        for guild_id, ctftime_event_id in (
+            set(self._etags)
+            | set(self._poll_counts)
+            | set(self._watch_positions)
+            | set(self._stored_team_ids)
+        ) - active:
+            self.forget(guild_id, ctftime_event_id)
+        instances = {ctfd_instance_key(b.config.url) for b in boards}
+        for instance in self._solve_tracker.instances:
+            if instance not in instances:
+                self._solve_tracker.forget(instance)
+        for key in list(self._listing_retry_at):
+            if key[0] not in instances:
+                del self._listing_retry_at[key]
+
+    async def poll(self, stats: FetchStats) -> None:
+        async with self._check_lock:
+            boards = await self.registry.active_boards()
+            self._forget_inactive(boards)
+            # One challenge listing and one solve diff per CTFd instance per
+            # tick, shared by every guild polling it
+            listings: dict[str, asyncio.Future] = {}
+            solve_alerts: dict[str, list[SolveAlert]] = {}
+            await self._check_boards(boards, listings, solve_alerts, stats)
+
+    @staticmethod
+    def _listing_tokens(boards: list[ScoreboardBoard]) -> dict[str, str | None]:
+        """Token to list each CTFd instance's challenges with.
+
+        Any guild's token will do, and sees more than an anonymous request:
+        many CTFs only show challenges to logged-in teams.
+        """
+        tokens: dict[str, str | None] = {}
+        for board in boards:
+            adapter = get_adapter(board.config.type)
+            if adapter is None or not adapter.capabilities.challenges:
+                continue
+            instance = ctfd_instance_key(board.config.url)
+            if tokens.get(instance) is None:
+                tokens[instance] = board.config.auth_token
+        return tokens
+
+    async def _check_boards(
+        self,
+        boards: list[ScoreboardBoard],
+        listings: dict[str, asyncio.Future],
+        solve_alerts: dict[str, list[SolveAlert]],
+        stats: FetchStats,
+    ) -> None:
+        listing_tokens = self._listing_tokens(boards)
+        for board in boards:
+            config = board.config
+            adapter = get_adapter(config.type)
+            if adapter is None:
+                continue
+
+            if adapter.capabilities.challenges:
+                await self._run_ctfd_challenge_checks(
+                    config, listing_tokens, listings, solve_alerts, stats
+                )
+
+            watched = await self._watched_teams(config)
+            try:
+                snapshot = await self._fetch_snapshot(config, adapter, watched, stats)
+            except Exception:
+                continue
+            if snapshot is None:
+                continue  # unchanged since the last poll
+
+            entries = snapshot.entries
+            if config.bracket:
+                snapshot = snapshot.bracket(config.bracket)
+                if snapshot is None:
+                    continue
+                entries = snapshot.entries
+
+            watched_names: set[str] = set()
+            gaps: list[str] = []
+            if not watched:
+                entries = entries[:SCOREBOARD_TOP_N]
+            else:
+                window = self._window_size(config)
+                indexes: set[int] = set()
+                resolved: list[tuple[str, str]] = []
+                stored_ids = self._stored_team_ids.setdefault(
+                    (config.guild_id, config.ctftime_event_id), {}
+                )
+                positions: dict[str, int] = {}
+                for team in watched:
+                    idx = snapshot.find(team.platform_id, team.team_key)
+                    if idx is None:
+                        continue
+                    entry = snapshot.entries[idx]
+                    positions[team.team_key] = idx + 1
+                    watched_names.add(entry["name"])
+                    if (
+                        team.platform_id is None
+                        and "id" in entry
+                        and stored_ids.get(team.team_key) != entry["id"]
+                    ):
+                        resolved.append((team.team_key, entry["id"]))
+                    indexes.update(snapshot.window(idx, window))
+                    above = snapshot.next_higher(idx)
+                    if above is not None:
+                        target = snapshot.entries[above]
+                        gaps.append(
+                            f"{entry['name']}: {target['score'] - entry['score']:g} "
+                            f"behind {target['pos']}. {target['name']}"
+                        )
+                self._watch_positions[
+                    (config.guild_id, config.ctftime_event_id)
+                ] = positions
+                if resolved:
+                    await self.repo.set_watched_team_ids(
+                        config.guild_id, config.ctftime_event_id, resolved
+                    )
+                    stored_ids.update(resolved)
+                if not indexes:
+                    continue
+                entries = [snapshot.entries[i] for i in sorted(indexes)]
+
+            payload_hash = make_payload_hash(entries)
+            last_state = await self.repo.get_scoreboard_state(
+                config.guild_id, config.ctftime_event_id
+            )
+            if last_state and last_state.last_hash == payload_hash:
+                continue
+
+            # Detect rank changes only
+            rank_changes = []
+            previous: list[dict] = []
+            if last_state and last_state.last_payload:
+                try:
+                    previous = json.loads(last_state.last_payload)
+                    prev_rank = {e["name"]: e["pos"] for e in previous}
+                    for entry in entries[:SCOREBOARD_TOP_N]:
+                        name = entry["name"]
+                        if name in prev_rank and prev_rank[name] != entry["pos"]:
+                            delta = prev_rank[name] - entry["pos"]
+                            direction = "up" if delta > 0 else "down"
+                            rank_changes.append(
+                                (name, direction, entry["pos"], entry["score"], delta)
+                            )
+                except Exception:
+                    rank_changes = []
+
+            # Update state regardless
+            await self.repo.upsert_scoreboard_state(
+                config.guild_id,
+                config.ctftime_event_id,
+                payload_hash,
+                json.dumps(entries, ensure_ascii=False),
+            )
+            await self.repo.add_scoreboard_history(
+                config.guild_id,
+                config.ctftime_event_id,
+                self._history_rows(entries, previous),
+            )
+
+            # Only notify when there are rank changes
+            if not rank_changes:
+                continue
+
+            changes = [
+                f"{name} {direction} to {pos} ({score})"
+                for name, direction, pos, score, _ in rank_changes
+            ]
+
+            await self.on_update(
+                RankUpdate(
+                    guild_id=config.guild_id,
+                    ctftime_event_id=config.ctftime_event_id,
+                    channel_id=config.scoreboard_channel_id,
+                    url=config.url,
+                    bracket=config.bracket,
+                    entries=entries,
+                    changes=changes,
+                    watched=sorted(watched_names),
+                    gaps=gaps,
+                )
+            )
+
+    async def _run_ctfd_challenge_checks(
+        self,
+        config: ScoreboardConfig,
+        listing_tokens: dict[str, str | None],
+        listings: dict[str, asyncio.Future],
+        solve_alerts: dict[str, list[SolveAlert]],
+        stats: FetchStats,
+    ) -> None:
+        instance = ctfd_instance_key(config.url)
+        token = listing_tokens.get(instance)
+        if instance not in listings:
+            retry_at = self._listing_retry_at.get((instance, token))
+            if retry_at is not None and time.monotonic() < retry_at:
+                return
+            listings[instance] = asyncio.ensure_future(
+                fetch_ctfd_challenges(config.url, token, stats)
+            )
+        try:
+            challenges = await listings[instance]
+        except RuntimeError:
+            # Refused (401/403/404): the list is not public, or not anymore
+            self._listing_retry_at[(instance, token)] = (
+                time.monotonic() + _LISTING_RETRY_SECONDS
+            )
+            return
+        except Exception:
+            return
+        self._listing_retry_at.pop((instance, token), None)
+
+        if instance not in solve_alerts:
+            solve_alerts[instance] = self._solve_tracker.update(instance, challenges)
+        if solve_alerts[instance]:
+            await self.on_update(
+                SolveAlertsUpdate(
+                    guild_id=config.guild_id,
+                    ctftime_event_id=config.ctftime_event_id,
+                    channel_id=config.scoreboard_channel_id,
+                    url=config.url,
+                    alerts=solve_alerts[instance],
+                )
+            )
+
+        if config.auth_token:
+            try:
+                await self._check_ctfd_feed(config, challenges, stats)
+            except Exception:
+                logger.warning(
+                    "CTFd feed ingestion failed for %s/%s",
+                    config.guild_id,
+                    config.ctftime_event_id,
+                    exc_info=True,
+                )
+
+    async def _check_ctfd_feed(
+        self, config: ScoreboardConfig, challenges: list[dict], stats: FetchStats
+    ) -> None:
+        """Pass on challenges and solves not recorded in the feed state yet."""
+        solves = await fetch_ctfd_own_solves(config.url, config.auth_token, stats)
+        state = await self.repo.get_ctfd_feed_state(
+            config.guild_id, config.ctftime_event_id
+        )
+        delta = diff_feed(
+            set(state.challenge_ids) if state else set(),
+            set(state.solve_ids) if state else set(),
+            challenges,
+            solves,
+        )
+        if not delta.new_challenges and not delta.new_solves:
+            return
+        await self.on_update(
+            FeedUpdate(
+                guild_id=config.guild_id,
+                ctftime_event_id=config.ctftime_event_id,
+                channel_id=config.scoreboard_channel_id,
+                new_challenges=delta.new_challenges,
+                new_solves=delta.new_solves,
+            )
+        )
+
+    @staticmethod
+    def _window_size(config: ScoreboardConfig) -> int:
+        if config.window_size is not None:
+            return config.window_size
+        return SCOREBOARD_WINDOW
+
+    def _top_count(
+        self, config: ScoreboardConfig, watched: list[WatchedTeam]
+    ) -> int | None:
+        """Teams to request in top-N mode, or None for the full board."""
+        if config.bracket:
+            return None
+        if not watched:
+            return SCOREBOARD_TOP_N
+        positions = self._watch_positions.get(
+            (config.guild_id, config.ctftime_event_id)
+        )
+        if positions is None:
+            return None
+        needed = max(positions.values(), default=0) + self._window_size(config)
+        count = max(SCOREBOARD_TOP_N, needed)
+        return count if count <= _TOP_MODE_MAX_TEAMS else None
+
+    async def _fetch_snapshot(
+        self,
+        config: ScoreboardConfig,
+        adapter: ScoreboardAdapter,
+        watched: list[WatchedTeam],
+        stats: FetchStats,
+    ) -> ScoreboardSnapshot | None:
+        """Fetch the board the cheapest way the adapter allows.
+
+        With top_n, poll only the first teams, falling back to the full
+        board when a watched team (or its window) is not covered, and every
+        SCOREBOARD_FULL_EVERY polls. With etag, send the last ETag; None
+        means the board is unchanged.
+        """
+        key = (config.guild_id, config.ctftime_event_id)
+        if adapter.capabilities.top_n:
+            poll = self._poll_counts.get(key, 0)
+            self._poll_counts[key] = poll + 1
+            periodic_full = (
+                SCOREBOARD_FULL_EVERY > 0 and poll % SCOREBOARD_FULL_EVERY == 0
+            )
+            count = self._top_count(config, watched)
+            if count is not None and not periodic_full:
+                try:
+                    result = await adapter.fetch(
+                        config.url, config.auth_token, stats, count=count
+                    )
+                except Exception:
+                    result = None
+                if (
+                    result is not None
+                    and result.snapshot is not None
+                    and self._top_covers_watched(config, result.snapshot, watched, count)
+                ):
+                    return result.snapshot
+
+        etag = self._etags.get(key) if adapter.capabilities.etag else None
+        result = await adapter.fetch(config.url, config.auth_token, stats, etag=etag)
+        if result.etag:
+            self._etags[key] = result.etag
+        else:
+            self._etags.pop(key, None)
+        return result.snapshot
+
+    def _top_covers_watched(
+        self,
+        config: ScoreboardConfig,
+        snapshot: ScoreboardSnapshot,
+        watched: list[WatchedTeam],
+        count: int,
+    ) -> bool:
+        known = self._watch_positions.get((config.guild_id, config.ctftime_event_id))
+        if not watched or not known:
+            return True
+        entries = snapshot.entries
+        window = self._window_size(config)
+        for team in watched:
+            if team.team_key not in known:
+                continue  # not on the full board last time either
+            idx = snapshot.find(team.platform_id, team.team_key)
+            if idx is None or (len(entries) >= count and idx + window >= count):
+                return False
+        return True
+
+    @staticmethod
+    def _history_rows(
+        entries: list[dict], previous: list[dict]
+    ) -> list[tuple[str, str, float, str, int]]:
+        """History points for teams whose score or position changed since the
+        last payload."""
+        prev_state = {e.get("id", e["name"]): (e["score"], e["pos"]) for e in previous}
+        recorded_at = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for entry in entries:
+            key = entry.get("id", entry["name"])
+            if prev_state.get(key) != (entry["score"], entry["pos"]):
+                rows.append(
+                    (str(key), entry["name"], entry["score"], recorded_at, entry["pos"])
+                )
+        return rows
+
+    async def _watched_teams(self, config) -> list[WatchedTeam]:
+        watched = await self.repo.list_watched_teams(
+            config.guild_id, config.ctftime_event_id
+        )
+        tracked_team = config.team_name or SCOREBOARD_TEAM_NAME
+        if tracked_team:
+            tracked_key = normalize_team_name(tracked_team)
+            if all(team.team_key != tracked_key for team in watched):
+                watched.append(
+                    WatchedTeam(
+                        guild_id=config.guild_id,
+                        ctftime_event_id=config.ctftime_event_id,
+                        team_key=tracked_key,
+                        team_name=tracked_team,
+                        platform_id=None,
+                    )
+                )
+        return watched
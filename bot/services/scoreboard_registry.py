@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import heapq
+import time
+from datetime import datetime, timezone
+
+from bot.db.repository import Repository, ScoreboardBoard
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class ScoreboardRegistry:
+    """Scoreboards worth polling, activated and retired at their event times.
+
+    Boards are loaded with one query that already drops finished events.
+    Start and finish times go into a heap, so each poll only pops the
+    deadlines that have passed instead of checking every board.
+    Call invalidate() after configs or events change. With max_age, boards
+    are also reloaded that often, to see changes made by other processes.
+    """
+
+    def __init__(self, repo: Repository, max_age: float | None = None) -> None:
+        self.repo = repo
+        self.max_age = max_age
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._pending: dict[tuple[int, int], ScoreboardBoard] = {}
+        self._active: dict[tuple[int, int], ScoreboardBoard] = {}
+        # (deadline, seq, kind, key) with kind "start" or "finish"
+        self._deadlines: list[tuple[datetime, int, str, tuple[int, int]]] = []
+
+    def invalidate(self) -> None:
+        self._loaded = False
+
+    async def reload(self, now: datetime | None = None) -> None:
+        now = now or datetime.now(timezone.utc)
+        boards = await self.repo.list_unfinished_scoreboards(now.isoformat())
+        self._pending.clear()
+        self._active.clear()
+        self._deadlines.clear()
+        for seq, board in enumerate(boards):
+            key = (board.config.guild_id, board.config.ctftime_event_id)
+            start = _parse_time(board.event.start_time)
+            finish = _parse_time(board.event.finish_time)
+            if finish is not None:
+                self._deadlines.append((finish, seq, "finish", key))
+            if start is not None and start > now:
+                self._pending[key] = board
+                self._deadlines.append((start, seq, "start", key))
+            else:
+                self._active[key] = board
+        heapq.heapify(self._deadlines)
+        self._loaded = True
+        self._loaded_at = time.monotonic()
+        self.advance(now)
+
+    def advance(self, now: datetime) -> None:
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, _, kind, key = heapq.heappop(self._deadlines)
+            if kind == "start":
+                board = self._pending.pop(key, None)
+                if board is not None:
+                    self._active[key] = board
+            else:
+                self._pending.pop(key, None)
+                self._active.pop(key, None)
+
+    async def active_boards(self, now: datetime | None = None) -> list[ScoreboardBoard]:
+        now = now or datetime.now(timezone.utc)
+        expired = (
+            self.max_age is not None and time.monotonic() - self._loaded_at >= self.max_age
+        )
+        if not self._loaded or expired:
+            await self.reload(now)
+        else:
+            self.advance(now)
+        return list(self._active.values())
+
+    def next_deadline(self) -> datetime | None:
+        """Earliest pending start or finish, for waking the poller exactly then."""
+        return self._deadlines[0][0] if self._deadlines else None
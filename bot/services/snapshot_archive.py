@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import mmap
+import struct
+import sys
+from datetime import datetime, timezone
+
+from bot.services.scoreboard_fetcher import normalize_team_name
+
+
+# Scoreboard snapshot archive (.sbar), little-endian:
+#
+#   header          magic, version, snapshot count, team count and the
+#                   offsets of the three tables below
+#   team table      per team: name and platform ID as (offset, length)
+#                   pairs into the string table
+#   string table    UTF-8 team names and IDs
+#   snapshot index  per snapshot: timestamp (epoch seconds), team count,
+#                   offset of its columns
+#   columns         per snapshot: scores f64[n], positions u32[n],
+#                   team indexes u32[n]; 8-byte aligned
+#
+# Readers map the file and read any snapshot or team in place.
+
+MAGIC = b"SBAR"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sB3xIIQQQ")
+_TEAM = struct.Struct("<IIII")
+_SNAPSHOT = struct.Struct("<dI4xQ")
+
+# memoryview.cast reads native byte order
+_NATIVE_LE = sys.byteorder == "little"
+
+
+def _align8(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _team_key(entry: dict) -> str:
+    if entry.get("id") is not None:
+        return f"id:{entry['id']}"
+    return f"name:{normalize_team_name(str(entry['name']))}"
+
+
+class ArchiveWriter:
+    """Collects snapshots, then writes them as one archive."""
+
+    def __init__(self) -> None:
+        self._team_index: dict[str, int] = {}
+        self._teams: list[tuple[str, str]] = []  # (name, platform ID or "")
+        self._snapshots: list[tuple[float, list[float], list[int], list[int]]] = []
+
+    def add(self, timestamp: float, entries: list[dict]) -> None:
+        """Add one snapshot of normalized entries (pos, name, score, id)."""
+        scores, positions, teams = [], [], []
+        for entry in entries:
+            key = _team_key(entry)
+            idx = self._team_index.get(key)
+            if idx is None:
+                idx = self._team_index[key] = len(self._teams)
+                self._teams.append(("", str(entry.get("id") or "")))
+            # Keep the latest name, teams get renamed mid-event
+            self._teams[idx] = (str(entry["name"]), self._teams[idx][1])
+            scores.append(float(entry["score"]))
+            positions.append(int(entry["pos"]))
+            teams.append(idx)
+        self._snapshots.append((timestamp, scores, positions, teams))
+
+    def to_bytes(self) -> bytes:
+        strings = bytearray()
+        team_table = bytearray()
+        for name, platform_id in self._teams:
+            name_raw, id_raw = name.encode("utf-8"), platform_id.encode("utf-8")
+            team_table += _TEAM.pack(
+                len(strings), len(name_raw), len(strings) + len(name_raw), len(id_raw)
+            )
+            strings += name_raw + id_raw
+
+        team_offset = _HEADER.size
+        string_offset = team_offset + len(team_table)
+        index_offset = _align8(string_offset + len(strings))
+        data_offset = _align8(index_offset + _SNAPSHOT.size * len(self._snapshots))
+
+        index = bytearray()
+        data = bytearray()
+        for timestamp, scores, positions, teams in self._snapshots:
+            n = len(scores)
+            index += _SNAPSHOT.pack(timestamp, n, data_offset + len(data))
+            data += struct.pack(f"<{n}d{n}I{n}I", *scores, *positions, *teams)
+            data += b"\0" * (_align8(len(data)) - len(data))
+
+        header = _HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            len(self._snapshots),
+            len(self._teams),
+            team_offset,
+            string_offset,
+            index_offset,
+        )
+        out = bytearray(header)
+        out += team_table
+        out += strings
+        out += b"\0" * (index_offset - len(out))
+        out += index
+        out += b"\0" * (data_offset - len(out))
+        out += data
+        return bytes(out)
+
+    def write(self, path: str) -> None:
+        with open(path, "wb") as fh:
+            fh.write(self.to_bytes())
+
+
+class ArchiveReader:
+    """Random access to an archive without decoding all of it."""
+
+    def __init__(self, data: bytes | mmap.mmap) -> None:
+        self._data = data
+        self._buf = memoryview(data)
+        if len(self._buf) < _HEADER.size:
+            raise ValueError("Not a scoreboard archive (too short)")
+        (
+            magic,
+            version,
+            self.snapshot_count,
+            self.team_count,
+            self._team_offset,
+            self._string_offset,
+            self._index_offset,
+        ) = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a scoreboard archive")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported scoreboard archive version: {version}")
+        self._teams: list[tuple[str, str | None]] | None = None
+        self._lookup: dict[str, int] | None = None
+        self._file = None
+
+    @classmethod
+    def open(cls, path: str) -> "ArchiveReader":
+        fh = open(path, "rb")
+        try:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            fh.close()
+            raise ValueError("Not a scoreboard archive (empty)")
+        reader = cls(mapped)
+        reader._file = fh
+        return reader
+
+    def close(self) -> None:
+        self._buf.release()
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.snapshot_count
+
+    # ── Teams ────────────────────────────────────────────────────────
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._string_offset + offset
+        return bytes(self._buf[start : start + length]).decode("utf-8")
+
+    def team(self, idx: int) -> tuple[str, str | None]:
+        """(name, platform ID) of a team index."""
+        if not 0 <= idx < self.team_count:
+            raise IndexError(idx)
+        if self._teams is not None:
+            return self._teams[idx]
+        name_off, name_len, id_off, id_len = _TEAM.unpack_from(
+            self._buf, self._team_offset + idx * _TEAM.size
+        )
+        return self._string(name_off, name_len), self._string(id_off, id_len) or None
+
+    def teams(self) -> list[tuple[str, str | None]]:
+        """Every (name, platform ID), decoded once and kept."""
+        if self._teams is None:
+            strings = bytes(self._buf[self._string_offset : self._index_offset])
+            teams = []
+            for name_off, name_len, id_off, id_len in _TEAM.iter_unpack(
+                self._buf[self._team_offset : self._string_offset]
+            ):
+                name = strings[name_off : name_off + name_len].decode("utf-8")
+                platform_id = strings[id_off : id_off + id_len].decode("utf-8")
+                teams.append((name, platform_id or None))
+            self._teams = teams
+        return self._teams
+
+    def find_team(self, name_or_id: str) -> int | None:
+        """Team index by platform ID or name; reads only the team table."""
+        if self._lookup is None:
+            self._lookup = {}
+            for idx, (name, platform_id) in enumerate(self.teams()):
+                self._lookup.setdefault(f"name:{normalize_team_name(name)}", idx)
+                if platform_id is not None:
+                    self._lookup[f"id:{platform_id}"] = idx
+        value = name_or_id.strip()
+        idx = self._lookup.get(f"id:{value}")
+        if idx is None:
+            idx = self._lookup.get(f"name:{normalize_team_name(value)}")
+        return idx
+
+    # ── Snapshots ────────────────────────────────────────────────────
+
+    def _snapshot_header(self, i: int) -> tuple[float, int, int]:
+        if not 0 <= i < self.snapshot_count:
+            raise IndexError(i)
+        return _SNAPSHOT.unpack_from(self._buf, self._index_offset + i * _SNAPSHOT.size)
+
+    def _column(self, fmt: str, offset: int, n: int):
+        size = struct.calcsize(fmt) * n
+        if _NATIVE_LE:
+            return self._buf[offset : offset + size].cast(fmt)
+        return struct.unpack_from(f"<{n}{fmt}", self._buf, offset)
+
+    def columns(self, i: int):
+        """(scores, positions, team indexes) of snapshot i, as zero-copy views."""
+        _, n, offset = self._snapshot_header(i)
+        return (
+            self._column("d", offset, n),
+            self._column("I", offset + 8 * n, n),
+            self._column("I", offset + 12 * n, n),
+        )
+
+    def timestamp(self, i: int) -> float:
+        return self._snapshot_header(i)[0]
+
+    def snapshot(self, i: int) -> list[dict]:
+        """Snapshot i as normalized entries, like the poller builds."""
+        scores, positions, indexes = self.columns(i)
+        teams = self.teams()
+        entries = []
+        for score, pos, idx in zip(scores, positions, indexes):
+            name, platform_id = teams[idx]
+            entry = {"pos": pos, "name": name, "score": score}
+            if platform_id is not None:
+                entry["id"] = platform_id
+            entries.append(entry)
+        return entries
+
+    def team_history(self, idx: int) -> list[tuple[float, int, float]]:
+        """(timestamp, position, score) of one team across all snapshots."""
+        needle = struct.pack("<I", idx)
+        history = []
+        for i in range(self.snapshot_count):
+            timestamp, n, offset = self._snapshot_header(i)
+            start = offset + 12 * n
+            column = self._data[start : start + 4 * n]
+            # Byte search, then keep only hits on a 4-byte boundary
+            hit = column.find(needle)
+            while hit != -1 and hit % 4:
+                hit = column.find(needle, hit + 1)
+            if hit == -1:
+                continue
+            row = hit // 4
+            (score,) = struct.unpack_from("<d", self._buf, offset + 8 * row)
+            (pos,) = struct.unpack_from("<I", self._buf, offset + 8 * n + 4 * row)
+            history.append((timestamp, pos, score))
+        return history
+
+
+def snapshots_from_history(
+    rows: list[tuple[str, str, float, str, int | None]],
+) -> list[tuple[float, list[dict], bool]]:
+    """Rebuild snapshots from (team_id, team_name, score, recorded_at, pos)
+    history points: one snapshot per distinct recorded_at.
+
+    History holds only the teams the poller kept (the top of the board or
+    the watched teams' windows), each with its last seen score and
+    position. The bool is False when some team has no recorded position
+    (backfilled or older points): that snapshot is ranked by score among
+    the recorded teams only, so its positions are estimates.
+    """
+    current: dict[str, tuple[str, float, int | None]] = {}
+    snapshots = []
+    ordered = sorted(rows, key=lambda row: row[3])
+    for i, (team_id, team_name, score, recorded_at, pos) in enumerate(ordered):
+        current[team_id] = (team_name, score, pos)
+        if i + 1 < len(ordered) and ordered[i + 1][3] == recorded_at:
+            continue
+        observed = all(team[2] is not None for team in current.values())
+        if observed:
+            ranked = sorted(current.items(), key=lambda item: item[1][2])
+            entries = [
+                {"pos": team_pos, "name": name, "score": team_score, "id": tid}
+                for tid, (name, team_score, team_pos) in ranked
+            ]
+        else:
+            ranked = sorted(
+                current.items(), key=lambda item: (-item[1][1], item[1][0])
+            )
+            entries = [
+                {"pos": rank, "name": name, "score": team_score, "id": tid}
+                for rank, (tid, (name, team_score, _)) in enumerate(ranked, start=1)
+            ]
+        moment = datetime.fromisoformat(recorded_at)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        snapshots.append((moment.timestamp(), entries, observed))
+    return snapshots
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass
+class SolveAlert:
+    kind: str  # "first_blood" or "hot"
+    challenge_id: int
+    name: str
+    category: str | None
+    value: int | None
+    solves: int
+    delta: int
+
+
+class SolveCountTracker:
+    """Keeps the last solve count per challenge for each CTFd instance.
+
+    The first listing seen for an instance only seeds the counts, so a bot
+    restart mid-event does not replay first bloods for solved challenges.
+    Challenges missing from a listing keep their last count, so one that is
+    hidden and shown again is not taken for a first blood.
+    """
+
+    def __init__(self, hot_threshold: int) -> None:
+        self.hot_threshold = hot_threshold
+        self._counts: dict[str, dict[int, int]] = {}
+
+    @property
+    def instances(self) -> list[str]:
+        return list(self._counts)
+
+    def update(self, instance: str, challenges: list[dict]) -> list[SolveAlert]:
+        previous = self._counts.get(instance)
+        current = dict(previous or {})
+        alerts: list[SolveAlert] = []
+        for chall in challenges:
+            solves = chall.get("solves")
+            if not isinstance(solves, int):
+                continue
+            chall_id = int(chall["id"])
+            current[chall_id] = solves
+            if previous is None:
+                continue
+            before = previous.get(chall_id, 0)
+            delta = solves - before
+            if before == 0 and solves > 0:
+                kind = "first_blood"
+            elif self.hot_threshold > 0 and delta >= self.hot_threshold:
+                kind = "hot"
+            else:
+                continue
+            alerts.append(
+                SolveAlert(
+                    kind=kind,
+                    challenge_id=chall_id,
+                    name=str(chall.get("name")),
+                    category=chall.get("category"),
+                    value=chall.get("value"),
+                    solves=solves,
+                    delta=delta,
+                )
+            )
+        self._counts[instance] = current
+        return alerts
+
+    def forget(self, instance: str) -> None:
+        self._counts.pop(instance, None)
@@ -59,16 +59,44 @@ def build_simple_embed(title: str, description: str) -> discord.Embed:
     )
 
 
+def _join_field_lines(lines: list[str], limit: int = 1024) -> str:
+    value = ""
+    for line in lines:
+        candidate = f"{value}\n{line}" if value else line
+        if len(candidate) > limit - 4:
+            return value + "\n..."
+        value = candidate
+    return value
+
+
 def build_scoreboard_embed(
     entries: list[dict],
     changes: list[str],
     source_url: str,
     top_n: int = 10,
+    watched: set[str] | None = None,
+    gaps: list[str] | None = None,
+    bracket: str | None = None,
 ) -> discord.Embed:
     embed = discord.Embed(title="Scoreboard Update", color=discord.Color.gold())
     embed.add_field(name="Source", value=source_url, inline=False)
-
-    if entries:
+    if bracket:
+        embed.add_field(name="Bracket", value=bracket, inline=False)
+
+    if entries and watched:
+        # Watched teams in bold, surrounded by their neighbours
+        lines = []
+        previous_pos = None
+        for entry in entries:
+            if previous_pos is not None and entry["pos"] > previous_pos + 1:
+                lines.append("…")
+            text = f"{entry['pos']}. {entry['name']} — {entry['score']}"
+            lines.append(f"**{text}**" if entry["name"] in watched else text)
+            previous_pos = entry["pos"]
+        embed.add_field(name="Watchlist", value=_join_field_lines(lines), inline=False)
+        if gaps:
+            embed.add_field(name="Gap to next", value=_join_field_lines(gaps), inline=False)
+    elif entries:
         if len(entries) == 1:
             entry = entries[0]
             embed.add_field(
@@ -88,6 +116,22 @@ def build_scoreboard_embed(
     return embed
 
 
+def build_solve_alerts_embed(alerts: list, source_url: str) -> discord.Embed:
+    embed = discord.Embed(title="Challenge Activity", color=discord.Color.gold())
+    embed.add_field(name="Source", value=source_url, inline=False)
+    lines = []
+    for alert in alerts:
+        label = f"**{alert.name}**"
+        if alert.category:
+            label += f" ({alert.category})"
+        if alert.kind == "first_blood":
+            lines.append(f"First blood: {label}")
+        else:
+            lines.append(f"Moving fast: {label} +{alert.delta} → {alert.solves} solves")
+    embed.add_field(name="Challenges", value=_join_field_lines(lines), inline=False)
+    return embed
+
+
 def _format_event_block(event: dict) -> str:
     weight_value = event.get("weight")
     if weight_value is None:
@@ -108,7 +152,7 @@ def _format_event_block(event: dict) -> str:
 
 
 def build_events_page_embed(
-    events: list[dict], page: int, page_size: int
+    events: list[dict], page: int, page_size: int, has_more: bool = False
 ) -> discord.Embed:
     total_pages = max(1, (len(events) + page_size - 1) // page_size)
     start_index = page * page_size
@@ -122,5 +166,9 @@ def build_events_page_embed(
             inline=False,
         )
 
-    embed.set_footer(text=f"Page {page + 1}/{total_pages}")
+    # events is only what has been loaded so far: the page count is open
+    if has_more:
+        embed.set_footer(text=f"Page {page + 1}")
+    else:
+        embed.set_footer(text=f"Page {page + 1}/{total_pages}")
     return embed
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
 import discord
 
 from bot.utils.embeds import build_events_page_embed
 
 
+logger = logging.getLogger(__name__)
+
+# Returns up to n more events, continuing after the ones already returned
+FetchMore = Callable[[int], Awaitable[list[dict]]]
+
+
 class CtfPaginationView(discord.ui.View):
     def __init__(
         self,
@@ -12,21 +22,79 @@ class CtfPaginationView(discord.ui.View):
         author_id: int,
         page_size: int = 3,
         timeout: int = 180,
+        fetch_more: FetchMore | None = None,
+        limit: int | None = None,
     ):
         super().__init__(timeout=timeout)
-        self.events = events
+        self.events = list(events)
         self.author_id = author_id
         self.page_size = page_size
         self.page = 0
         self.message: discord.Message | None = None
+        # Without fetch_more, events is the whole list
+        self.fetch_more = fetch_more
+        self.limit = limit
+        self.exhausted = fetch_more is None
+        self._loading: asyncio.Task | None = None
+        self._prefetch: asyncio.Task | None = None
+        # (page, exhausted) -> rendered embeds; the footer depends on both
+        self._rendered: dict[tuple[int, bool], list[discord.Embed]] = {}
+
+    async def _load_more(self) -> None:
+        want = self.page_size
+        if self.limit is not None:
+            want = min(want, self.limit - len(self.events))
+        batch = await self.fetch_more(want) if want > 0 else []
+        self.events.extend(batch)
+        if len(batch) < want or want <= 0:
+            self.exhausted = True
+
+    async def _ensure_loaded(self, count: int) -> None:
+        """Load until count events are there or the source runs out."""
+        while not self.exhausted and len(self.events) < count:
+            if self._loading is None:
+                self._loading = asyncio.create_task(self._load_more())
+            try:
+                await asyncio.shield(self._loading)
+            finally:
+                if self._loading is not None and self._loading.done():
+                    self._loading = None
+
+    async def load_first_page(self) -> None:
+        """Load the first page now and the next one in the background."""
+        await self._ensure_loaded(self.page_size)
+        self._start_prefetch()
+
+    def _start_prefetch(self) -> None:
+        if self.exhausted or (self._prefetch is not None and not self._prefetch.done()):
+            return
+        self._prefetch = asyncio.create_task(
+            self._ensure_loaded((self.page + 2) * self.page_size)
+        )
+        self._prefetch.add_done_callback(self._log_prefetch_error)
+
+    @staticmethod
+    def _log_prefetch_error(task: asyncio.Task) -> None:
+        # The next button press retries the load
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Prefetching events failed: %s", task.exception())
 
     def build_page_payload(self) -> list[discord.Embed]:
-        embed = build_events_page_embed(self.events, self.page, self.page_size)
-        return [embed]
+        key = (self.page, self.exhausted)
+        embeds = self._rendered.get(key)
+        if embeds is None:
+            embeds = [
+                build_events_page_embed(
+                    self.events, self.page, self.page_size, has_more=not self.exhausted
+                )
+            ]
+            self._rendered[key] = embeds
+        return embeds
 
     async def _update(self, interaction: discord.Interaction) -> None:
         embeds = self.build_page_payload()
         await interaction.response.edit_message(embeds=embeds, view=self)
+        self._start_prefetch()
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         if interaction.user.id != self.author_id:
@@ -48,12 +116,18 @@ class CtfPaginationView(discord.ui.View):
 
     @discord.ui.button(label="Next", style=discord.ButtonStyle.primary)
     async def next(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        try:
+            await self._ensure_loaded((self.page + 2) * self.page_size)
+        except Exception:
+            logger.exception("Loading more events failed")
         max_page = max(0, (len(self.events) - 1) // self.page_size)
         if self.page < max_page:
             self.page += 1
         await self._update(interaction)
 
     async def on_timeout(self) -> None:
+        if self._prefetch is not None:
+            self._prefetch.cancel()
         for item in self.children:
             if isinstance(item, discord.ui.Button):
                 item.disabled = True
@@ -0,0 +1,102 @@
+# Pack scoreboard captures into one snapshot archive (.sbar) and read it back.
+#   python scoreboard/archive.py pack board-*.json -o event.sbar
+#   python scoreboard/archive.py show event.sbar                 # summary
+#   python scoreboard/archive.py show event.sbar --snapshot -1   # latest board
+#   python scoreboard/archive.py show event.sbar --team "Team A"
+#
+# pack takes ctfd.py / rctf.py captures ({"url": ..., "data": ...}) and uses
+# each file's modification time as the snapshot time. show memory-maps the
+# archive and only reads the snapshot or team asked for. /scoreboard_export
+# in the bot produces the same format from the recorded history.
+
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from bot.services.scoreboard_fetcher import (  # noqa: E402
+    parse_ctfd_scoreboard,
+    parse_rctf_scoreboard,
+)
+from bot.services.snapshot_archive import ArchiveReader, ArchiveWriter  # noqa: E402
+
+
+def capture_entries(path: Path) -> list[dict]:
+    capture = json.loads(path.read_text(encoding="utf-8"))
+    body = json.dumps(capture.get("data", capture)).encode()
+    entries = parse_ctfd_scoreboard(body)
+    if entries is None:
+        entries = parse_rctf_scoreboard(body)
+    return entries
+
+
+def _when(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def pack(args) -> None:
+    writer = ArchiveWriter()
+    captures = sorted((Path(p) for p in args.captures), key=lambda p: p.stat().st_mtime)
+    for path in captures:
+        try:
+            entries = capture_entries(path)
+        except (ValueError, RuntimeError) as exc:
+            raise SystemExit(f"[-] {path}: not a scoreboard capture ({exc})")
+        writer.add(path.stat().st_mtime, entries)
+        print(f"[+] {path}: {len(entries)} teams")
+    writer.write(args.out)
+    print(f"[+] Saved {len(captures)} snapshots: {Path(args.out).resolve()}")
+
+
+def show(args) -> None:
+    with ArchiveReader.open(args.archive) as reader:
+        if args.team is not None:
+            idx = reader.find_team(args.team)
+            if idx is None:
+                raise SystemExit(f"[-] Team not in archive: {args.team}")
+            name, team_id = reader.team(idx)
+            print(f"{name} (id {team_id or '-'})")
+            for timestamp, pos, score in reader.team_history(idx):
+                print(f"  {_when(timestamp)}  #{pos:<5} {score:g}")
+            return
+        if args.snapshot is not None:
+            i = args.snapshot % len(reader) if len(reader) else 0
+            print(f"Snapshot {i} at {_when(reader.timestamp(i))}")
+            for entry in reader.snapshot(i)[: args.limit]:
+                print(f"  #{entry['pos']:<5} {entry['score']:>10g}  {entry['name']}")
+            return
+        print(f"{len(reader)} snapshots, {reader.team_count} teams")
+        if len(reader):
+            print(f"  first {_when(reader.timestamp(0))}")
+            print(f"  last  {_when(reader.timestamp(len(reader) - 1))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoreboard snapshot archives")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pack_cmd = sub.add_parser("pack", help="Pack capture JSON files into an archive")
+    pack_cmd.add_argument("captures", nargs="+", help="ctfd.py / rctf.py output files")
+    pack_cmd.add_argument("-o", "--out", required=True, help="Archive file to write")
+    pack_cmd.set_defaults(func=pack)
+
+    show_cmd = sub.add_parser("show", help="Print a summary, a snapshot or a team")
+    show_cmd.add_argument("archive")
+    show_cmd.add_argument("--snapshot", type=int, help="Snapshot index (negative counts from the end)")
+    show_cmd.add_argument("--team", help="Team name or platform ID")
+    show_cmd.add_argument("--limit", type=int, default=50, help="Rows printed for --snapshot")
+    show_cmd.set_defaults(func=show)
+
+    args = parser.parse_args()
+    try:
+        args.func(args)
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"[-] {exc}")
+
+
+if __name__ == "__main__":
+    main()
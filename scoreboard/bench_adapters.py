@@ -0,0 +1,110 @@
+# Micro-benchmarks for the bot's scoreboard adapters.
+#   python scoreboard/bench_adapters.py --teams 100 1000 10000
+#
+# For every registered adapter: parse time of a full board response, and a
+# full fetch from an in-process mock_server.py (no latency). Boards are
+# generated by mock_server, so sizes match bench_poller.py.
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from mock_server import MockCtfd, build_app  # noqa: E402
+
+from bot.services.scoreboard_adapters import ADAPTERS  # noqa: E402
+
+
+def _ctfd_body(state: MockCtfd) -> bytes:
+    return json.dumps({"success": True, "data": state.teams}).encode()
+
+
+def _rctf_body(state: MockCtfd) -> bytes:
+    leaderboard = [
+        {"id": str(t["account_id"]), "name": t["name"], "score": t["score"]}
+        for t in state.teams
+    ]
+    return json.dumps(
+        {
+            "kind": "goodLeaderboard",
+            "data": {"total": len(leaderboard), "leaderboard": leaderboard},
+        }
+    ).encode()
+
+
+JSONPATH_URL = "/api/v1/scoreboard#items=data"
+
+# adapter name -> (full board body, config URL relative to the mock server)
+FORMATS = {
+    "ctfd": (_ctfd_body, ""),
+    "rctf": (_rctf_body, ""),
+    "jsonpath": (_ctfd_body, JSONPATH_URL),
+}
+
+
+def _time_parse(parse, body: bytes, min_seconds: float = 0.5) -> float:
+    runs, started = 0, time.perf_counter()
+    while True:
+        parse(body)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / runs
+
+
+async def _time_fetch(adapter, url: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await adapter.fetch(url, None)
+    return (time.perf_counter() - started) / repeat
+
+
+async def run(args) -> None:
+    print(
+        f"{'adapter':>9} {'teams':>6} {'body KB':>8} {'parse ms':>9} "
+        f"{'MB/s':>7} {'fetch ms':>9}"
+    )
+    for teams in args.teams:
+        state = MockCtfd(token=None, teams=teams, members=args.members)
+        runner = web.AppRunner(build_app(state, tick_seconds=0))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            for name, adapter in ADAPTERS.items():
+                if name not in FORMATS:
+                    print(f"{name:>9}  (no benchmark payload)")
+                    continue
+                make_body, path = FORMATS[name]
+                url = f"http://127.0.0.1:{port}{path}"
+                body = make_body(state)
+                per_parse = _time_parse(adapter.parser(url), body)
+                per_fetch = await _time_fetch(adapter, url, args.repeat)
+                print(
+                    f"{name:>9} {teams:>6} {len(body) / 1024:>8.0f} "
+                    f"{per_parse * 1000:>9.2f} {len(body) / per_parse / 1e6:>7.1f} "
+                    f"{per_fetch * 1000:>9.2f}"
+                )
+        finally:
+            await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoreboard adapter micro-benchmarks")
+    parser.add_argument("--teams", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--members", type=int, default=4, help="Members per team in CTFd boards")
+    parser.add_argument("--repeat", type=int, default=5, help="Fetches timed per adapter")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# Snapshot storage benchmark: pretty-printed JSON captures vs one archive.
+#   python scoreboard/bench_archive.py --teams 100 1000 --snapshots 500
+#
+# Boards come from mock_server's synthetic teams with a few score changes
+# per snapshot. Timed: opening the data and reading one random snapshot,
+# and following one team through every snapshot.
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from mock_server import _synthetic_teams  # noqa: E402
+
+from bot.services.snapshot_archive import ArchiveReader, ArchiveWriter  # noqa: E402
+
+
+def _boards(teams: int, snapshots: int, rng: random.Random):
+    board = [
+        {"name": t["name"], "score": float(t["score"]), "id": str(t["account_id"])}
+        for t in _synthetic_teams(teams, 0, rng)
+    ]
+    started = time.time() - snapshots * 60
+    for i in range(snapshots):
+        for team in rng.sample(board, max(1, teams // 50)):
+            team["score"] += rng.choice((50, 100, 250))
+        ranked = sorted(board, key=lambda t: -t["score"])
+        yield started + i * 60, [
+            {"pos": pos, **team} for pos, team in enumerate(ranked, start=1)
+        ]
+
+
+def _timed(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def run(teams: int, snapshots: int, repeat: int, tmp: Path) -> None:
+    rng = random.Random(teams)
+    json_dir = tmp / f"json-{teams}"
+    json_dir.mkdir()
+    writer = ArchiveWriter()
+    for i, (timestamp, entries) in enumerate(_boards(teams, snapshots, rng)):
+        capture = {"url": "mock", "time": timestamp, "data": entries}
+        (json_dir / f"{i:06d}.json").write_text(json.dumps(capture, indent=2))
+        writer.add(timestamp, entries)
+    archive = tmp / f"{teams}.sbar"
+    writer.write(str(archive))
+
+    json_bytes = sum(p.stat().st_size for p in json_dir.iterdir())
+    probe = [rng.randrange(snapshots) for _ in range(repeat)]
+    target = str(rng.randrange(1, teams + 1))
+
+    def json_snapshot():
+        i = probe.pop() if probe else 0
+        json.loads((json_dir / f"{i:06d}.json").read_text())["data"]
+
+    def json_team():
+        for path in sorted(json_dir.iterdir()):
+            for entry in json.loads(path.read_text())["data"]:
+                if entry["id"] == target:
+                    break
+
+    def archive_snapshot():
+        with ArchiveReader.open(str(archive)) as reader:
+            reader.snapshot(rng.randrange(snapshots))
+
+    def archive_team():
+        with ArchiveReader.open(str(archive)) as reader:
+            reader.team_history(reader.find_team(target))
+
+    team_repeat = max(1, repeat // 20)
+    print(
+        f"{teams:>6} {snapshots:>6} {json_bytes / 1e6:>8.1f} {archive.stat().st_size / 1e6:>8.1f} "
+        f"{_timed(json_snapshot, repeat) * 1000:>9.2f} {_timed(archive_snapshot, repeat) * 1000:>9.2f} "
+        f"{_timed(json_team, team_repeat) * 1000:>9.1f} {_timed(archive_team, team_repeat) * 1000:>9.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoreboard snapshot archive benchmark")
+    parser.add_argument("--teams", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--snapshots", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=100, help="Random snapshot reads timed")
+    args = parser.parse_args()
+
+    print(
+        f"{'teams':>6} {'snaps':>6} {'json MB':>8} {'sbar MB':>8} "
+        f"{'json snap':>9} {'sbar snap':>9} {'json team':>9} {'sbar team':>9}  (ms)"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for teams in args.teams:
+            run(teams, args.snapshots, args.repeat, Path(tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Storage benchmark for scoreboard_state payloads: JSON text vs the
+# compressed blob format.
+#   python scoreboard/bench_payloads.py --sizes 10 100 1000 10000 --rows 200
+#
+# Payloads are normalized entries built from mock_server's synthetic boards,
+# the same shape the poller stores.
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from mock_server import _synthetic_teams  # noqa: E402
+
+from bot.db.payload_codec import decode_payload, encode_payload  # noqa: E402
+
+
+def _payload(teams: list[dict], size: int) -> str:
+    entries = [
+        {
+            "pos": pos,
+            "name": team["name"],
+            "score": float(team["score"]),
+            "id": str(team["account_id"]),
+        }
+        for pos, team in enumerate(teams[:size], start=1)
+    ]
+    return json.dumps(entries, ensure_ascii=False)
+
+
+def _per_call(func, arg, min_seconds: float = 0.3) -> float:
+    runs, started = 0, time.perf_counter()
+    while True:
+        func(arg)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / runs
+
+
+def _db_size(tmp: Path, name: str, values: list) -> int:
+    path = tmp / name
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE state (id INTEGER PRIMARY KEY, payload BLOB)")
+    con.executemany("INSERT INTO state (payload) VALUES (?)", [(v,) for v in values])
+    con.commit()
+    con.execute("VACUUM")
+    con.close()
+    return path.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoreboard payload storage benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--rows", type=int, default=200, help="scoreboard_state rows per database")
+    args = parser.parse_args()
+
+    teams = _synthetic_teams(max(args.sizes), 0, random.Random(0))
+    print(
+        f"{'entries':>7} {'text B':>9} {'blob B':>9} {'ratio':>6} "
+        f"{'encode us':>10} {'decode us':>10} {'text db KB':>11} {'blob db KB':>11}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            text = _payload(teams, size)
+            blob = encode_payload(text)
+            assert decode_payload(blob) == text
+            encode_s = _per_call(encode_payload, text)
+            decode_s = _per_call(decode_payload, blob)
+            text_db = _db_size(Path(tmp), f"text-{size}.db", [text] * args.rows)
+            blob_db = _db_size(Path(tmp), f"blob-{size}.db", [blob] * args.rows)
+            text_bytes = len(text.encode("utf-8"))
+            print(
+                f"{size:>7} {text_bytes:>9} {len(blob):>9} "
+                f"{text_bytes / len(blob):>5.1f}x {encode_s * 1e6:>10.1f} "
+                f"{decode_s * 1e6:>10.1f} {text_db / 1024:>11.0f} {blob_db / 1024:>11.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
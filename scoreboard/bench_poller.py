@@ -0,0 +1,191 @@
+# Load benchmark for the bot's scoreboard poller against mock_server.py.
+#   python scoreboard/bench_poller.py --configs 120 --teams 2000 --latency 20
+#
+# Starts the mock server in a subprocess, fills a throwaway database with
+# scoreboard configs (CTFd, rCTF and JSON path) pointing at it and runs
+# ScoreboardPoller's poll cycle a few times. Reports cycle time, CPU time,
+# memory and requests per cycle.
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+from bot.db.database import init_db  # noqa: E402
+from bot.db.repository import Repository  # noqa: E402
+from bot.services.loop_lag import LoopLagMonitor  # noqa: E402
+from bot.services.scoreboard_fetcher import FetchStats, normalize_team_name  # noqa: E402
+from bot.services.scoreboard_poller import ScoreboardPoller  # noqa: E402
+from bot.services.scoreboard_registry import ScoreboardRegistry  # noqa: E402
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_mock(args, port: int) -> subprocess.Popen:
+    cmd = [
+        sys.executable,
+        str(HERE / "mock_server.py"),
+        "--port", str(port),
+        "--teams", str(args.teams),
+        "--members", str(args.members),
+        "--change-rate", str(args.change_rate),
+        "--latency", str(args.latency),
+        "--error-rate", str(args.error_rate),
+        "--etag", args.etag,
+        "--tick", str(args.tick),
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            _mock_stats(port)
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("Mock server did not start")
+
+
+def _mock_stats(port: int) -> dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/_mock/stats", timeout=2) as resp:
+        return json.loads(resp.read())
+
+
+def _team_names(port: int, count: int) -> list[str]:
+    url = f"http://127.0.0.1:{port}/api/v1/scoreboard"
+    for _ in range(10):  # the mock may answer 503 on purpose
+        try:
+            with urllib.request.urlopen(url, timeout=10) as resp:
+                data = json.loads(resp.read())["data"]
+            return [team["name"] for team in data[:count]]
+        except OSError:
+            continue
+    raise SystemExit("Could not read team names from the mock server")
+
+
+async def _populate(repo: Repository, args, port: int) -> None:
+    rng = random.Random(args.seed)
+    names = _team_names(port, args.teams)
+    now = datetime.now(timezone.utc)
+    start = (now - timedelta(hours=1)).isoformat()
+    finish = (now + timedelta(days=1)).isoformat()
+    url = f"http://127.0.0.1:{port}"
+    for i in range(args.configs):
+        guild_id, event_id = 10_000 + i, 1_000 + i
+        roll = rng.random()
+        if roll < args.rctf_ratio:
+            type_name, config_url = "rctf", url
+        elif roll < args.rctf_ratio + args.jsonpath_ratio:
+            type_name, config_url = "jsonpath", f"{url}/api/v1/scoreboard#items=data"
+        else:
+            type_name, config_url = "ctfd", url
+        await repo.upsert_ctf_event(
+            guild_id, event_id, f"Bench CTF {i}", 0, {}, start, finish
+        )
+        await repo.upsert_scoreboard_config(
+            guild_id, event_id, type_name, config_url, None, None, 0
+        )
+        if rng.random() < args.watch_ratio:
+            name = rng.choice(names)
+            await repo.add_watched_team(
+                guild_id, event_id, normalize_team_name(name), name
+            )
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run(args) -> None:
+    port = _free_port()
+    mock = _start_mock(args, port)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = str(Path(tmp) / "bench.db")
+            await init_db(db_path)
+            repo = Repository(db_path)
+            await _populate(repo, args, port)
+
+            lag = LoopLagMonitor(interval=0.02, warn_after=0)
+            lag.start()
+
+            async def discard(update) -> None:
+                pass  # nothing to send without Discord
+
+            poller = ScoreboardPoller(repo, ScoreboardRegistry(repo), discard)
+            print(
+                f"{args.configs} configs, {args.teams} teams, "
+                f"latency {args.latency:g} ms, error rate {args.error_rate:g}, "
+                f"etag {args.etag}"
+            )
+            print(
+                f"{'cycle':>5} {'wall s':>8} {'cpu s':>8} {'requests':>9} "
+                f"{'MB read':>8} {'max lag ms':>10} {'rss MB':>8}"
+            )
+            walls = []
+            try:
+                for cycle in range(1, args.cycles + 1):
+                    lag.reset()
+                    wall0, cpu0 = time.perf_counter(), time.process_time()
+                    stats = FetchStats()
+                    await poller.poll(stats)
+                    wall = time.perf_counter() - wall0
+                    cpu = time.process_time() - cpu0
+                    max_lag, _ = lag.reset()
+                    walls.append(wall)
+                    print(
+                        f"{cycle:>5} {wall:>8.2f} {cpu:>8.2f} {stats.requests:>9} "
+                        f"{stats.bytes / 1e6:>8.2f} {max_lag * 1000:>10.0f} "
+                        f"{_rss_mb():>8.1f}"
+                    )
+            finally:
+                lag.stop()
+            server = _mock_stats(port)
+            print(
+                f"mean cycle {sum(walls) / len(walls):.2f} s; server saw "
+                f"{server['requests']} request(s), {server['errors']} error(s), "
+                f"{server['not_modified']} not modified"
+            )
+    finally:
+        mock.terminate()
+        mock.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoreboard poller load benchmark")
+    parser.add_argument("--configs", type=int, default=120)
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--teams", type=int, default=2000)
+    parser.add_argument("--members", type=int, default=4)
+    parser.add_argument("--change-rate", type=float, default=0.01)
+    parser.add_argument("--latency", type=float, default=20, help="Mean mock response delay in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--etag", choices=["none", "strong", "ignore"], default="none")
+    parser.add_argument("--tick", type=float, default=1.0, help="Seconds between mock board changes")
+    parser.add_argument("--rctf-ratio", type=float, default=0.3, help="Fraction of configs that are rCTF")
+    parser.add_argument("--jsonpath-ratio", type=float, default=0.2, help="Fraction of configs using the JSON path adapter")
+    parser.add_argument("--watch-ratio", type=float, default=0.5, help="Fraction of configs with a watched team")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,39 @@
-import os
+# pip install aiohttp python-dotenv
+#
+# Find the JSON scoreboard endpoint of a CTF site and save it.
+#   python ctfd.py                              # CTFD_BASE_URL -> CTFD_OUT (.env)
+#   python ctfd.py https://ctf.example.org -o board.json
+#   python ctfd.py --batch urls.txt -o results.jsonl
+#
+# All candidate paths are requested at once; the first valid scoreboard wins
+# and the other requests are cancelled. Batch mode probes many sites
+# concurrently and writes one JSON line per site as soon as it is done.
+
+import argparse
+import asyncio
+import contextlib
 import json
-import re
+import os
+import sys
+import time
 from pathlib import Path
 from urllib.parse import urljoin
 
-import requests
+import aiohttp
 from dotenv import load_dotenv
 
 load_dotenv()
 
-BASE = os.getenv("CTFD_BASE_URL")
-OUT = os.getenv("CTFD_OUT")
-if not BASE or not OUT:
-    raise SystemExit("Missing .env: requires CTFD_BASE_URL and CTFD_OUT (see .env.example)")
-BASE = BASE.rstrip("/") + "/"
-OUT = Path(OUT)
-
-# Common endpoints to try
+# (platform, path) pairs to try
 CANDIDATES = [
-    "/api/v1/scoreboard",
-    "/api/v1/scoreboard?count=1000",
-    "/scoreboard?format=json",
-    "/scores?format=json",
+    ("ctfd", "/api/v1/scoreboard"),
+    ("ctfd", "/api/v1/scoreboard?count=1000"),
+    ("ctfd", "/scoreboard?format=json"),
+    ("ctfd", "/scores?format=json"),
+    ("ctfd1", "/scores"),  # CTFd 1.x
+    ("rctf", "/api/v1/leaderboard/now?limit=100&offset=0"),
+    ("generic", "/api/scoreboard"),
+    ("generic", "/api/leaderboard"),
 ]
 
 def looks_like_ctfd_scoreboard(obj) -> bool:
@@ -44,35 +56,158 @@ def looks_like_ctfd_scoreboard(obj) -> bool:
     # name + score is the most common combo
     return ("name" in keys or "team" in keys) and ("score" in keys or "points" in keys)
 
-def main():
-    s = requests.Session()
-    s.headers.update({"User-Agent": "scoreboard-fetch/1.0"})
+def looks_like_ctfd1_standings(obj) -> bool:
+    """CTFd 1.x /scores: {"standings": [{"pos": 1, "id": 1, "team": ..., "score": ...}]}"""
+    if not isinstance(obj, dict):
+        return False
+    standings = obj.get("standings")
+    if not isinstance(standings, list) or not standings:
+        return False
+    if not isinstance(standings[0], dict):
+        return False
+    keys = set(standings[0].keys())
+    return "team" in keys and "score" in keys
+
+def looks_like_rctf_leaderboard(obj) -> bool:
+    """rCTF: {"kind": "goodLeaderboard", "data": {"total": N, "leaderboard": [...]}}"""
+    if not isinstance(obj, dict) or obj.get("kind") != "goodLeaderboard":
+        return False
+    data = obj.get("data")
+    return isinstance(data, dict) and isinstance(data.get("leaderboard"), list)
+
+def team_count(obj) -> int | None:
+    if isinstance(obj.get("standings"), list):
+        return len(obj["standings"])
+    data = obj.get("data")
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, dict):
+        if isinstance(data.get("total"), int):
+            return data["total"]
+        if isinstance(data.get("leaderboard"), list):
+            return len(data["leaderboard"])
+    return None
+
+async def probe_path(session, base, platform, path, timeout):
+    url = urljoin(base, path)
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+        ct = (r.headers.get("content-type") or "").lower()
+        # some servers return text/json
+        if r.status != 200 or "json" not in ct:
+            return None
+        obj = json.loads(await r.read())
+    if platform == "rctf":
+        ok = looks_like_rctf_leaderboard(obj)
+    elif platform == "ctfd1":
+        ok = looks_like_ctfd1_standings(obj)
+    else:
+        ok = looks_like_ctfd_scoreboard(obj)
+    if not ok:
+        return None
+    return {"platform": platform, "url": url, "teams": team_count(obj), "data": obj}
 
+async def probe(session, base, timeout):
+    """Race every candidate path; return the first valid scoreboard."""
+    base = base.rstrip("/") + "/"
+    started = time.monotonic()
+    tasks = [
+        asyncio.create_task(probe_path(session, base, platform, path, timeout))
+        for platform, path in CANDIDATES
+    ]
     found = None
-    for path in CANDIDATES:
-        url = urljoin(BASE, path)
-        try:
-            r = s.get(url, timeout=20)
-            ct = (r.headers.get("content-type") or "").lower()
-            if "application/json" not in ct:
-                # some servers return text/json
-                if not re.search(r"json", ct):
-                    continue
-            obj = r.json()
-            if looks_like_ctfd_scoreboard(obj):
-                found = {"url": url, "data": obj}
-                print("[+] Found scoreboard endpoint:", url)
+    errors = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                found = await next_done
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                errors += 1
+                continue
+            if found:
                 break
-        except Exception:
-            continue
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
-    if not found:
+    result = {
+        "base": base,
+        "found": found is not None,
+        "elapsed_ms": round((time.monotonic() - started) * 1000),
+    }
+    if found:
+        result.update(found)
+    else:
+        result["errors"] = errors
+    return result
+
+def _session(concurrency):
+    return aiohttp.ClientSession(
+        headers={"User-Agent": "scoreboard-fetch/1.0"},
+        connector=aiohttp.TCPConnector(limit=concurrency * len(CANDIDATES)),
+    )
+
+async def run_single(base, out, timeout):
+    async with _session(1) as session:
+        result = await probe(session, base, timeout)
+
+    if not result["found"]:
         print("[-] Could not find a JSON scoreboard endpoint in the candidate list.")
         print("   Tip: open /scoreboard in the browser and check Network/XHR for the real endpoint.")
         return
 
-    OUT.write_text(json.dumps(found, ensure_ascii=False, indent=2), encoding="utf-8")
-    print("[+] Saved:", OUT.resolve())
+    print(f"[+] Found {result['platform']} scoreboard endpoint:", result["url"])
+    found = {"url": result["url"], "data": result["data"]}
+    out.write_text(json.dumps(found, ensure_ascii=False, indent=2), encoding="utf-8")
+    print("[+] Saved:", out.resolve())
+
+async def run_batch(urls, out, timeout, concurrency, with_data):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(session, base):
+        async with semaphore:
+            return await probe(session, base, timeout)
+
+    found = 0
+    async with _session(concurrency) as session:
+        with open(out, "w", encoding="utf-8") if out else contextlib.nullcontext(sys.stdout) as fh:
+            for next_done in asyncio.as_completed([one(session, u) for u in urls]):
+                result = await next_done
+                if not with_data:
+                    result.pop("data", None)
+                fh.write(json.dumps(result, ensure_ascii=False) + "\n")
+                fh.flush()
+                found += result["found"]
+    print(f"[+] {found}/{len(urls)} scoreboards found", file=sys.stderr)
+
+def read_url_list(path):
+    urls = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            urls.append(line)
+    return urls
+
+def main():
+    parser = argparse.ArgumentParser(description="Find and save a CTF scoreboard JSON endpoint")
+    parser.add_argument("base", nargs="?", help="Site base URL (default: CTFD_BASE_URL)")
+    parser.add_argument("-o", "--out", help="Output file (default: CTFD_OUT; batch: stdout)")
+    parser.add_argument("--batch", help="File with one base URL per line; writes JSONL")
+    parser.add_argument("--concurrency", type=int, default=10, help="Sites probed at once in batch mode")
+    parser.add_argument("--timeout", type=float, default=20, help="Seconds per request")
+    parser.add_argument("--with-data", action="store_true", help="Include the scoreboard JSON in batch results")
+    args = parser.parse_args()
+
+    if args.batch:
+        urls = read_url_list(args.batch)
+        asyncio.run(run_batch(urls, args.out, args.timeout, args.concurrency, args.with_data))
+        return
+
+    base = args.base or os.getenv("CTFD_BASE_URL")
+    out = args.out or os.getenv("CTFD_OUT")
+    if not base or not out:
+        raise SystemExit("Missing .env: requires CTFD_BASE_URL and CTFD_OUT (see .env.example)")
+    asyncio.run(run_single(base, Path(out), args.timeout))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,373 @@
+# pip install aiohttp
+#
+# Local stand-in for a CTFd / rCTF instance, for trying the bot without a real CTF.
+#   python mock_server.py --port 8000 --token test-token
+# then configure: /scoreboard type:CTFd url:http://127.0.0.1:8000 auth_token:test-token
+#            or: /scoreboard type:rCTF url:http://127.0.0.1:8000
+#
+# Synthetic boards for load testing:
+#   python mock_server.py --teams 5000 --members 4 --change-rate 0.02 \
+#       --latency 50 --error-rate 0.01 --etag strong
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+from datetime import datetime, timezone
+from pathlib import Path
+
+from aiohttp import web
+
+HERE = Path(__file__).resolve().parent
+CTFD_SEED = HERE / "ctfd_scoreboard.json"
+RCTF_SEED = HERE / "scores_capture.json"
+
+# rCTF rejects larger pages
+RCTF_MAX_LIMIT = 100
+
+ETAG_MODES = ["none", "strong", "ignore"]
+
+CATEGORIES = ["web", "pwn", "rev", "crypto", "forensics", "misc"]
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _synthetic_teams(count: int, members: int, rng: random.Random) -> list[dict]:
+    """Teams named and scored after the captured boards, repeated to count."""
+    ctfd = json.loads(CTFD_SEED.read_text(encoding="utf-8"))["data"]["data"]
+    rctf = json.loads(RCTF_SEED.read_text(encoding="utf-8"))["data"]["data"]["leaderboard"]
+    names = [e["name"] for e in ctfd] + [e["name"] for e in rctf]
+    scores = sorted((e["score"] for e in ctfd + rctf), reverse=True)
+    member_names = [m["name"] for e in ctfd for m in e.get("members") or []]
+    teams = []
+    for i in range(count):
+        rounds, idx = divmod(i, len(names))
+        name = names[idx] if rounds == 0 else f"{names[idx]} {rounds + 1}"
+        team = {
+            "pos": 0,
+            "account_id": i + 1,
+            "account_url": f"/teams/{i + 1}",
+            "account_type": "team",
+            "oauth_id": None,
+            "name": name,
+            "score": scores[i % len(scores)] // (rounds + 1),
+            "bracket_id": None,
+            "bracket_name": None,
+        }
+        if members:
+            team["members"] = [
+                {
+                    "id": i * members + j + 1,
+                    "oauth_id": None,
+                    "name": rng.choice(member_names),
+                    "score": rng.randint(0, 200),
+                    "bracket_id": None,
+                    "bracket_name": None,
+                }
+                for j in range(members)
+            ]
+        teams.append(team)
+    return teams
+
+
+class MockCtfd:
+    """In-memory CTF: a scoreboard (served as CTFd and as rCTF), a challenge
+    list and our own team's solves."""
+
+    def __init__(
+        self,
+        token: str | None,
+        our_team_id: int = 1,
+        seed: int = 0,
+        teams: int | None = None,
+        members: int = 0,
+        change_rate: float | None = None,
+        user_mode: bool = False,
+    ) -> None:
+        self.token = token
+        self.our_team_id = our_team_id
+        # User-mode CTFs have no teams; solves are under /users/me instead
+        self.user_mode = user_mode
+        self.rng = random.Random(seed)
+        self.change_rate = change_rate
+        if teams is None:
+            board = json.loads(CTFD_SEED.read_text(encoding="utf-8"))["data"]["data"]
+            self.teams = [
+                {k: v for k, v in entry.items() if k != "members"} for entry in board
+            ]
+        else:
+            self.teams = _synthetic_teams(teams, members, self.rng)
+        self.challenges: list[dict] = []
+        self.solves: list[dict] = []
+        # Seed scores count as one award at start so timelines add up
+        start = _now_iso()
+        self.timeline = {
+            team["account_id"]: [
+                {
+                    "challenge_id": None,
+                    "account_id": team["account_id"],
+                    "value": team["score"],
+                    "date": start,
+                }
+            ]
+            for team in self.teams
+        }
+        for _ in range(6):
+            self.add_challenge()
+        self._rank()
+
+    def add_challenge(self) -> dict:
+        chall_id = len(self.challenges) + 1
+        category = CATEGORIES[(chall_id - 1) % len(CATEGORIES)]
+        challenge = {
+            "id": chall_id,
+            "type": "standard",
+            "name": f"{category}-{chall_id}",
+            "value": self.rng.choice([100, 200, 300, 500]),
+            "solves": 0,
+            "solved_by_me": False,
+            "category": category,
+            "tags": [],
+        }
+        self.challenges.append(challenge)
+        return challenge
+
+    def add_solve(self, team: dict, challenge: dict) -> None:
+        challenge["solves"] += 1
+        team["score"] += challenge["value"]
+        self.timeline[team["account_id"]].append(
+            {
+                "challenge_id": challenge["id"],
+                "account_id": team["account_id"],
+                "value": challenge["value"],
+                "date": _now_iso(),
+            }
+        )
+        if team["account_id"] == self.our_team_id:
+            challenge["solved_by_me"] = True
+            self.solves.append(
+                {
+                    "id": len(self.solves) + 1,
+                    "challenge_id": challenge["id"],
+                    "challenge": {
+                        "id": challenge["id"],
+                        "name": challenge["name"],
+                        "category": challenge["category"],
+                        "value": challenge["value"],
+                    },
+                    "type": "correct",
+                    "date": _now_iso(),
+                    "team": self.our_team_id,
+                }
+            )
+
+    def tick(self) -> None:
+        """Release a challenge now and then, and hand out a few random solves.
+
+        With a change rate, that fraction of all teams scores each tick.
+        """
+        if self.rng.random() < 0.3:
+            self.add_challenge()
+        if self.change_rate is None:
+            solves = self.rng.randint(0, 3)
+        else:
+            solves = round(self.change_rate * len(self.teams))
+        for _ in range(solves):
+            team = self.rng.choice(self.teams)
+            open_challenges = [
+                c
+                for c in self.challenges
+                if not (team["account_id"] == self.our_team_id and c["solved_by_me"])
+            ]
+            if open_challenges:
+                self.add_solve(team, self.rng.choice(open_challenges))
+        self._rank()
+
+    def _rank(self) -> None:
+        self.teams.sort(key=lambda t: -t["score"])
+        for pos, team in enumerate(self.teams, start=1):
+            team["pos"] = pos
+
+    def authorized(self, request: web.Request) -> bool:
+        if self.token is None:
+            return True
+        return request.headers.get("Authorization") == f"Token {self.token}"
+
+    # ── handlers ──────────────────────────────────────────────────────
+
+    async def scoreboard(self, request: web.Request) -> web.Response:
+        return web.json_response({"success": True, "data": self.teams})
+
+    async def scoreboard_top(self, request: web.Request) -> web.Response:
+        count = int(request.match_info["count"])
+        data = {
+            str(pos): {
+                "id": team["account_id"],
+                "account_url": team.get("account_url"),
+                "name": team["name"],
+                "score": team["score"],
+                "solves": self.timeline[team["account_id"]],
+            }
+            for pos, team in enumerate(self.teams[:count], start=1)
+        }
+        return web.json_response({"success": True, "data": data})
+
+    async def rctf_leaderboard(self, request: web.Request) -> web.Response:
+        try:
+            limit = int(request.query.get("limit", RCTF_MAX_LIMIT))
+            offset = int(request.query.get("offset", 0))
+        except ValueError:
+            limit = -1
+        if not 0 < limit <= RCTF_MAX_LIMIT or offset < 0:
+            return web.json_response(
+                {
+                    "kind": "badBody",
+                    "message": "The request body does not meet requirements.",
+                    "data": None,
+                },
+                status=400,
+            )
+        page = self.teams[offset : offset + limit]
+        return web.json_response(
+            {
+                "kind": "goodLeaderboard",
+                "message": "The leaderboard was retrieved.",
+                "data": {
+                    "total": len(self.teams),
+                    "leaderboard": [
+                        {"id": str(t["account_id"]), "name": t["name"], "score": t["score"]}
+                        for t in page
+                    ],
+                },
+            }
+        )
+
+    async def challenges_list(self, request: web.Request) -> web.Response:
+        if not self.authorized(request):
+            return web.json_response({"success": False}, status=403)
+        return web.json_response({"success": True, "data": self.challenges})
+
+    async def own_solves(self, request: web.Request) -> web.Response:
+        if not self.authorized(request):
+            return web.json_response({"success": False}, status=403)
+        return web.json_response(
+            {"success": True, "data": self.solves, "meta": {"count": len(self.solves)}}
+        )
+
+    async def team_solves(self, request: web.Request) -> web.Response:
+        if self.user_mode:
+            return web.json_response({"success": False}, status=404)
+        return await self.own_solves(request)
+
+    async def user_solves(self, request: web.Request) -> web.Response:
+        if not self.user_mode:
+            return web.json_response({"success": False}, status=404)
+        return await self.own_solves(request)
+
+
+async def _ticker(state: MockCtfd, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        state.tick()
+
+
+def _chaos_middleware(
+    latency_ms: float, error_rate: float, etag: str, rng: random.Random
+):
+    """Per-request latency, random 503s and ETag / If-None-Match handling.
+
+    etag "strong" answers 304 when the body is unchanged, "ignore" sends
+    an ETag but always the full body (like servers behind some caches).
+    """
+
+    @web.middleware
+    async def chaos(request: web.Request, handler):
+        request.app["requests"] += 1
+        if latency_ms > 0:
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * latency_ms / 1000)
+        if error_rate > 0 and rng.random() < error_rate:
+            request.app["errors"] += 1
+            return web.json_response({"success": False}, status=503)
+        resp = await handler(request)
+        if etag == "none" or resp.status != 200 or not isinstance(resp, web.Response):
+            return resp
+        tag = '"' + hashlib.sha1(resp.body).hexdigest()[:20] + '"'
+        resp.headers["ETag"] = tag
+        if etag == "strong" and request.headers.get("If-None-Match") == tag:
+            request.app["not_modified"] += 1
+            return web.Response(status=304, headers={"ETag": tag})
+        return resp
+
+    return chaos
+
+
+async def stats_handler(request: web.Request) -> web.Response:
+    app = request.app
+    return web.json_response(
+        {key: app[key] for key in ("requests", "errors", "not_modified")}
+    )
+
+
+def build_app(
+    state: MockCtfd,
+    tick_seconds: float,
+    latency_ms: float = 0,
+    error_rate: float = 0,
+    etag: str = "none",
+) -> web.Application:
+    app = web.Application(
+        middlewares=[_chaos_middleware(latency_ms, error_rate, etag, state.rng)]
+    )
+    app["requests"] = app["errors"] = app["not_modified"] = 0
+    app.router.add_get("/api/v1/scoreboard", state.scoreboard)
+    app.router.add_get(r"/api/v1/scoreboard/top/{count:\d+}", state.scoreboard_top)
+    app.router.add_get("/api/v1/leaderboard/now", state.rctf_leaderboard)
+    app.router.add_get("/api/v1/challenges", state.challenges_list)
+    app.router.add_get("/api/v1/teams/me/solves", state.team_solves)
+    app.router.add_get("/api/v1/users/me/solves", state.user_solves)
+    # Not part of CTFd: request counters for benchmarks
+    app.router.add_get("/_mock/stats", stats_handler)
+
+    async def start_ticker(app: web.Application):
+        task = asyncio.create_task(_ticker(state, tick_seconds))
+        yield
+        task.cancel()
+
+    if tick_seconds > 0:
+        app.cleanup_ctx.append(start_ticker)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock CTFd server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--token", default=None, help="Required API token (optional)")
+    parser.add_argument("--tick", type=float, default=10.0, help="Seconds between board changes (0 = static)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--teams", type=int, default=None, help="Synthetic board size (default: the captured CTFd board)")
+    parser.add_argument("--members", type=int, default=0, help="Members listed per synthetic team")
+    parser.add_argument("--change-rate", type=float, default=None, help="Fraction of teams scoring per tick (default: 0-3 solves)")
+    parser.add_argument("--latency", type=float, default=0, help="Mean response delay in ms")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests answered with 503")
+    parser.add_argument("--etag", choices=ETAG_MODES, default="none")
+    parser.add_argument("--user-mode", action="store_true", help="Serve solves as a user-mode CTF")
+    args = parser.parse_args()
+
+    state = MockCtfd(
+        token=args.token,
+        seed=args.seed,
+        teams=args.teams,
+        members=args.members,
+        change_rate=args.change_rate,
+        user_mode=args.user_mode,
+    )
+    app = build_app(state, args.tick, args.latency, args.error_rate, args.etag)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
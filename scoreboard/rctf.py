@@ -1,26 +1,130 @@
-# pip install playwright python-dotenv
-# playwright install
+# pip install aiohttp python-dotenv
+# Browser fallback only: pip install playwright && playwright install
+#
+# Capture an rCTF leaderboard.
+#   python rctf.py                               # RCTF_URL -> RCTF_OUT (.env)
+#   python rctf.py https://platform.lac.tf/scores -o scores.json
+#
+# Reads /api/v1/leaderboard/now directly: the first page gives the total,
+# the remaining pages are requested concurrently and written to disk in
+# order as they arrive. The headless browser is only used when the site
+# does not answer like a standard rCTF deployment.
 
+import argparse
+import asyncio
+import json
 import os
 import re
-import json
+import time
 from pathlib import Path
+from urllib.parse import urlparse
 
+import aiohttp
 from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright
 
 load_dotenv()
 
-URL = os.getenv("RCTF_URL")
-OUT = os.getenv("RCTF_OUT")
-if not URL or not OUT:
-    raise SystemExit("Missing .env: requires RCTF_URL and RCTF_OUT (see .env.example)")
-OUT = Path(OUT)
+# rCTF rejects larger pages
+PAGE_LIMIT = 100
 
 # Heuristic: capture requests related to leaderboard/score
 PAT = re.compile(r"(score|scores|leader|leaderboard|standing|rank)", re.I)
 
-def main():
+def base_url(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}/"
+
+def page_url(base, offset):
+    return f"{base}api/v1/leaderboard/now?limit={PAGE_LIMIT}&offset={offset}"
+
+async def get_page(session, base, offset, timeout):
+    async with session.get(page_url(base, offset), timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+        if r.status != 200 or "json" not in (r.headers.get("content-type") or "").lower():
+            return None
+        obj = json.loads(await r.read())
+    if not isinstance(obj, dict) or obj.get("kind") != "goodLeaderboard":
+        return None
+    data = obj.get("data")
+    if not isinstance(data, dict) or not isinstance(data.get("leaderboard"), list):
+        return None
+    return obj
+
+class OrderedPageWriter:
+    """Writes leaderboard pages in offset order, holding back early arrivals."""
+
+    def __init__(self, fh):
+        self.fh = fh
+        self.next_offset = 0
+        self.pending = {}
+        self.written = 0
+
+    def add(self, offset, rows):
+        self.pending[offset] = rows
+        while self.next_offset in self.pending:
+            for row in self.pending.pop(self.next_offset):
+                self.fh.write(",\n      " if self.written else "\n      ")
+                self.fh.write(json.dumps(row, ensure_ascii=False))
+                self.written += 1
+            self.next_offset += PAGE_LIMIT
+
+async def capture_api(url, out, concurrency, timeout):
+    """Capture through the rCTF API. Returns the team count, or None if the
+    site does not serve a standard rCTF leaderboard."""
+    base = base_url(url)
+    async with aiohttp.ClientSession(headers={"User-Agent": "scoreboard-fetch/1.0"}) as session:
+        try:
+            first = await get_page(session, base, 0, timeout)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return None
+        if first is None:
+            return None
+        total = first["data"].get("total") or len(first["data"]["leaderboard"])
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(offset):
+            async with semaphore:
+                page = await get_page(session, base, offset, timeout)
+            if page is None:
+                raise RuntimeError(f"Bad leaderboard page at offset {offset}")
+            return offset, page["data"]["leaderboard"]
+
+        # Same layout as a browser capture: {"url": ..., "data": <API response>}.
+        # Written next to out and moved over it once complete, so a failed
+        # capture never leaves a truncated file behind.
+        tmp = out.with_suffix(".tmp")
+        tasks = []
+        try:
+            with tmp.open("w", encoding="utf-8") as fh:
+                fh.write(f'{{"url": {json.dumps(page_url(base, 0))}, ')
+                fh.write('"data": {"kind": "goodLeaderboard", ')
+                fh.write(f'"message": {json.dumps(first.get("message"))}, ')
+                fh.write(f'"data": {{"total": {total}, "leaderboard": [')
+                writer = OrderedPageWriter(fh)
+                writer.add(0, first["data"]["leaderboard"])
+                tasks = [
+                    asyncio.create_task(fetch(offset))
+                    for offset in range(PAGE_LIMIT, total, PAGE_LIMIT)
+                ]
+                for next_done in asyncio.as_completed(tasks):
+                    offset, rows = await next_done
+                    writer.add(offset, rows)
+                fh.write("\n    ]}}}\n")
+        except BaseException:
+            # Stop the page requests still running before the session closes
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            tmp.unlink(missing_ok=True)
+            raise
+        os.replace(tmp, out)
+    return writer.written
+
+def capture_browser(url, out):
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        raise SystemExit("[-] Browser fallback needs Playwright: pip install playwright && playwright install")
+
     captured = []
 
     with sync_playwright() as p:
@@ -42,17 +146,47 @@ def main():
                 pass
 
         page.on("response", on_response)
-        page.goto(URL, wait_until="networkidle", timeout=60_000)
+        page.goto(url, wait_until="networkidle", timeout=60_000)
 
         browser.close()
 
     if not captured:
         print("[-] No JSON captured. API may return HTML/WS or be blocked.")
-        return
+        return False
 
     # save the most likely one (usually the last response contains the table)
-    OUT.write_text(json.dumps(captured[-1], ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"[+] Saved to {OUT.resolve()}")
+    out.write_text(json.dumps(captured[-1], ensure_ascii=False, indent=2), encoding="utf-8")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture an rCTF leaderboard")
+    parser.add_argument("url", nargs="?", help="Any rCTF page URL (default: RCTF_URL)")
+    parser.add_argument("-o", "--out", help="Output file (default: RCTF_OUT)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Pages requested at once")
+    parser.add_argument("--timeout", type=float, default=20, help="Seconds per request")
+    parser.add_argument("--browser", action="store_true", help="Skip the API and use the headless browser")
+    args = parser.parse_args()
+
+    url = args.url or os.getenv("RCTF_URL")
+    out = args.out or os.getenv("RCTF_OUT")
+    if not url or not out:
+        raise SystemExit("Missing .env: requires RCTF_URL and RCTF_OUT (see .env.example)")
+    out = Path(out)
+
+    started = time.monotonic()
+    if not args.browser:
+        try:
+            teams = asyncio.run(capture_api(url, out, args.concurrency, args.timeout))
+        except (aiohttp.ClientError, asyncio.TimeoutError, RuntimeError, ValueError) as exc:
+            print(f"[-] API capture failed: {exc}")
+            teams = None
+        if teams is not None:
+            print(f"[+] Saved {teams} teams via the API in {time.monotonic() - started:.2f}s: {out.resolve()}")
+            return
+        print("[-] No rCTF API found, falling back to the browser")
+
+    if capture_browser(url, out):
+        print(f"[+] Saved to {out.resolve()} in {time.monotonic() - started:.2f}s")
 
 if __name__ == "__main__":
     main()
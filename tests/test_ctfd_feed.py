@@ -0,0 +1,188 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from aiohttp import web
+
+from bot.db.database import init_db
+from bot.db.repository import Repository
+from bot.services.ctfd_feed import (
+    diff_feed,
+    fetch_ctfd_challenges,
+    fetch_ctfd_own_solves,
+    topic_for_category,
+)
+from bot.services.scoreboard_poller import FeedUpdate, decode_update, encode_update
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scoreboard"))
+from mock_server import MockCtfd, build_app  # noqa: E402
+
+
+TOKEN = "test-token"
+GUILD_ID = 1
+EVENT_ID = 1000
+
+
+class MockCtfdTestCase(unittest.IsolatedAsyncioTestCase):
+    """Runs scoreboard/mock_server.py in-process on a free port."""
+
+    user_mode = False
+
+    async def asyncSetUp(self) -> None:
+        self.state = MockCtfd(token=TOKEN, user_mode=self.user_mode)
+        self.runner = web.AppRunner(build_app(self.state, tick_seconds=0))
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def asyncTearDown(self) -> None:
+        await self.runner.cleanup()
+
+    def solve_as_us(self, challenge: dict) -> None:
+        team = next(t for t in self.state.teams if t["account_id"] == self.state.our_team_id)
+        self.state.add_solve(team, challenge)
+
+
+class FetchChallengesTest(MockCtfdTestCase):
+    async def test_lists_challenges(self) -> None:
+        challenges = await fetch_ctfd_challenges(self.base_url, TOKEN)
+        self.assertEqual(
+            [c["id"] for c in challenges], [c["id"] for c in self.state.challenges]
+        )
+        self.assertEqual(challenges[0]["name"], "web-1")
+
+    async def test_new_challenges_show_up(self) -> None:
+        self.state.add_challenge()
+        challenges = await fetch_ctfd_challenges(self.base_url + "/", TOKEN)
+        self.assertEqual(len(challenges), 7)
+
+    async def test_wrong_token_is_an_error(self) -> None:
+        with self.assertRaises(RuntimeError):
+            await fetch_ctfd_challenges(self.base_url, "wrong")
+
+
+class FetchSolvesTeamModeTest(MockCtfdTestCase):
+    async def test_returns_own_solves(self) -> None:
+        self.assertEqual(await fetch_ctfd_own_solves(self.base_url, TOKEN), [])
+        self.solve_as_us(self.state.challenges[2])
+        solves = await fetch_ctfd_own_solves(self.base_url, TOKEN)
+        self.assertEqual([(s["id"], s["challenge_id"]) for s in solves], [(1, 3)])
+
+    async def test_other_teams_solves_are_not_ours(self) -> None:
+        other = next(t for t in self.state.teams if t["account_id"] != self.state.our_team_id)
+        self.state.add_solve(other, self.state.challenges[0])
+        self.assertEqual(await fetch_ctfd_own_solves(self.base_url, TOKEN), [])
+
+    async def test_wrong_token_is_an_error(self) -> None:
+        with self.assertRaises(RuntimeError):
+            await fetch_ctfd_own_solves(self.base_url, "wrong")
+
+
+class FetchSolvesUserModeTest(MockCtfdTestCase):
+    user_mode = True
+
+    async def test_falls_back_to_user_solves(self) -> None:
+        self.solve_as_us(self.state.challenges[0])
+        self.solve_as_us(self.state.challenges[4])
+        solves = await fetch_ctfd_own_solves(self.base_url, TOKEN)
+        self.assertEqual([s["challenge_id"] for s in solves], [1, 5])
+
+
+class DiffFeedTest(MockCtfdTestCase):
+    async def test_cursor_only_yields_new_rows(self) -> None:
+        challenges = await fetch_ctfd_challenges(self.base_url, TOKEN)
+        solves = await fetch_ctfd_own_solves(self.base_url, TOKEN)
+        delta = diff_feed(set(), set(), challenges, solves)
+        self.assertEqual(len(delta.new_challenges), 6)
+        self.assertEqual(delta.new_solves, [])
+
+        known_challenges = {int(c["id"]) for c in delta.new_challenges}
+        known_solves: set[int] = set()
+        delta = diff_feed(known_challenges, known_solves, challenges, solves)
+        self.assertEqual((delta.new_challenges, delta.new_solves), ([], []))
+
+        added = self.state.add_challenge()
+        self.solve_as_us(self.state.challenges[1])
+        challenges = await fetch_ctfd_challenges(self.base_url, TOKEN)
+        solves = await fetch_ctfd_own_solves(self.base_url, TOKEN)
+        delta = diff_feed(known_challenges, known_solves, challenges, solves)
+        self.assertEqual([c["id"] for c in delta.new_challenges], [added["id"]])
+        self.assertEqual([s["challenge_id"] for s in delta.new_solves], [2])
+
+        known_challenges.add(added["id"])
+        known_solves.update(int(s["id"]) for s in delta.new_solves)
+        delta = diff_feed(known_challenges, known_solves, challenges, solves)
+        self.assertEqual((delta.new_challenges, delta.new_solves), ([], []))
+
+
+class DatabaseTestCase(MockCtfdTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        await init_db(self.db_path)
+        self.repo = Repository(self.db_path)
+
+    async def asyncTearDown(self) -> None:
+        await super().asyncTearDown()
+        os.unlink(self.db_path)
+
+
+class ChallengeImportTest(DatabaseTestCase):
+
+    async def test_create_and_mark_done(self) -> None:
+        challenges = await fetch_ctfd_challenges(self.base_url, TOKEN)
+        rows = [
+            (
+                GUILD_ID,
+                EVENT_ID,
+                c["name"],
+                topic_for_category(c["category"]),
+                10_000 + int(c["id"]),
+                20_000,
+                int(c["id"]),
+            )
+            for c in challenges
+        ]
+        self.assertEqual(await self.repo.create_challenges(rows), len(rows))
+        linked = await self.repo.map_platform_challenges(GUILD_ID, EVENT_ID)
+        self.assertEqual(linked, {int(c["id"]): 10_000 + int(c["id"]) for c in challenges})
+
+        self.solve_as_us(self.state.challenges[3])
+        solves = await fetch_ctfd_own_solves(self.base_url, TOKEN)
+        thread_id = linked[int(solves[0]["challenge_id"])]
+        await self.repo.mark_challenge_done(thread_id, [])
+
+        challenge = await self.repo.get_challenge_by_thread(thread_id)
+        self.assertEqual(challenge.challenge_name, "crypto-4")
+        self.assertEqual(challenge.category, "CRYPTO")
+        self.assertEqual(challenge.status, "done")
+        other = await self.repo.get_challenge_by_thread(10_001)
+        self.assertNotEqual(other.status, "done")
+
+
+class PendingFeedTest(DatabaseTestCase):
+    async def test_newer_update_replaces_queued_one(self) -> None:
+        challenges = await fetch_ctfd_challenges(self.base_url, TOKEN)
+
+        def queued(count: int) -> str:
+            update = FeedUpdate(GUILD_ID, EVENT_ID, 20_000, challenges[:count], [])
+            return json.dumps(encode_update(update))
+
+        await self.repo.put_pending_feed_update(GUILD_ID, EVENT_ID, queued(2))
+        await self.repo.put_pending_feed_update(GUILD_ID, EVENT_ID, queued(4))
+        await self.repo.put_pending_feed_update(GUILD_ID + 1, EVENT_ID, queued(1))
+        pending = await self.repo.list_pending_feed_updates()
+        self.assertEqual([guild_id for _, guild_id, _ in pending], [GUILD_ID, GUILD_ID + 1])
+
+        pending_id, _, update_json = pending[0]
+        update = decode_update(json.loads(update_json))
+        self.assertEqual([c["id"] for c in update.new_challenges], [1, 2, 3, 4])
+
+        await self.repo.delete_pending_feed_update(pending_id)
+        self.assertEqual(len(await self.repo.list_pending_feed_updates()), 1)